@@ -0,0 +1,49 @@
+"""add refresh_tokens table
+
+Revision ID: 7b1e4d2a9f30
+Revises: c63d5feab92a
+Create Date: 2026-10-18 03:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b1e4d2a9f30"
+down_revision: Union[str, Sequence[str], None] = "c63d5feab92a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "refresh_tokens"
+INDEXED_COLUMNS = ("family_id", "user_id", "revoked_at")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 迁移加入前用 create_all 建出的库可能已有该表，此时只补齐缺失的索引
+    if not sa.inspect(op.get_bind()).has_table(TABLE):
+        op.create_table(
+            TABLE,
+            sa.Column("jti", sa.String(length=32), nullable=False),
+            sa.Column("family_id", sa.String(length=32), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+            sa.Column("replaced_by", sa.String(length=32), nullable=True),
+            sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+            sa.PrimaryKeyConstraint("jti"),
+        )
+    for column in INDEXED_COLUMNS:
+        op.create_index(
+            op.f(f"ix_{TABLE}_{column}"), TABLE, [column], if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in INDEXED_COLUMNS:
+        op.drop_index(op.f(f"ix_{TABLE}_{column}"), table_name=TABLE)
+    op.drop_table(TABLE)
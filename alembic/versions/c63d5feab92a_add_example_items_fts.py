@@ -0,0 +1,75 @@
+"""add example_items_fts full-text index
+
+Revision ID: c63d5feab92a
+Revises:
+Create Date: 2026-10-18 02:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c63d5feab92a"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 每批回填的行数：按 id 键集遍历，单条语句的内存占用与表大小无关
+BACKFILL_BATCH_SIZE = 10000
+
+# 迁移中保留 DDL 副本，不依赖 models 中可能继续演进的定义
+FTS_TABLE = "example_items_fts"
+CREATE_TABLE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "name, content='example_items', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+CREATE_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON example_items BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON example_items BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name ON example_items BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {FTS_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+)
+
+
+def _backfill(bind: sa.engine.Connection) -> None:
+    insert_batch = sa.text(
+        f"INSERT INTO {FTS_TABLE}(rowid, name) "
+        "SELECT id, name FROM example_items WHERE id > :after ORDER BY id LIMIT :limit"
+    )
+    last_id = sa.text(
+        "SELECT max(id) FROM (SELECT id FROM example_items WHERE id > :after "
+        "ORDER BY id LIMIT :limit)"
+    )
+    after = 0
+    while True:
+        params = {"after": after, "limit": BACKFILL_BATCH_SIZE}
+        batch_last = bind.execute(last_id, params).scalar()
+        if batch_last is None:
+            break
+        bind.execute(insert_batch, params)
+        after = batch_last
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(CREATE_TABLE)
+    # 先回填再建触发器：启动时迁移由主进程在工作进程启动前执行，期间没有其他写入
+    _backfill(op.get_bind())
+    for statement in CREATE_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for suffix in ("ai", "ad", "au"):
+        op.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+    op.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
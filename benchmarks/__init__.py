@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试脚本
+
+说明：
+- 从项目根目录以模块方式运行，例如 `python -m benchmarks.bench_login_latency`。
+"""
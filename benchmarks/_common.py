@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试公共工具
+
+公开接口：
+- `prepare_environment()`：将数据库与日志指向临时目录（须在导入 `src.server` 之前调用）
+- `percentile()`：计算百分位
+- `format_latencies()`：格式化延迟统计
+
+说明：
+- 基准脚本统一从项目根目录以模块方式运行，例如 `python -m benchmarks.bench_login_latency`。
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+def prepare_environment(**env: str) -> Path:
+    """创建临时工作目录并设置基准所需的环境变量，返回该目录。"""
+    workdir = Path(tempfile.mkdtemp(prefix="fullstack-bench-"))
+    os.environ.setdefault("APP_ENV", "bench")
+    os.environ.setdefault("LOG_LEVEL", "warning")
+    os.environ["DATABASE_PATH"] = str(workdir / "bench.db")
+    os.environ["LOG_DIR"] = str(workdir / "logs")
+    os.environ.update(env)
+    if str(PROJECT_ROOT) not in sys.path:
+        sys.path.insert(0, str(PROJECT_ROOT))
+    return workdir
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """最近秩法计算百分位，`values` 为空时返回 0。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def format_latencies(label: str, values_ms: list[float]) -> str:
+    return (
+        f"{label}: n={len(values_ms)} "
+        f"p50={percentile(values_ms, 50):.2f}ms "
+        f"p99={percentile(values_ms, 99):.2f}ms "
+        f"max={max(values_ms, default=0.0):.2f}ms"
+    )
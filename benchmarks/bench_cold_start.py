@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷启动基准：从启动进程到首个请求成功的耗时（time-to-first-request）
+
+用法：
+- python -m benchmarks.bench_cold_start --runs 5
+
+说明：
+- 每轮启动一个全新的 uvicorn 进程，以 5 ms 间隔轮询 `/api/health`，收到 200 即停止计时。
+- 数据库在首轮之前预先建好，测量的是扩容时新实例的常规启动路径；目标为 300 ms 以内。
+- 同时以相同方式启动只有 `/api/health` 的空 FastAPI 应用作为框架基线，
+  输出应用自身的额外耗时与距目标的差距，而不只给出达标与否。
+- 需要逐项分析时使用 `python run.py --profile-startup`。
+"""
+
+from __future__ import annotations
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+from time import perf_counter, sleep
+from typing import Callable
+
+from benchmarks._common import PROJECT_ROOT, percentile, prepare_environment
+
+TARGET_MS = 300.0
+
+# 框架基线：导入 FastAPI/uvicorn 并提供一个健康检查端点，不导入本项目任何模块
+BASELINE_APP = """
+import sys
+import uvicorn
+from fastapi import FastAPI
+
+app = FastAPI()
+app.get("/api/health")(lambda: {"status": "ok"})
+uvicorn.run(app, port=int(sys.argv[1]), log_level="warning")
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _health_ok(port: int) -> bool:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+    try:
+        conn.request("GET", "/api/health")
+        return conn.getresponse().status == 200
+    except OSError:
+        return False
+    finally:
+        conn.close()
+
+
+def _app_command(port: int) -> list[str]:
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "src.server.main:app",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+
+
+def _baseline_command(port: int) -> list[str]:
+    return [sys.executable, "-c", BASELINE_APP, str(port)]
+
+
+def measure_once(timeout: float, command: Callable[[int], list[str]]) -> float:
+    port = _free_port()
+    started = perf_counter()
+    process = subprocess.Popen(
+        command(port),
+        cwd=PROJECT_ROOT,
+        env=os.environ.copy(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while perf_counter() - started < timeout:
+            if _health_ok(port):
+                return (perf_counter() - started) * 1000
+            if process.poll() is not None:
+                raise RuntimeError("服务进程提前退出")
+            sleep(0.005)
+        raise TimeoutError("等待首个请求超时")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="冷启动基准")
+    parser.add_argument("--runs", type=int, default=5, help="启动次数")
+    parser.add_argument("--timeout", type=float, default=30.0, help="单次超时（秒）")
+    args = parser.parse_args()
+
+    prepare_environment()
+    from src.server.database import init_database
+
+    init_database()
+
+    samples = [measure_once(args.timeout, _app_command) for _ in range(args.runs)]
+    baseline = [
+        measure_once(args.timeout, _baseline_command) for _ in range(args.runs)
+    ]
+    p50 = percentile(samples, 50)
+    baseline_p50 = percentile(baseline, 50)
+    print(
+        f"time-to-first-request: n={len(samples)} p50={p50:.0f}ms "
+        f"min={min(samples):.0f}ms max={max(samples):.0f}ms"
+    )
+    print(
+        f"框架基线（空 FastAPI 应用）: p50={baseline_p50:.0f}ms，"
+        f"应用自身额外耗时 {p50 - baseline_p50:.0f}ms"
+    )
+    gap = p50 - TARGET_MS
+    if gap <= 0:
+        print(f"目标 {TARGET_MS:.0f}ms：已达标")
+    else:
+        print(
+            f"目标 {TARGET_MS:.0f}ms：仍差 {gap:.0f}ms"
+            f"（其中框架基线已占 {baseline_p50:.0f}ms）"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+`get_current_user` 单次调用开销基准
+
+用法：
+- python -m benchmarks.bench_current_user --iterations 5000
+
+说明：
+- 直接调用依赖函数（不经过 HTTP），分别在禁用/启用已认证用户缓存时测量平均耗时。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from benchmarks._common import prepare_environment
+
+
+async def measure(iterations: int, token: str) -> float:
+    from src.server.auth.dependencies import get_current_user
+    from src.server.database import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        await get_current_user(token=token, db=db)
+        started = perf_counter()
+        for _ in range(iterations):
+            await get_current_user(token=token, db=db)
+        return (perf_counter() - started) / iterations * 1e6
+
+
+async def run(iterations: int) -> None:
+    from src.server.auth.service import create_access_token
+    from src.server.auth.user_cache import user_cache
+    from src.server.database import async_engine, init_database
+
+    init_database()
+    token = create_access_token({"sub": "admin"})
+
+    max_entries = user_cache.max_entries
+    user_cache.max_entries = 0
+    uncached = await measure(iterations, token)
+    user_cache.max_entries = max_entries
+    cached = await measure(iterations, token)
+    await async_engine.dispose()
+
+    print(f"无缓存: {uncached:.1f} µs/次")
+    print(
+        f"有缓存: {cached:.1f} µs/次（{uncached / cached:.1f}x），{user_cache.stats()}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="get_current_user 开销基准")
+    parser.add_argument("--iterations", type=int, default=2000, help="调用次数")
+    args = parser.parse_args()
+
+    prepare_environment()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
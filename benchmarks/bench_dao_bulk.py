@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+DAO 通用批量操作 vs 逐行操作基准
+
+用法：
+- python -m benchmarks.bench_dao_bulk                       # 默认表 10 万行，每批 1000 个键
+- python -m benchmarks.bench_dao_bulk --rows 1000000 --keys 5000
+
+说明：
+- 读取：逐行 `query(...).filter(...).first()` vs `get_many`（ORM 对象）vs `get_many(columns=...)`（Row 元组）。
+- 写入：逐行 `session.add` + 一次提交 vs `upsert_many`；删除：逐行 `session.delete` vs `delete_many`。
+- 另外对比 Python 侧 `len(query.all())` 与 `count()`、`first() is not None` 与 `exists()`。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from time import perf_counter
+from typing import Callable
+
+from benchmarks._common import prepare_environment
+
+
+def populate(rows: int) -> None:
+    from src.server.database import engine, init_database
+
+    init_database()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        chunk = 50000
+        for start in range(0, rows, chunk):
+            cursor.executemany(
+                "INSERT INTO example_items (name) VALUES (?)",
+                [(f"item-{i:08d}",) for i in range(start, min(rows, start + chunk))],
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def timed(label: str, func: Callable[[], object], baseline_ms: float | None = None) -> float:
+    started = perf_counter()
+    func()
+    elapsed_ms = (perf_counter() - started) * 1000
+    speedup = f"  ({baseline_ms / elapsed_ms:.1f}x)" if baseline_ms else ""
+    print(f"  {label:<28} {elapsed_ms:9.1f} ms{speedup}")
+    return elapsed_ms
+
+
+def bench_reads(rows: int, keys: int) -> None:
+    from src.server.database import SessionLocal
+    from src.server.example_module.dao import ExampleItemDAO
+    from src.server.example_module.models import Item
+
+    ids = random.sample(range(1, rows + 1), keys)
+    print(f"按主键读取 {keys} 行：")
+    with SessionLocal() as db:
+        baseline = timed(
+            "逐行 query().first()",
+            lambda: [db.query(Item).filter(Item.id == i).first() for i in ids],
+        )
+        db.expunge_all()
+        dao = ExampleItemDAO(db)
+        timed("get_many（ORM）", lambda: dao.get_many(ids), baseline)
+        db.expunge_all()
+        timed("get_many(columns)", lambda: dao.get_many(ids, columns=("id", "name")), baseline)
+
+    print("计数与存在性：")
+    with SessionLocal() as db:
+        dao = ExampleItemDAO(db)
+        baseline = timed("len(query().all())", lambda: len(db.query(Item).all()))
+        db.expunge_all()
+        timed("count()", dao.count, baseline)
+        names = [f"item-{i - 1:08d}" for i in ids[:200]]
+        baseline = timed(
+            "200 x first() is not None",
+            lambda: [db.query(Item).filter(Item.name == n).first() is not None for n in names],
+        )
+        timed("200 x exists()", lambda: [dao.exists(name=n) for n in names], baseline)
+
+
+def bench_writes(keys: int) -> None:
+    from src.server.database import SessionLocal
+    from src.server.example_module.dao import ExampleItemDAO
+    from src.server.example_module.models import Item
+
+    print(f"写入 / 删除 {keys} 行：")
+    with SessionLocal() as db:
+        added: list[Item] = []
+
+        def per_row_insert() -> None:
+            for i in range(keys):
+                item = Item(name=f"row-{i}")
+                db.add(item)
+                added.append(item)
+            db.commit()
+
+        baseline = timed("逐行 add + commit", per_row_insert)
+
+        def per_row_delete() -> None:
+            for item in added:
+                db.delete(item)
+            db.commit()
+
+        delete_baseline = timed("逐行 delete + commit", per_row_delete)
+
+        dao = ExampleItemDAO(db)
+        ids: list[int] = []
+        timed(
+            "upsert_many",
+            lambda: ids.extend(dao.upsert_many([{"name": f"bulk-{i}"} for i in range(keys)], ["name"])),
+            baseline,
+        )
+        timed("delete_many", lambda: dao.delete_many(ids), delete_baseline)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="DAO 批量操作基准")
+    parser.add_argument("--rows", type=int, default=100_000, help="表行数")
+    parser.add_argument("--keys", type=int, default=1000, help="每次批量操作的键数")
+    args = parser.parse_args()
+
+    # 关闭实体缓存：只比较数据库访问模式
+    prepare_environment(ENTITY_CACHE_MAX_ENTRIES="0")
+    started = perf_counter()
+    populate(args.rows)
+    print(f"已写入 {args.rows} 行，用时 {perf_counter() - started:.1f}s")
+    bench_reads(args.rows, args.keys)
+    bench_writes(args.keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+示例项目分页与 NDJSON 导出基准
+
+用法：
+- python -m benchmarks.bench_example_pagination                 # 默认 100 万行
+- python -m benchmarks.bench_example_pagination --rows 200000 --naive
+
+说明：
+- 键集分页 vs OFFSET 分页：在表的不同深度随机取页，比较平均延迟。
+- NDJSON 导出：统计吞吐与 tracemalloc 峰值内存；`--naive` 额外对比一次性加载全部 ORM 对象。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tracemalloc
+from time import perf_counter
+
+from benchmarks._common import prepare_environment
+
+
+def populate(rows: int) -> None:
+    from src.server.database import engine, init_database
+
+    init_database()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        chunk = 50000
+        for start in range(0, rows, chunk):
+            cursor.executemany(
+                "INSERT INTO example_items (name) VALUES (?)",
+                [(f"item-{i:08d}",) for i in range(start, min(rows, start + chunk))],
+            )
+        raw.commit()
+    finally:
+        raw.close()
+
+
+def bench_pages(rows: int, samples: int, limit: int) -> None:
+    from sqlalchemy import select
+
+    from src.server.database import SessionLocal
+    from src.server.example_module.models import Item
+    from src.server.example_module.service import list_items
+
+    depths = [random.randrange(0, rows - limit) for _ in range(samples)]
+    with SessionLocal() as db:
+        started = perf_counter()
+        for depth in depths:
+            list_items(db, cursor=depth, limit=limit)
+        keyset_ms = (perf_counter() - started) / samples * 1000
+
+        started = perf_counter()
+        for depth in depths:
+            list(
+                db.scalars(
+                    select(Item).order_by(Item.id).offset(depth).limit(limit + 1)
+                )
+            )
+        offset_ms = (perf_counter() - started) / samples * 1000
+    print(f"键集分页: {keyset_ms:.2f} ms/页, OFFSET 分页: {offset_ms:.2f} ms/页")
+
+
+def bench_export(naive: bool) -> None:
+    from src.server.database import SessionLocal
+    from src.server.example_module.models import Item
+    from src.server.example_module.schemas import ItemOut
+    from src.server.example_module.service import export_items_ndjson
+    from src.server.responses import model_response
+
+    started = perf_counter()
+    total = sum(len(chunk) for chunk in export_items_ndjson(SessionLocal))
+    elapsed = perf_counter() - started
+    tracemalloc.start()
+    for _ in export_items_ndjson(SessionLocal):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(
+        f"NDJSON 导出: {total / 1024 / 1024:.1f} MiB 用时 {elapsed:.2f}s, "
+        f"峰值内存 {peak / 1024 / 1024:.1f} MiB"
+    )
+
+    if naive:
+        tracemalloc.start()
+        started = perf_counter()
+        with SessionLocal() as db:
+            body = model_response(list[ItemOut], db.query(Item).all()).body
+        elapsed = perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(
+            f"一次性加载: {len(body) / 1024 / 1024:.1f} MiB 用时 {elapsed:.2f}s, "
+            f"峰值内存 {peak / 1024 / 1024:.1f} MiB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="分页与导出基准")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="表行数")
+    parser.add_argument("--samples", type=int, default=200, help="分页采样次数")
+    parser.add_argument("--limit", type=int, default=20, help="每页大小")
+    parser.add_argument("--naive", action="store_true", help="对比一次性加载全部行")
+    args = parser.parse_args()
+
+    prepare_environment()
+    started = perf_counter()
+    populate(args.rows)
+    print(f"已写入 {args.rows} 行，用时 {perf_counter() - started:.1f}s")
+    bench_pages(args.rows, args.samples, args.limit)
+    bench_export(args.naive)
+
+
+if __name__ == "__main__":
+    main()
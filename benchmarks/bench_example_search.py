@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+示例项目全文搜索基准：FTS5 vs LIKE
+
+用法：
+- python -m benchmarks.bench_example_search                      # 10 万行与 100 万行
+- python -m benchmarks.bench_example_search --rows 200000 --samples 50
+
+说明：
+- 名称由随机词组成；按规模从小到大逐步追加写入同一张表（由触发器同步 FTS5 索引），每到一个规模测一次。
+- 两组搜索词：完整词（命中少，LIKE 需要扫描大半张表才能凑满一页）与 3 字符前缀（命中多）。
+- 对比 `service.search_items`（FTS5 前缀匹配 + bm25 排序，取第一页）、`LIKE '%词%' LIMIT`（不排序，凑满一页即停）
+  与 `LIKE '%词%'` 取回全部匹配（按相关度排序的前提）的延迟。
+- LIKE 是子串匹配、FTS5 是词首前缀匹配，语义不完全相同，这里只比较同类查询的代价。
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+from time import perf_counter
+
+from benchmarks._common import format_latencies, prepare_environment
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "to", "vi", "zu", "pe", "qua", "rel"]
+
+
+def make_vocabulary(size: int, rng: random.Random) -> list[str]:
+    words: set[str] = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def populate(start: int, stop: int, vocabulary: list[str], rng: random.Random) -> float:
+    from src.server.database import engine
+
+    started = perf_counter()
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        chunk = 50000
+        for offset in range(start, stop, chunk):
+            cursor.executemany(
+                "INSERT INTO example_items (name) VALUES (?)",
+                [
+                    (" ".join(rng.sample(vocabulary, 3)) + f" {i}",)
+                    for i in range(offset, min(stop, offset + chunk))
+                ],
+            )
+        raw.commit()
+    finally:
+        raw.close()
+    return perf_counter() - started
+
+
+def measure(label: str, terms: list[str], query) -> None:
+    latencies: list[float] = []
+    for term in terms:
+        started = perf_counter()
+        query(term)
+        latencies.append((perf_counter() - started) * 1000)
+    print("    " + format_latencies(label, latencies))
+
+
+def bench(rows: int, terms: dict[str, list[str]], limit: int) -> None:
+    from sqlalchemy import select
+
+    from src.server.database import SessionLocal
+    from src.server.example_module.models import Item
+    from src.server.example_module.service import search_items
+
+    with SessionLocal() as db:
+        for kind, samples in terms.items():
+            print(f"  {kind}：")
+            measure("FTS5 前缀 + bm25", samples, lambda t: search_items(db, t, limit))
+            measure(
+                "LIKE '%词%' LIMIT",
+                samples,
+                lambda t: list(
+                    db.scalars(select(Item).where(Item.name.like(f"%{t}%")).limit(limit + 1))
+                ),
+            )
+            measure(
+                "LIKE '%词%' 全部匹配",
+                samples[: max(1, len(samples) // 5)],
+                lambda t: list(db.execute(select(Item.id).where(Item.name.like(f"%{t}%")))),
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="全文搜索基准")
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[100_000, 1_000_000], help="表行数（可多个）"
+    )
+    parser.add_argument("--samples", type=int, default=100, help="每种查询的采样次数")
+    parser.add_argument("--limit", type=int, default=20, help="每页大小")
+    args = parser.parse_args()
+
+    prepare_environment()
+    from src.server.database import init_database
+
+    init_database()
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(5000, rng)
+    terms = {
+        "完整词": [rng.choice(vocabulary) for _ in range(args.samples)],
+        "3 字符前缀": [rng.choice(vocabulary)[:3] for _ in range(args.samples)],
+    }
+    written = 0
+    for rows in sorted(args.rows):
+        elapsed = populate(written, rows, vocabulary, rng)
+        print(f"[{rows} 行] 追加 {rows - written} 行（含 FTS5 触发器）用时 {elapsed:.1f}s")
+        written = rows
+        bench(rows, terms, args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大列表 JSON 响应基准
+
+用法：
+- python -m benchmarks.bench_json_responses --items 10000 --requests 50
+
+说明：
+- 以 ASGI 协议直接驱动返回 `list[ItemOut]` 的路由，对比：
+  1. FastAPI 默认流程 + 标准库 `JSONResponse`
+  2. FastAPI 默认流程 + `ORJSONResponse`
+  3. `model_response` 一次完成校验与编码
+- 输出每秒请求数，以及 tracemalloc 统计的单次请求峰值内存（反映中间对象的分配量）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tracemalloc
+from time import perf_counter
+from types import SimpleNamespace
+
+from benchmarks._common import prepare_environment
+
+
+def build_app(items: list, response_class, direct: bool):
+    from fastapi import FastAPI
+
+    from src.server.example_module.schemas import ItemOut
+    from src.server.responses import model_response
+
+    app = FastAPI(default_response_class=response_class)
+
+    if direct:
+
+        @app.get("/items", response_model=list[ItemOut])
+        async def list_items():
+            return model_response(list[ItemOut], items)
+
+    else:
+
+        @app.get("/items", response_model=list[ItemOut])
+        async def list_items():
+            return items
+
+    return app
+
+
+async def request_once(app) -> int:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/items",
+        "raw_path": b"/items",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    size = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return size
+
+
+async def run(item_count: int, requests: int) -> None:
+    from fastapi.responses import JSONResponse, ORJSONResponse
+
+    items = [
+        SimpleNamespace(id=i, name=f"example-item-{i:08d}") for i in range(item_count)
+    ]
+    variants = {
+        "默认流程 + 标准库 json": (JSONResponse, False),
+        "默认流程 + orjson": (ORJSONResponse, False),
+        "model_response 直出 bytes": (ORJSONResponse, True),
+    }
+    for label, (response_class, direct) in variants.items():
+        app = build_app(items, response_class, direct)
+        size = await request_once(app)
+
+        started = perf_counter()
+        for _ in range(requests):
+            await request_once(app)
+        rps = requests / (perf_counter() - started)
+
+        tracemalloc.start()
+        await request_once(app)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(
+            f"{label}: {rps:.1f} 请求/秒, 响应 {size / 1024:.0f} KiB, "
+            f"峰值内存 {peak / 1024:.0f} KiB"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="大列表 JSON 响应基准")
+    parser.add_argument("--items", type=int, default=10000, help="列表元素数量")
+    parser.add_argument("--requests", type=int, default=30, help="请求次数")
+    args = parser.parse_args()
+
+    prepare_environment()
+    asyncio.run(run(args.items, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录风暴下 `/api/health` 的尾延迟基准
+
+用法：
+- python -m benchmarks.bench_login_latency                 # 使用配置的密码哈希执行器
+- python -m benchmarks.bench_login_latency --workers 0     # bcrypt 直接在事件循环中执行（对照组）
+
+说明：
+- 在同一事件循环中并发发起登录请求，同时以固定间隔探测 `/api/health`，
+  输出健康检查的 p50/p99 延迟、登录吞吐以及被 503 削峰的请求数。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from time import perf_counter
+
+from benchmarks._common import format_latencies, prepare_environment
+
+
+async def run(concurrency: int, duration: float, probe_interval: float) -> None:
+    import httpx
+
+    from src.server.database import init_database
+    from src.server.main import app
+
+    init_database()
+
+    transport = httpx.ASGITransport(app=app)
+    deadline = perf_counter() + duration
+    health_latencies: list[float] = []
+    outcomes: dict[int, int] = {}
+
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def login_loop() -> None:
+            while perf_counter() < deadline:
+                resp = await client.post(
+                    "/api/auth/login",
+                    json={"username": "admin", "password": "admin123"},
+                )
+                outcomes[resp.status_code] = outcomes.get(resp.status_code, 0) + 1
+
+        async def health_probe() -> None:
+            while perf_counter() < deadline:
+                started = perf_counter()
+                await client.get("/api/health")
+                health_latencies.append((perf_counter() - started) * 1000)
+                await asyncio.sleep(probe_interval)
+
+        await asyncio.gather(
+            health_probe(), *(login_loop() for _ in range(concurrency))
+        )
+
+    print(format_latencies("/api/health", health_latencies))
+    print(
+        f"登录结果: {dict(sorted(outcomes.items()))}, "
+        f"吞吐 {outcomes.get(200, 0) / duration:.1f} 次/秒"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="登录风暴下健康检查延迟基准")
+    parser.add_argument("--workers", type=int, default=None, help="密码哈希工作者数量")
+    parser.add_argument("--queue-size", type=int, default=None, help="密码哈希排队上限")
+    parser.add_argument("--concurrency", type=int, default=8, help="并发登录协程数")
+    parser.add_argument("--duration", type=float, default=5.0, help="持续时间（秒）")
+    parser.add_argument(
+        "--probe-interval", type=float, default=0.01, help="探测间隔（秒）"
+    )
+    args = parser.parse_args()
+
+    # 该基准测量 bcrypt 执行器本身，关闭登录限流
+    env = {"LOGIN_RATE_LIMIT_ENABLED": "false"}
+    if args.workers is not None:
+        env["PASSWORD_HASH_WORKERS"] = str(args.workers)
+    if args.queue_size is not None:
+        env["PASSWORD_HASH_QUEUE_SIZE"] = str(args.queue_size)
+    prepare_environment(**env)
+
+    asyncio.run(run(args.concurrency, args.duration, args.probe_interval))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+登录限流拒绝成本基准
+
+用法：
+- python -m benchmarks.bench_login_rate_limit                  # 进程内令牌桶
+- python -m benchmarks.bench_login_rate_limit --store sqlite   # SQLite 共享令牌桶
+
+说明：
+- 先用错误密码耗尽同一 IP 的令牌桶，再持续发送登录请求，统计被 429 拒绝的请求的单次耗时；
+  同时给出未被限流时一次错误密码登录（含 bcrypt 校验）的耗时作为对照。
+- 请求经 ASGI 直接调用应用，不包含网络开销。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+from time import perf_counter
+
+from benchmarks._common import format_latencies, prepare_environment
+
+
+async def run(requests: int) -> None:
+    import httpx
+
+    from src.server.auth.rate_limit import login_rate_limiter
+    from src.server.database import init_database
+    from src.server.main import app
+
+    init_database()
+    payload = {"username": "admin", "password": "wrong-password"}
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        verified: list[float] = []
+        rejected: list[float] = []
+        while True:
+            started = perf_counter()
+            resp = await client.post("/api/auth/login", json=payload)
+            elapsed = (perf_counter() - started) * 1000
+            if resp.status_code == 429:
+                break
+            verified.append(elapsed)
+
+        for _ in range(requests):
+            started = perf_counter()
+            resp = await client.post("/api/auth/login", json=payload)
+            rejected.append((perf_counter() - started) * 1000)
+            assert resp.status_code == 429, resp.status_code
+        login_rate_limiter.clear()
+
+    print(format_latencies("未限流（bcrypt 校验）", verified))
+    print(format_latencies("被限流（429）", rejected))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="登录限流拒绝成本基准")
+    parser.add_argument("--store", choices=("memory", "sqlite"), default="memory")
+    parser.add_argument("--requests", type=int, default=2000, help="被拒绝请求数")
+    args = parser.parse_args()
+
+    workdir = prepare_environment(
+        LOGIN_RATE_LIMIT_STORE=args.store,
+        LOGIN_IP_BURST="5",
+        LOGIN_IP_PER_MINUTE="0.01",
+    )
+    os.environ["LOGIN_RATE_LIMIT_SQLITE_PATH"] = str(workdir / "rate_limit.db")
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求日志 / Cache-Control 中间件开销基准
+
+用法：
+- python -m benchmarks.bench_middleware_overhead --requests 20000
+
+说明：
+- 不经过网络，直接以 ASGI 协议驱动只包含 `/api/health` 的应用，
+  对比无中间件、旧版 `BaseHTTPMiddleware` 实现与当前纯 ASGI 实现的每秒请求数，
+  以及额外叠加 `MetricsMiddleware` 后的开销。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from time import perf_counter
+from uuid import uuid4
+
+from benchmarks._common import prepare_environment
+
+
+def build_legacy_middlewares():
+    """旧版基于 BaseHTTPMiddleware 的实现（保留用于对照）。"""
+    from fastapi import Request
+    from loguru import logger
+    from starlette.middleware.base import BaseHTTPMiddleware
+
+    class LegacyCacheControlMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            response = await call_next(request)
+            path = request.url.path
+            if path.startswith("/assets/"):
+                response.headers.setdefault(
+                    "Cache-Control", "public, max-age=31536000, immutable"
+                )
+            elif path == "/" or path.endswith(".html"):
+                response.headers["Cache-Control"] = "no-cache"
+            return response
+
+    class LegacyRequestLoggingMiddleware(BaseHTTPMiddleware):
+        async def dispatch(self, request: Request, call_next):
+            request_id = request.headers.get("X-Request-ID") or uuid4().hex
+            client_ip = request.client.host if request.client else "-"
+            request.state.request_id = request_id
+            started_at = perf_counter()
+            with logger.contextualize(request_id=request_id, client_ip=client_ip):
+                response = await call_next(request)
+            duration_ms = (perf_counter() - started_at) * 1000
+            response.headers["X-Request-ID"] = request_id
+            logger.bind(log_type="access", request_id=request_id).log(
+                "INFO",
+                f"{request.method} {request.url.path} -> "
+                f"{response.status_code} in {duration_ms:.2f} ms",
+            )
+            return response
+
+    return LegacyCacheControlMiddleware, LegacyRequestLoggingMiddleware
+
+
+def build_app(middlewares: tuple):
+    from fastapi import FastAPI
+
+    app = FastAPI()
+
+    @app.get("/api/health")
+    def health():
+        return {"status": "ok"}
+
+    for middleware in middlewares:
+        app.add_middleware(middleware)
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/api/health",
+        "raw_path": b"/api/health",
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        return None
+
+    for _ in range(200):
+        await app(dict(scope), receive, send)
+    started = perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return requests / (perf_counter() - started)
+
+
+async def run(requests: int) -> None:
+    from src.server.main import CacheControlMiddleware, RequestLoggingMiddleware
+    from src.server.metrics import MetricsMiddleware
+
+    variants = {
+        "无中间件": (),
+        "BaseHTTPMiddleware（旧）": build_legacy_middlewares(),
+        "纯 ASGI（当前）": (CacheControlMiddleware, RequestLoggingMiddleware),
+        "纯 ASGI + 指标": (
+            CacheControlMiddleware,
+            RequestLoggingMiddleware,
+            MetricsMiddleware,
+        ),
+    }
+    for label, middlewares in variants.items():
+        rps = await drive(build_app(middlewares), requests)
+        print(f"{label}: {rps:,.0f} 请求/秒")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="中间件开销基准")
+    parser.add_argument("--requests", type=int, default=10000, help="请求次数")
+    args = parser.parse_args()
+
+    prepare_environment()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite PRAGMA 配置档并发写入基准
+
+用法：
+- python -m benchmarks.bench_sqlite_write_concurrency
+- python -m benchmarks.bench_sqlite_write_concurrency --writers 8 --readers 4 --ops 500
+
+说明：
+- 针对每个配置档新建数据库文件，多个写线程逐条 INSERT + COMMIT，
+  读线程同时执行聚合查询；输出写吞吐、写延迟 p99 以及 "database is locked" 次数。
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+from time import perf_counter
+
+from benchmarks._common import format_latencies, prepare_environment
+
+
+def run_profile(profile: str, writers: int, readers: int, ops: int, workdir) -> None:
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.exc import OperationalError
+
+    from src.server.database import SQLITE_PRAGMA_PROFILES, install_sqlite_pragmas
+
+    engine = create_engine(
+        f"sqlite:///{workdir / f'{profile}.db'}",
+        connect_args={"check_same_thread": False},
+        pool_size=writers + readers,
+    )
+    install_sqlite_pragmas(engine, SQLITE_PRAGMA_PROFILES[profile])
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE bench (id INTEGER PRIMARY KEY, payload TEXT NOT NULL)"
+        )
+
+    latencies: list[float] = []
+    locked = 0
+    lock = threading.Lock()
+    writers_done = threading.Event()
+
+    def writer() -> None:
+        nonlocal locked
+        local_latencies = []
+        local_locked = 0
+        with engine.connect() as conn:
+            for i in range(ops):
+                started = perf_counter()
+                try:
+                    conn.execute(
+                        text("INSERT INTO bench (payload) VALUES (:p)"), {"p": "x" * 64}
+                    )
+                    conn.commit()
+                except OperationalError:
+                    conn.rollback()
+                    local_locked += 1
+                    continue
+                local_latencies.append((perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local_latencies)
+            locked += local_locked
+
+    def reader() -> None:
+        with engine.connect() as conn:
+            while not writers_done.is_set():
+                conn.exec_driver_sql("SELECT count(*), max(id) FROM bench").fetchone()
+                conn.rollback()
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer) for _ in range(writers)]
+    for t in reader_threads:
+        t.start()
+    started = perf_counter()
+    for t in writer_threads:
+        t.start()
+    for t in writer_threads:
+        t.join()
+    elapsed = perf_counter() - started
+    writers_done.set()
+    for t in reader_threads:
+        t.join()
+    engine.dispose()
+
+    print(f"[{profile}] 写吞吐 {len(latencies) / elapsed:.0f} 次/秒, locked={locked}")
+    print("  " + format_latencies("写延迟", latencies))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="SQLite PRAGMA 配置档并发写入基准")
+    parser.add_argument("--writers", type=int, default=8, help="写线程数")
+    parser.add_argument("--readers", type=int, default=2, help="读线程数")
+    parser.add_argument("--ops", type=int, default=300, help="每个写线程的写入次数")
+    parser.add_argument(
+        "--profiles", nargs="+", default=["default", "production"], help="对比的配置档"
+    )
+    args = parser.parse_args()
+
+    workdir = prepare_environment()
+    for profile in args.profiles:
+        run_profile(profile, args.writers, args.readers, args.ops, workdir)
+
+
+if __name__ == "__main__":
+    main()
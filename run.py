@@ -1,35 +1,50 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 """
-本地便捷启动脚本
+启动脚本
 
 公开接口：
-- 直接运行该脚本启动 uvicorn
+- python run.py                # APP_ENV=prod 时为生产模式，否则为开发模式
+- python run.py --mode dev     # 单进程 + 热重载
+- python run.py --mode prod    # 主进程执行迁移/建表后启动多个工作进程
+- python run.py --profile-startup  # 输出冷启动耗时报告（导入耗时 + 启动阶段）后退出
 
 内部方法：
 - 无
 """
 
-import uvicorn
+import argparse
 import os
 from dotenv import load_dotenv
 from pathlib import Path
 from loguru import logger
 
-from src.server.logging_config import setup_logging
-
 if __name__ == "__main__":
     load_dotenv(Path.cwd() / ".env")
+
+    from src.server.logging_config import setup_logging
+    from src.server.process_manager import run_server
+
+    parser = argparse.ArgumentParser(description="Fullstack Template 启动脚本")
+    parser.add_argument(
+        "--mode",
+        choices=["dev", "prod"],
+        default="prod" if os.getenv("APP_ENV") == "prod" else "dev",
+        help="dev：单进程热重载；prod：多工作进程",
+    )
+    parser.add_argument(
+        "--profile-startup", action="store_true", help="输出冷启动耗时报告后退出"
+    )
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        from src.server.startup_profile import profile_startup
+
+        print(profile_startup())
+        raise SystemExit(0)
+
     setup_logging()
     logger.info("Fullstack Template 启动！")
-    logger.info(f"当前应用环境：{os.getenv('APP_ENV')}")
-
-    uvicorn.run(
-        "src.server.main:app",
-        host="0.0.0.0",
-        port=int(os.getenv("PORT", "8000")),
-        reload=True,
-        log_level=os.getenv("LOG_LEVEL", "info").lower(),
-        access_log=False,
-        log_config=None,
-    )
+    logger.info(f"当前应用环境：{os.getenv('APP_ENV')}，启动模式：{args.mode}")
+
+    run_server(args.mode)
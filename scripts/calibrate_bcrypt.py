@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按目标校验耗时选取 bcrypt cost 的 CLI
+
+用法：
+- python scripts/calibrate_bcrypt.py                   # 目标 250 ms
+- python scripts/calibrate_bcrypt.py --target-ms 100   # 自定义目标
+- python scripts/calibrate_bcrypt.py --min-rounds 8 --max-rounds 14
+
+说明：
+- 在当前机器上逐级测量 bcrypt 校验耗时，输出各级耗时与推荐的 `BCRYPT_ROUNDS`。
+- 应在与生产相同规格的机器上运行；修改 cost 后旧哈希会在用户下次登录成功时自动重新计算。
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.server.auth.config import auth_config
+from src.server.auth.models import calibrate_rounds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="bcrypt cost 校准工具")
+    parser.add_argument(
+        "--target-ms", type=float, default=250.0, help="单次密码校验的目标耗时（毫秒）"
+    )
+    parser.add_argument("--min-rounds", type=int, default=10, help="最小 cost")
+    parser.add_argument("--max-rounds", type=int, default=16, help="最大 cost")
+    args = parser.parse_args()
+
+    chosen, timings = calibrate_rounds(
+        args.target_ms, min_rounds=args.min_rounds, max_rounds=args.max_rounds
+    )
+    for rounds, elapsed_ms in timings.items():
+        marker = " <- 推荐" if rounds == chosen else ""
+        print(f"cost {rounds:>2}: {elapsed_ms:8.1f} ms{marker}")
+    if timings[chosen] > args.target_ms:
+        print(f"提示：最小 cost {chosen} 已超过目标耗时 {args.target_ms:.0f} ms")
+    print(f"当前配置 BCRYPT_ROUNDS={auth_config.bcrypt_rounds}")
+    print(f"BCRYPT_ROUNDS={chosen}")
+
+
+if __name__ == "__main__":
+    main()
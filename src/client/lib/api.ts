@@ -22,7 +22,7 @@ function shouldSkipRefresh(url?: string): boolean {
   if (!url) {
     return false
   }
-  const blocked = ['/auth/login', '/auth/register', '/auth/refresh']
+  const blocked = ['/auth/login', '/auth/register', '/auth/refresh', '/auth/logout']
   return blocked.some((path) => url.includes(path))
 }
 
@@ -1,5 +1,5 @@
 import api from './api'
-import { setTokens, clearTokens } from './tokenStorage'
+import { setTokens, clearTokens, getRefreshToken } from './tokenStorage'
 import type {
   LoginPayload,
   PasswordChangePayload,
@@ -38,5 +38,12 @@ export async function changePassword(payload: PasswordChangePayload): Promise<{
 }
 
 export function logout(): void {
+  // 先取出刷新令牌再清空本地存储；服务端吊销失败不影响本地退出
+  const refreshToken = getRefreshToken()
+  if (refreshToken) {
+    api
+      .post('/auth/logout', null, { headers: { Authorization: `Bearer ${refreshToken}` } })
+      .catch(() => undefined)
+  }
   clearTokens()
 }
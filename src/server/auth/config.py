@@ -6,6 +6,8 @@
 - `auth_config`
 """
 
+import os
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -41,6 +43,96 @@ class AuthConfig(BaseSettings):
         title="初始化管理员邮箱",
         description="生产务必通过环境变量覆盖",
     )
+    bcrypt_rounds: int = Field(
+        default=12,
+        ge=4,
+        le=31,
+        title="bcrypt cost",
+        description=(
+            "每加 1 校验耗时翻倍；可用 scripts/calibrate_bcrypt.py 按目标耗时选取，"
+            "cost 不同的旧哈希会在下次登录成功时重新计算"
+        ),
+    )
+    password_hash_executor: str = Field(
+        default="thread",
+        title="密码哈希执行器类型",
+        description="thread 或 process；bcrypt 会释放 GIL，一般 thread 即可",
+    )
+    password_hash_workers: int = Field(
+        default_factory=lambda: min(4, os.cpu_count() or 1),
+        title="密码哈希工作者数量",
+        description="为 0 时在事件循环中直接执行（仅用于调试/基准对比）",
+    )
+    password_hash_queue_size: int = Field(
+        default=64,
+        title="密码哈希排队上限",
+        description="超过 工作者数量 + 排队上限 的并发请求直接返回 503",
+    )
+    user_cache_ttl_seconds: float = Field(
+        default=60.0,
+        title="已认证用户缓存 TTL(秒)",
+        description="为 0 时禁用缓存；多进程部署下也是跨进程变更的最大可见延迟",
+    )
+    user_cache_max_entries: int = Field(
+        default=10000,
+        title="已认证用户缓存条目上限",
+        description="按 LRU 淘汰；为 0 时禁用缓存",
+    )
+    revocation_sync_seconds: float = Field(
+        default=5.0,
+        title="吊销列表同步间隔(秒)",
+        description="从数据库增量拉取其他进程吊销的令牌家族；为 0 时只在启动时加载",
+    )
+    revocation_bloom_capacity: int = Field(
+        default=100000,
+        title="吊销布隆过滤器容量",
+        description="超过容量后在下一次同步时全量重建",
+    )
+    revocation_bloom_error_rate: float = Field(
+        default=0.001,
+        title="吊销布隆过滤器误判率",
+    )
+    revocation_exact_max_entries: int = Field(
+        default=10000,
+        title="吊销精确集合条目上限",
+        description="溢出后布隆过滤器命中的请求需要回库确认",
+    )
+    login_rate_limit_enabled: bool = Field(
+        default=True,
+        title="是否启用登录限流",
+    )
+    login_ip_burst: int = Field(
+        default=20,
+        title="单个 IP 的登录突发次数",
+        description="令牌桶容量",
+    )
+    login_ip_per_minute: float = Field(
+        default=20.0,
+        title="单个 IP 每分钟回填的登录次数",
+    )
+    login_username_burst: int = Field(
+        default=10,
+        title="单个用户名的登录突发次数",
+        description="登录成功后该用户名的桶会被重置",
+    )
+    login_username_per_minute: float = Field(
+        default=5.0,
+        title="单个用户名每分钟回填的登录次数",
+    )
+    login_rate_limit_store: str = Field(
+        default="memory",
+        title="登录限流存储",
+        description="memory：每个进程独立计数；sqlite：多个工作进程共享计数",
+    )
+    login_rate_limit_sqlite_path: str = Field(
+        default="data/rate_limit.db",
+        title="登录限流 SQLite 文件",
+        description="相对项目根目录；仅 sqlite 存储使用，与业务数据库分开避免写锁竞争",
+    )
+    login_rate_limit_max_keys: int = Field(
+        default=100000,
+        title="登录限流进程内键数量上限",
+    )
 
 
 auth_config = AuthConfig()
@@ -4,34 +4,67 @@
 
 公开接口：
 - `UserDAO`
+- `AsyncUserDAO`：基于 `AsyncSession` 的异步版本
+- `AsyncRefreshTokenDAO`：刷新令牌的签发、轮转、吊销与吊销列表加载
+- `user_cache_tag(user_id)`：GET 响应缓存中该用户相关响应的失效标签
+- `user_entity_cache`：按 id / username 缓存 `CurrentUser` 快照的实体缓存，`UserDAO` 与 `AsyncUserDAO` 共用
 
 内部方法：
 - 无
 
 说明：
 - 提供用户读取/写入的持久化封装，业务逻辑放在 service。
+- `create`、`update` 提交后失效该用户的实体缓存；`update` 还会失效已认证用户缓存与响应缓存
+  （资料、密码、角色/状态变更均经此处）。基类的批量写（`upsert_many`、`delete_many`）
+  经 `_after_bulk_write` 对每个受影响的用户做同样的失效。
+- 刷新令牌轮转使用带条件的 UPDATE（未被替换且未吊销），并发的重复使用只有一个能成功。
+- `refresh_tokens.user_id` 不设外键，删除用户前由 service 层调用 `delete_for_users` 清理其令牌。
 """
 
 from __future__ import annotations
 
+from datetime import datetime, timezone
+from typing import Sequence
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.server.dao.dao_base import BaseDAO
-from .models import User
+from src.server.dao.dao_base import AsyncBaseDAO, BaseDAO, EntityCache
+from src.server.response_cache import response_cache
+from .models import RefreshToken, User
+from .schemas import CurrentUser
+from .user_cache import user_cache
+
+
+def user_cache_tag(user_id: int) -> str:
+    return f"user:{user_id}"
+
 
+user_entity_cache = EntityCache(User, CurrentUser, unique_keys=("username",))
+
+
+class UserDAO(BaseDAO[User]):
+    model = User
+    entity_cache = user_entity_cache
 
-class UserDAO(BaseDAO):
     def __init__(self, db_session: Session):
         super().__init__(db_session)
 
+    def _after_bulk_write(self, pk_values: Sequence[int]) -> None:
+        for user_id in pk_values:
+            user_cache.invalidate_user(user_id)
+            response_cache.invalidate_tags(user_cache_tag(user_id))
+
     def get_by_username(self, username: str) -> User | None:
-        return self.db_session.query(User).filter(User.username == username).first()
+        return self.get_by(username=username)
 
     def create(self, username: str, email: str, password_hash: str) -> User:
         user = User(username=username, email=email, password_hash=password_hash)
         self.db_session.add(user)
         self.db_session.commit()
         self.db_session.refresh(user)
+        self._invalidate_cached(user)
         return user
 
     def update(self, user: User, **fields) -> User:
@@ -39,4 +72,127 @@ class UserDAO(BaseDAO):
             setattr(user, k, v)
         self.db_session.commit()
         self.db_session.refresh(user)
+        self._invalidate_cached(user)
+        self._after_bulk_write([user.id])
+        return user
+
+
+class AsyncUserDAO(AsyncBaseDAO[User]):
+    model = User
+    entity_cache = user_entity_cache
+
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session)
+
+    def _after_bulk_write(self, pk_values: Sequence[int]) -> None:
+        for user_id in pk_values:
+            user_cache.invalidate_user(user_id)
+            response_cache.invalidate_tags(user_cache_tag(user_id))
+
+    async def get_by_username(self, username: str) -> User | None:
+        return await self.get_by(username=username)
+
+    async def get_by_email(self, email: str) -> User | None:
+        return await self.get_by(email=email)
+
+    async def create(self, username: str, email: str, password_hash: str) -> User:
+        user = User(username=username, email=email, password_hash=password_hash)
+        self.db_session.add(user)
+        await self.db_session.commit()
+        await self.db_session.refresh(user)
+        self._invalidate_cached(user)
+        return user
+
+    async def update(self, user: User, **fields) -> User:
+        for k, v in fields.items():
+            setattr(user, k, v)
+        await self.db_session.commit()
+        await self.db_session.refresh(user)
+        self._invalidate_cached(user)
+        self._after_bulk_write([user.id])
         return user
+
+
+class AsyncRefreshTokenDAO(AsyncBaseDAO[RefreshToken]):
+    model = RefreshToken
+
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session)
+
+    async def create(
+        self, jti: str, family_id: str, user_id: int, expires_at: datetime
+    ) -> RefreshToken:
+        token = RefreshToken(
+            jti=jti, family_id=family_id, user_id=user_id, expires_at=expires_at
+        )
+        self.db_session.add(token)
+        await self.db_session.commit()
+        return token
+
+    async def rotate(
+        self, jti: str, new_jti: str, family_id: str, user_id: int, expires_at: datetime
+    ) -> bool:
+        """将 `jti` 标记为被 `new_jti` 替换并写入新令牌；`jti` 已被使用或已吊销时返回 False。"""
+        result = await self.db_session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.replaced_by.is_(None),
+                RefreshToken.revoked_at.is_(None),
+            )
+            .values(replaced_by=new_jti)
+        )
+        if result.rowcount != 1:
+            return False
+        self.db_session.add(
+            RefreshToken(
+                jti=new_jti, family_id=family_id, user_id=user_id, expires_at=expires_at
+            )
+        )
+        await self.db_session.commit()
+        return True
+
+    async def revoke_family(self, family_id: str) -> int | None:
+        """吊销整个令牌家族，返回所属用户 id；家族不存在或已吊销时返回 None。"""
+        result = await self.db_session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+            .returning(RefreshToken.user_id)
+        )
+        user_ids = result.scalars().all()
+        await self.db_session.commit()
+        return user_ids[0] if user_ids else None
+
+    async def delete_for_users(self, user_ids: Sequence[int]) -> int:
+        """删除这些用户的全部刷新令牌并提交，返回删除的行数。"""
+        result = await self.db_session.execute(
+            delete(RefreshToken).where(RefreshToken.user_id.in_(user_ids))
+        )
+        await self.db_session.commit()
+        return result.rowcount
+
+    async def is_family_revoked(self, family_id: str) -> bool:
+        result = await self.db_session.execute(
+            select(RefreshToken.jti)
+            .where(
+                RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_not(None)
+            )
+            .limit(1)
+        )
+        return result.first() is not None
+
+    async def list_revoked_families(
+        self, since: datetime | None = None
+    ) -> list[tuple[str, int]]:
+        """返回 (family_id, user_id)：`since` 为空时为全部未过期的已吊销家族，否则为此后新吊销的家族。"""
+        stmt = select(RefreshToken.family_id, RefreshToken.user_id).distinct()
+        if since is None:
+            stmt = stmt.where(
+                RefreshToken.revoked_at.is_not(None),
+                RefreshToken.expires_at > datetime.now(timezone.utc),
+            )
+        else:
+            stmt = stmt.where(RefreshToken.revoked_at >= since)
+        result = await self.db_session.execute(stmt)
+        return [(family_id, user_id) for family_id, user_id in result.all()]
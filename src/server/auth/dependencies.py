@@ -6,26 +6,32 @@
     提供认证相关的依赖注入函数，用于验证用户身份和权限
 
 公开接口：
-    - get_current_user: 验证当前用户的身份并返回用户对象
+    - get_current_user: 验证当前用户的身份并返回用户快照
 
 内部方法：
     - 无内部方法
 
 公开接口的 pydantic 模型：
-    - 无需 pydantic 模型，直接返回 User 对象
+    - CurrentUser: 脱离会话的用户快照；需要写入时请按 id 重新加载 ORM 对象
+
+说明：
+    - 令牌命中 `user_cache` 时不再解码 JWT，也不访问数据库
+    - 未命中时按用户名经 DAO 实体缓存读取快照，同一用户的新令牌通常也不需要查库
+    - 刷新令牌不能当作访问令牌使用；令牌家族已吊销时返回 401（吊销会同时失效用户缓存）
 """
 
 from __future__ import annotations
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.server.database import get_db
+from src.server.database import get_async_db
 from src.server.config import global_config
 from .config import auth_config
-from .models import User
+from .dao import AsyncUserDAO
+from .schemas import CurrentUser
+from .user_cache import user_cache
 from . import service
 
 # OAuth2 密码持有者令牌方案
@@ -33,17 +39,17 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
-) -> User:
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
     """
     验证当前用户的身份并返回用户对象
 
     参数:
         token: JWT 访问令牌
-        db: 数据库会话
+        db: 异步数据库会话（与路由共享同一请求内的会话）
 
     返回:
-        User: 当前用户对象
+        CurrentUser: 当前用户快照
 
     异常:
         HTTPException: 当令牌无效或用户不存在时抛出 401 未授权异常
@@ -56,22 +62,37 @@ async def get_current_user(
 
     # 开发和测试环境下的特殊处理
     if global_config.app_env in ["dev", "test"] and token == auth_config.test_token:
-        user = db.query(User).filter(User.id == 1).first()
+        user = await AsyncUserDAO(db).get_cached(1)
         if user:
             return user
         raise credentials_exception
 
+    cached_user = user_cache.get(token)
+    if cached_user is not None:
+        return cached_user
+
+    # 延迟导入：jose 只在缓存未命中时需要，不计入冷启动
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, auth_config.jwt_secret_key, algorithms=[auth_config.jwt_algorithm]
         )
         username: str | None = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("typ") == "refresh":
             raise credentials_exception
     except JWTError:
         raise credentials_exception
 
-    user = service.get_user_by_username(db, username=username)
-    if user is None:
+    # 内存中的吊销列表检查，不额外访问数据库；未携带 fid 的旧令牌不受影响
+    family_id = payload.get("fid")
+    if family_id and await service.is_token_family_revoked_async(db, family_id):
+        raise credentials_exception
+
+    # 在读取之前取序号：读取期间发生的失效会使本次结果不被缓存
+    generation = user_cache.generation()
+    current_user = await service.get_user_snapshot_by_username_async(db, username)
+    if current_user is None:
         raise credentials_exception
-    return user
+    user_cache.put(token, payload, current_user, generation)
+    return current_user
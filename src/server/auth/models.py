@@ -4,6 +4,10 @@
 
 公开接口：
 - `User`
+- `RefreshToken`：已签发的刷新令牌（按 jti 主键），同一登录会话的轮转链共享 `family_id`
+- `hash_password`、`verify_password`：无状态的 bcrypt 函数（可在线程/进程池中执行）
+- `hash_rounds`、`needs_rehash`：读取哈希中的 cost，判断是否与配置的 `BCRYPT_ROUNDS` 不一致
+- `measure_verify_ms`、`calibrate_rounds`：测量本机 bcrypt 校验耗时并选出目标 cost
 
 内部方法：
 - `set_password`、`check_password`
@@ -12,15 +16,80 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Optional
+from time import perf_counter
+from typing import Callable, Optional
 
 from sqlalchemy import String, Integer, DateTime, Text, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.server.database import Base
+from .config import auth_config
 from .schemas import UserRole, UserStatus
 import bcrypt
 
+MIN_BCRYPT_ROUNDS = 4
+MAX_BCRYPT_ROUNDS = 31
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    """生成 bcrypt 密码哈希，cost 默认取 `BCRYPT_ROUNDS`。"""
+    salt = bcrypt.gensalt(rounds=rounds or auth_config.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """校验明文密码与哈希是否匹配，哈希格式异常时返回 False。"""
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+    except Exception:
+        return False
+
+
+def hash_rounds(password_hash: str) -> int | None:
+    """解析 `$2b$12$...` 中的 cost，格式不符时返回 None。"""
+    parts = password_hash.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(password_hash: str, rounds: int | None = None) -> bool:
+    """哈希的 cost 与目标 cost 不同（或无法解析）时返回 True。"""
+    return hash_rounds(password_hash) != (rounds or auth_config.bcrypt_rounds)
+
+
+def measure_verify_ms(rounds: int, samples: int = 3) -> float:
+    """在本机测量给定 cost 下一次 bcrypt 校验的耗时（毫秒，取中位数）。"""
+    password = b"bcrypt-calibration"
+    hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+    timings = []
+    for _ in range(samples):
+        started = perf_counter()
+        bcrypt.checkpw(password, hashed)
+        timings.append((perf_counter() - started) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_rounds(
+    target_ms: float,
+    min_rounds: int = 10,
+    max_rounds: int = 16,
+    measure: Callable[[int], float] = measure_verify_ms,
+) -> tuple[int, dict[int, float]]:
+    """
+    从 `min_rounds` 起逐级测量，返回校验耗时不超过 `target_ms` 的最大 cost 及各级耗时。
+
+    cost 每加 1 耗时翻倍，超过目标后即停止测量；`min_rounds` 本身超过目标时仍返回 `min_rounds`。
+    """
+    timings: dict[int, float] = {}
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        timings[rounds] = measure(rounds)
+        if timings[rounds] > target_ms:
+            break
+        chosen = rounds
+    return chosen, timings
+
 
 class User(Base):
     __tablename__ = "users"
@@ -44,15 +113,27 @@ class User(Base):
     )
 
     def set_password(self, password: str) -> None:
-        salt = bcrypt.gensalt()
-        self.password_hash = bcrypt.hashpw(password.encode("utf-8"), salt).decode(
-            "utf-8"
-        )
+        self.password_hash = hash_password(password)
 
     def check_password(self, password: str) -> bool:
-        try:
-            return bcrypt.checkpw(
-                password.encode("utf-8"), self.password_hash.encode("utf-8")
-            )
-        except Exception:
-            return False
+        return verify_password(password, self.password_hash)
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    family_id: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    # 不使用外键：删除用户时由 service 层显式删除其刷新令牌（见 `delete_users_async`）
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # 轮转后指向新令牌；已被替换的令牌再次使用即视为泄露
+    replaced_by: Mapped[Optional[str]] = mapped_column(String(32), default=None)
+    revoked_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), default=None, index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+登录限流：令牌桶（模板版）
+
+公开接口：
+- `TokenBucketLimiter`：分片的进程内令牌桶，按键（IP / 用户名）限流
+- `SQLiteBucketStore`：基于独立 SQLite 文件的令牌桶，多个工作进程共享同一份计数
+- `LoginRateLimiter`：按 IP 与用户名两个维度检查登录尝试
+- `login_rate_limiter`：按 `AuthConfig` 创建的全局实例
+- `LOGIN_RATE_LIMITED`：被拒绝的登录尝试计数指标（按维度）
+
+内部方法：
+- `_Shard`
+
+说明：
+- 检查发生在读取用户与 bcrypt 校验之前，被拒绝的请求只做一次字典查找（或一条 SQLite 语句）。
+- 每个键一个令牌桶：容量为允许的突发次数，按固定速率回填；拒绝不扣令牌。
+- 登录成功后重置该用户名的桶，正常用户不会因为之前输错几次而被持续限制。
+- 进程内模式下键数量有上限：超出时优先淘汰已回满的桶，其次淘汰最久未使用的桶。
+- SQLite 模式使用单条 `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` 原子完成回填与扣减，
+  在线程池中执行，不阻塞事件循环。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Protocol
+
+from src.server.config import global_config
+from src.server.metrics import registry
+from .config import auth_config
+
+LOGIN_RATE_LIMITED = registry.counter(
+    "auth_login_rate_limited_total", "因限流被拒绝的登录尝试数", ("scope",)
+)
+
+
+class BucketStore(Protocol):
+    def acquire(self, key: str) -> float: ...
+
+    def reset(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets")
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # 键 -> [剩余令牌, 上次更新时间]；按最近使用排序（更新时重新插入到末尾）
+        self.buckets: dict[str, list[float]] = {}
+
+
+class TokenBucketLimiter:
+    """分片的进程内令牌桶，线程安全。"""
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        shards: int = 16,
+        max_keys: int = 100000,
+    ):
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self.max_keys_per_shard = max(1, max_keys // shards)
+        self._shards = [_Shard() for _ in range(shards)]
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def acquire(self, key: str) -> float:
+        """尝试取一个令牌：成功返回 0，否则返回需要等待的秒数。"""
+        now = time.monotonic()
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.pop(key, None)
+            if bucket is None:
+                tokens = self.capacity
+            else:
+                tokens = min(
+                    self.capacity,
+                    bucket[0] + (now - bucket[1]) * self.refill_per_second,
+                )
+            if tokens >= 1:
+                retry_after = 0.0
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / self.refill_per_second
+            shard.buckets[key] = [tokens, now]
+            if len(shard.buckets) > self.max_keys_per_shard:
+                self._evict(shard, now)
+        return retry_after
+
+    def _evict(self, shard: _Shard, now: float) -> None:
+        full_after = self.capacity / self.refill_per_second
+        for key in [k for k, (_, at) in shard.buckets.items() if now - at >= full_after]:
+            del shard.buckets[key]
+        while len(shard.buckets) > self.max_keys_per_shard:
+            del shard.buckets[next(iter(shard.buckets))]
+
+    def reset(self, key: str) -> None:
+        shard = self._shard(key)
+        with shard.lock:
+            shard.buckets.pop(key, None)
+
+    def clear(self) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                shard.buckets.clear()
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+
+class SQLiteBucketStore:
+    """多个工作进程共享的令牌桶，存放在独立的 SQLite 文件中。"""
+
+    _ACQUIRE_SQL = """
+        INSERT INTO {table} (key, tokens, updated_at, allowed)
+        VALUES (:key, :capacity - 1, :now, 1)
+        ON CONFLICT (key) DO UPDATE SET
+            tokens = CASE
+                WHEN MIN(:capacity, tokens + (:now - updated_at) * :rate) >= 1
+                THEN MIN(:capacity, tokens + (:now - updated_at) * :rate) - 1
+                ELSE MIN(:capacity, tokens + (:now - updated_at) * :rate)
+            END,
+            allowed = MIN(:capacity, tokens + (:now - updated_at) * :rate) >= 1,
+            updated_at = :now
+        RETURNING tokens, allowed
+    """
+
+    # 每执行多少次 acquire 清理一次已回满的桶
+    CLEANUP_INTERVAL = 1000
+
+    def __init__(
+        self, path: Path, table: str, capacity: float, refill_per_second: float
+    ):
+        self.path = Path(path)
+        self.table = table
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._acquire_sql = self._ACQUIRE_SQL.format(table=table)
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程一个连接，首次使用时建表。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated_at REAL NOT NULL, allowed INTEGER NOT NULL)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def acquire(self, key: str) -> float:
+        # 使用墙上时钟：多个进程之间 monotonic 不可比较
+        now = time.time()
+        conn = self._connect()
+        tokens, allowed = conn.execute(
+            self._acquire_sql,
+            {
+                "key": key,
+                "capacity": self.capacity,
+                "rate": self.refill_per_second,
+                "now": now,
+            },
+        ).fetchone()
+        self._calls += 1
+        if self._calls % self.CLEANUP_INTERVAL == 0:
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE updated_at < ?",
+                (now - self.capacity / self.refill_per_second,),
+            )
+        return 0.0 if allowed else (1 - tokens) / self.refill_per_second
+
+    def reset(self, key: str) -> None:
+        self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        self._connect().execute(f"DELETE FROM {self.table}")
+
+
+class LoginRateLimiter:
+    """登录尝试限流：IP 与用户名各一组令牌桶，任一耗尽即拒绝。"""
+
+    def __init__(
+        self, by_ip: BucketStore, by_username: BucketStore, offload: bool = False
+    ):
+        self.by_ip = by_ip
+        self.by_username = by_username
+        # SQLite 存储会做文件 I/O，放到线程池中执行
+        self.offload = offload
+
+    def _check(self, client_ip: str, username: str) -> tuple[str, float] | None:
+        retry_after = self.by_ip.acquire(client_ip)
+        if retry_after > 0:
+            return "ip", retry_after
+        retry_after = self.by_username.acquire(username.lower())
+        if retry_after > 0:
+            return "username", retry_after
+        return None
+
+    async def check(self, client_ip: str, username: str) -> tuple[str, float] | None:
+        """返回 (被限流的维度, 建议等待秒数)；允许时返回 None。"""
+        if self.offload:
+            rejected = await asyncio.to_thread(self._check, client_ip, username)
+        else:
+            rejected = self._check(client_ip, username)
+        if rejected is not None:
+            LOGIN_RATE_LIMITED.inc(rejected[0])
+        return rejected
+
+    async def login_succeeded(self, username: str) -> None:
+        if self.offload:
+            await asyncio.to_thread(self.by_username.reset, username.lower())
+        else:
+            self.by_username.reset(username.lower())
+
+    def clear(self) -> None:
+        self.by_ip.clear()
+        self.by_username.clear()
+
+
+def _create_login_rate_limiter() -> LoginRateLimiter:
+    ip_limits = (
+        auth_config.login_ip_burst,
+        auth_config.login_ip_per_minute / 60,
+    )
+    username_limits = (
+        auth_config.login_username_burst,
+        auth_config.login_username_per_minute / 60,
+    )
+    if auth_config.login_rate_limit_store == "sqlite":
+        path = global_config.project_root / auth_config.login_rate_limit_sqlite_path
+        return LoginRateLimiter(
+            SQLiteBucketStore(path, "login_buckets_ip", *ip_limits),
+            SQLiteBucketStore(path, "login_buckets_username", *username_limits),
+            offload=True,
+        )
+    max_keys = auth_config.login_rate_limit_max_keys
+    return LoginRateLimiter(
+        TokenBucketLimiter(*ip_limits, max_keys=max_keys),
+        TokenBucketLimiter(*username_limits, max_keys=max_keys),
+    )
+
+
+login_rate_limiter = _create_login_rate_limiter()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+刷新令牌吊销列表（模板版）
+
+公开接口：
+- `BloomFilter`：定长位数组的布隆过滤器
+- `RevocationList`：已吊销令牌家族（family_id）的进程内集合
+- `revocation_list`：进程内全局实例
+
+内部方法：
+- 无
+
+说明：
+- 访问令牌与刷新令牌都携带 `fid`（令牌家族 id）；家族被吊销后其中所有令牌都失效。
+- `check` 是纯内存操作：布隆过滤器未命中即未吊销（绝大多数请求）；命中时查精确集合。
+  精确集合有上限，溢出后布隆命中但精确集合未命中的少数请求才需要回库确认。
+- 启动时从数据库全量加载未过期的已吊销家族，之后由本进程的吊销操作与定时增量同步更新；
+  其他进程中的吊销最多延迟一个同步周期生效。
+- 布隆过滤器不支持删除，元素数超过容量后由下一次同步全量重建（过期家族随之移除）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from .config import auth_config
+from .user_cache import user_cache
+
+
+class BloomFilter:
+    """按容量与误判率确定位数与哈希次数的布隆过滤器。"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> list[int]:
+        # 双重哈希：一次 blake2b 摘要派生出 k 个位置
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+
+class RevocationList:
+    """已吊销令牌家族集合：布隆过滤器 + 有上限的精确集合，线程安全。"""
+
+    def __init__(self, capacity: int, error_rate: float, exact_max_entries: int):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.exact_max_entries = exact_max_entries
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._exact: OrderedDict[str, None] = OrderedDict()
+        # 精确集合从未溢出时，布隆命中而精确集合未命中可直接判定为误判
+        self._exact_complete = True
+
+    @property
+    def needs_rebuild(self) -> bool:
+        return self._bloom.count > self.capacity
+
+    def load(self, family_ids: Iterable[str]) -> None:
+        """用全量的已吊销家族重建集合（启动时与容量溢出后调用）。"""
+        with self._lock:
+            self._reset()
+            for family_id in family_ids:
+                self._add_locked(family_id)
+
+    def add(self, family_id: str, user_id: int | None = None) -> None:
+        """记录一个已吊销家族，并失效该用户的已认证用户缓存（缓存命中时不再检查吊销）。"""
+        with self._lock:
+            added = self._add_locked(family_id)
+        if added and user_id is not None:
+            user_cache.invalidate_user(user_id)
+
+    def _add_locked(self, family_id: str) -> bool:
+        if family_id in self._exact:
+            return False
+        self._bloom.add(family_id)
+        self._exact[family_id] = None
+        if len(self._exact) > self.exact_max_entries:
+            self._exact.popitem(last=False)
+            self._exact_complete = False
+        return True
+
+    def check(self, family_id: str) -> bool | None:
+        """返回 True（已吊销）/ False（未吊销）/ None（无法在内存中确定，需要回库确认）。"""
+        if family_id not in self._bloom:
+            return False
+        if family_id in self._exact:
+            return True
+        return False if self._exact_complete else None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reset()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "bloom_entries": self._bloom.count,
+                "bloom_bits": self._bloom.size,
+                "exact_entries": len(self._exact),
+            }
+
+
+revocation_list = RevocationList(
+    capacity=auth_config.revocation_bloom_capacity,
+    error_rate=auth_config.revocation_bloom_error_rate,
+    exact_max_entries=auth_config.revocation_exact_max_entries,
+)
@@ -6,21 +6,33 @@
 - POST /api/auth/login
 - POST /api/auth/register
 - POST /api/auth/refresh
+- POST /api/auth/logout
 - GET /api/auth/profile
 - PUT /api/auth/profile
 - PUT /api/auth/password
+
+说明：
+- 本路由器整体使用 `get_async_db` + `AsyncUserDAO`，数据库 I/O 不阻塞事件循环。
+- `get_current_user` 返回缓存的用户快照，写操作前需按 id 重新加载 ORM 对象。
+- `/refresh`、`/logout` 从 Authorization 头读取刷新令牌（`/logout` 也接受访问令牌）。
+- `/login` 在读取用户与 bcrypt 校验之前按 IP 与用户名限流，超限直接返回 429。
+- `GET /profile` 按用户缓存序列化结果并支持条件请求，用户更新时由 DAO 按标签失效。
 """
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.server.database import get_db
-from .dependencies import get_current_user
+from src.server.database import get_async_db
+from src.server.response_cache import cached_get
+from src.server.responses import model_response
+from .dao import AsyncUserDAO, user_cache_tag
+from .dependencies import get_current_user, oauth2_scheme
 from .models import User
 from . import service
 from .schemas import (
+    CurrentUser,
     PasswordChange,
     TokenResponse,
     UserCreate,
@@ -32,6 +44,18 @@ from .schemas import (
 router = APIRouter(prefix="/api/auth", tags=["认证"])
 
 
+async def _load_user_for_update(db: AsyncSession, current_user: CurrentUser) -> User:
+    """按快照 id 加载当前会话中的 ORM 对象，用户已被删除时返回 401。"""
+    user = await service.get_user_by_id_async(db, current_user.id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无法验证凭据",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
 @router.post(
     "/login",
     response_model=TokenResponse,
@@ -41,10 +65,18 @@ router = APIRouter(prefix="/api/auth", tags=["认证"])
     responses={
         200: {"description": "登录成功"},
         401: {"description": "用户名或密码错误"},
+        429: {"description": "登录尝试过于频繁"},
+        503: {"description": "密码校验繁忙，请稍后重试"},
     },
 )
-async def login_for_access_token(login_data: UserLogin, db: Session = Depends(get_db)):
-    user = service.authenticate_user(db, login_data.username, login_data.password)
+async def login_for_access_token(
+    login_data: UserLogin, request: Request, db: AsyncSession = Depends(get_async_db)
+):
+    client_ip = request.client.host if request.client else "-"
+    await service.check_login_rate_limit_async(client_ip, login_data.username)
+    user = await service.authenticate_user_async(
+        db, login_data.username, login_data.password
+    )
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,13 +84,8 @@ async def login_for_access_token(login_data: UserLogin, db: Session = Depends(ge
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = service.create_access_token(data={"sub": user.username})
-    refresh_token = service.create_refresh_token(data={"sub": user.username})
-    return {
-        "access_token": access_token,
-        "refresh_token": refresh_token,
-        "token_type": "bearer",
-    }
+    await service.reset_login_rate_limit_async(user.username)
+    return await service.issue_token_pair_async(db, user)
 
 
 @router.post(
@@ -73,13 +100,15 @@ async def login_for_access_token(login_data: UserLogin, db: Session = Depends(ge
         400: {"description": "用户名已被注册"},
     },
 )
-async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
-    db_user = service.get_user_by_username(db, username=user_data.username)
+async def register_user(
+    user_data: UserCreate, db: AsyncSession = Depends(get_async_db)
+):
+    db_user = await service.get_user_by_username_async(db, username=user_data.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="用户名已被注册"
         )
-    new_user = service.create_user(db=db, user_data=user_data)
+    new_user = await service.create_user_async(db=db, user_data=user_data)
     return new_user
 
 
@@ -87,23 +116,38 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
     "/refresh",
     response_model=TokenResponse,
     summary="刷新访问令牌",
-    description="使用刷新令牌获取新的访问令牌和刷新令牌对",
+    description=(
+        "使用刷新令牌（Authorization: Bearer）获取新的令牌对，旧刷新令牌随即失效；"
+        "重复使用已轮转的刷新令牌会吊销该登录会话的全部令牌"
+    ),
     response_description="返回新的访问令牌和刷新令牌",
     responses={
         200: {"description": "令牌刷新成功"},
-        401: {"description": "无效的刷新令牌"},
+        401: {"description": "无效、已使用或已吊销的刷新令牌"},
     },
 )
-async def refresh_access_token(current_user: User = Depends(get_current_user)):
-    new_access_token = service.create_access_token(data={"sub": current_user.username})
-    new_refresh_token = service.create_refresh_token(
-        data={"sub": current_user.username}
-    )
-    return {
-        "access_token": new_access_token,
-        "refresh_token": new_refresh_token,
-        "token_type": "bearer",
-    }
+async def refresh_access_token(
+    refresh_token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await service.rotate_refresh_token_async(db, refresh_token)
+
+
+@router.post(
+    "/logout",
+    summary="退出登录",
+    description="吊销令牌所属登录会话的全部访问令牌与刷新令牌",
+    response_description="返回退出结果信息",
+    responses={
+        200: {"description": "已退出登录"},
+        401: {"description": "无效的令牌"},
+    },
+)
+async def logout(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+):
+    await service.revoke_token_family_async(db, token)
+    return {"message": "已退出登录"}
 
 
 @router.get(
@@ -114,11 +158,22 @@ async def refresh_access_token(current_user: User = Depends(get_current_user)):
     response_description="返回当前用户的完整资料信息",
     responses={
         200: {"description": "获取用户资料成功"},
+        304: {"description": "资料未变化（条件请求）"},
         401: {"description": "未认证或令牌无效"},
     },
 )
-async def get_profile(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_profile(
+    request: Request, current_user: CurrentUser = Depends(get_current_user)
+):
+    async def _build():
+        return model_response(UserProfile, current_user)
+
+    return await cached_get(
+        request,
+        _build,
+        tags=[user_cache_tag(current_user.id)],
+        principal=str(current_user.id),
+    )
 
 
 @router.put(
@@ -135,16 +190,19 @@ async def get_profile(current_user: User = Depends(get_current_user)):
 )
 async def update_profile(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
     if user_data.email:
-        existing_user = db.query(User).filter(User.email == user_data.email).first()
+        existing_user = await AsyncUserDAO(db).get_by_email(user_data.email)
         if existing_user and existing_user.id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST, detail="邮箱已被使用"
             )
-    updated_user = service.update_user(db=db, user=current_user, user_data=user_data)
+    user = await _load_user_for_update(db, current_user)
+    updated_user = await service.update_user_async(
+        db=db, user=user, user_data=user_data
+    )
     return updated_user
 
 
@@ -161,12 +219,13 @@ async def update_profile(
 )
 async def change_current_user_password(
     password_data: PasswordChange,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    success = service.change_password(
+    user = await _load_user_for_update(db, current_user)
+    success = await service.change_password_async(
         db=db,
-        user=current_user,
+        user=user,
         old_password=password_data.old_password,
         new_password=password_data.new_password,
     )
@@ -4,6 +4,7 @@
 
 公开接口：
 - `UserProfile`、`UserCreate`、`UserUpdate`、`UserLogin`、`TokenResponse`、`PasswordChange`
+- `CurrentUser`：已认证用户的不可变快照（脱离会话，可安全缓存）
 """
 
 from enum import Enum
@@ -40,6 +41,17 @@ class UserProfile(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CurrentUser(BaseModel):
+    id: int
+    username: str
+    email: str
+    name: Optional[str] = None
+    role: UserRole
+    status: UserStatus
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
 class UserCreate(BaseModel):
     username: str = Field(..., min_length=3, max_length=50)
     email: EmailStr
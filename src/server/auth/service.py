@@ -6,23 +6,60 @@
 - get_user_by_username
 - authenticate_user
 - create_access_token / create_refresh_token
+- issue_token_pair_async / rotate_refresh_token_async / revoke_token_family_async：
+  有状态的刷新令牌签发、轮转（重放检测）与吊销
+- is_token_family_revoked_async：供 `get_current_user` 检查令牌家族是否已吊销
+- sync_revocations / run_revocation_sync：加载与增量同步进程内吊销列表
+- check_login_rate_limit_async / reset_login_rate_limit_async：登录限流（在 bcrypt 之前检查）
 - create_user / update_user / change_password
 - bootstrap_default_admin
+- hash_password_async / verify_password_async：在专用执行器中运行 bcrypt
+- get_user_by_username_async / get_user_by_id_async / authenticate_user_async
+- get_user_snapshot_by_username_async：经实体缓存返回 `CurrentUser` 快照
+- create_user_async / update_user_async / change_password_async：基于 `AsyncSession`
+- delete_users_async：删除用户，并显式删除其刷新令牌（`refresh_tokens` 不设外键）
+- shutdown_password_executor
+
+内部方法：
+- _get_password_executor / _run_password_task / _rehash_password_async
+- _decode_token / _token_pair
+
+说明：
+- jose 仅在签发/校验令牌时导入，不计入应用冷启动时间。
+- bcrypt 单次计算约 100~300 ms，路由中必须使用 *_async 版本，避免阻塞事件循环。
+- 登录成功时若哈希的 cost 与 `BCRYPT_ROUNDS` 不同，会用本次明文密码重新计算并保存（多一次哈希），
+  调整 cost 后整个用户群随登录逐步迁移，无需强制重置密码。
+- 执行器并发上限为 工作者数量 + 排队上限，超出时直接返回 503 以削峰。
+- 每次登录生成一个令牌家族（`fid`），刷新时轮转 jti；已被替换的刷新令牌再次出现即视为泄露，
+  整个家族被吊销。访问令牌同样携带 `fid`，吊销后立即失效（其他进程在下一次同步后生效）。
 """
 
 from __future__ import annotations
 
+import asyncio
+import math
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Any, Callable, Optional, Sequence
+from uuid import uuid4
 
-from jose import jwt
+from fastapi import HTTPException, status
 from loguru import logger
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
 
 from .config import auth_config
-from .models import User
-from .schemas import UserCreate, UserUpdate, UserRole
-from .dao import UserDAO
+from .models import User, hash_password, hash_rounds, needs_rehash, verify_password
+from .schemas import CurrentUser, UserCreate, UserUpdate, UserRole
+from .dao import AsyncRefreshTokenDAO, AsyncUserDAO, UserDAO
+from .rate_limit import login_rate_limiter
+from .revocation import revocation_list
+
+_password_executor: Executor | None = None
+_password_slots: threading.BoundedSemaphore | None = None
+_password_executor_lock = threading.Lock()
 
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
@@ -33,10 +70,14 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     user = get_user_by_username(db, username)
     if not user or not user.check_password(password):
         return None
+    if needs_rehash(user.password_hash):
+        UserDAO(db).update(user, password_hash=hash_password(password))
     return user
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=auth_config.access_token_ttl_minutes)
@@ -48,6 +89,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(days=auth_config.refresh_token_ttl_days)
@@ -58,6 +101,153 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     )
 
 
+def _invalid_token_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="无效的刷新令牌",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _decode_token(token: str) -> dict[str, Any] | None:
+    from jose import JWTError, jwt
+
+    try:
+        return jwt.decode(
+            token, auth_config.jwt_secret_key, algorithms=[auth_config.jwt_algorithm]
+        )
+    except JWTError:
+        return None
+
+
+def _token_pair(username: str, family_id: str, jti: str) -> dict[str, str]:
+    access_token = create_access_token(
+        data={"sub": username, "fid": family_id, "typ": "access"}
+    )
+    refresh_token = create_refresh_token(
+        data={"sub": username, "fid": family_id, "jti": jti, "typ": "refresh"}
+    )
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+    }
+
+
+def _refresh_expires_at() -> datetime:
+    return datetime.now(timezone.utc) + timedelta(days=auth_config.refresh_token_ttl_days)
+
+
+async def issue_token_pair_async(db: AsyncSession, user: User) -> dict[str, str]:
+    """登录时签发新的令牌家族，并记录其第一个刷新令牌。"""
+    username, user_id = user.username, user.id
+    family_id, jti = uuid4().hex, uuid4().hex
+    await AsyncRefreshTokenDAO(db).create(jti, family_id, user_id, _refresh_expires_at())
+    return _token_pair(username, family_id, jti)
+
+
+async def rotate_refresh_token_async(db: AsyncSession, token: str) -> dict[str, str]:
+    """用刷新令牌换取新的令牌对；重复使用已轮转的令牌会吊销整个家族。"""
+    claims = _decode_token(token)
+    if not claims or claims.get("typ") != "refresh":
+        raise _invalid_token_exception()
+    jti, family_id, username = claims.get("jti"), claims.get("fid"), claims.get("sub")
+    if not jti or not family_id or not username:
+        raise _invalid_token_exception()
+
+    dao = AsyncRefreshTokenDAO(db)
+    stored = await dao.get(jti)
+    if stored is None or stored.family_id != family_id:
+        raise _invalid_token_exception()
+    user_id = stored.user_id
+
+    new_jti = uuid4().hex
+    if not await dao.rotate(jti, new_jti, family_id, user_id, _refresh_expires_at()):
+        if await dao.revoke_family(family_id) is not None:
+            logger.warning(
+                f"检测到刷新令牌重放，已吊销令牌家族 {family_id}（用户 {user_id}）"
+            )
+        revocation_list.add(family_id, user_id)
+        raise _invalid_token_exception()
+    return _token_pair(username, family_id, new_jti)
+
+
+async def revoke_token_family_async(db: AsyncSession, token: str) -> None:
+    """吊销令牌所属的家族（退出登录），访问令牌与刷新令牌均可。"""
+    claims = _decode_token(token)
+    family_id = claims.get("fid") if claims else None
+    if not family_id:
+        raise _invalid_token_exception()
+    user_id = await AsyncRefreshTokenDAO(db).revoke_family(family_id)
+    revocation_list.add(family_id, user_id)
+
+
+async def is_token_family_revoked_async(db: AsyncSession, family_id: str) -> bool:
+    revoked = revocation_list.check(family_id)
+    if revoked is None:
+        # 布隆过滤器命中且精确集合已溢出：少数请求回库确认
+        revoked = await AsyncRefreshTokenDAO(db).is_family_revoked(family_id)
+    return revoked
+
+
+async def sync_revocations(
+    session_factory: async_sessionmaker[AsyncSession], since: datetime | None = None
+) -> datetime | None:
+    """
+    同步一次吊销列表：`since` 为空（或布隆过滤器超出容量）时全量加载，否则增量拉取。
+
+    返回下一次增量同步的起点；失败时返回传入的 `since`。
+    """
+    started = datetime.now(timezone.utc)
+    try:
+        async with session_factory() as db:
+            dao = AsyncRefreshTokenDAO(db)
+            if since is None or revocation_list.needs_rebuild:
+                families = await dao.list_revoked_families()
+                revocation_list.load(family_id for family_id, _ in families)
+            else:
+                for family_id, user_id in await dao.list_revoked_families(since):
+                    revocation_list.add(family_id, user_id)
+    except SQLAlchemyError as exc:
+        logger.warning(f"吊销列表同步失败：{exc}")
+        return since
+    # 留出 1 秒重叠，避免漏掉与本次查询并发提交的吊销
+    return started - timedelta(seconds=1)
+
+
+async def run_revocation_sync(
+    session_factory: async_sessionmaker[AsyncSession], since: datetime | None
+) -> None:
+    """按 `REVOCATION_SYNC_SECONDS` 周期增量同步（在 lifespan 中作为后台任务运行）。"""
+    interval = auth_config.revocation_sync_seconds
+    if interval <= 0:
+        return
+    while True:
+        await asyncio.sleep(interval)
+        since = await sync_revocations(session_factory, since)
+
+
+async def check_login_rate_limit_async(client_ip: str, username: str) -> None:
+    """登录尝试超过 IP 或用户名维度的限额时抛出 429，不读取用户、不计算 bcrypt。"""
+    if not auth_config.login_rate_limit_enabled:
+        return
+    rejected = await login_rate_limiter.check(client_ip, username)
+    if rejected is None:
+        return
+    _, retry_after = rejected
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="登录尝试过于频繁，请稍后重试",
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+async def reset_login_rate_limit_async(username: str) -> None:
+    """登录成功后重置该用户名的限流桶。"""
+    if auth_config.login_rate_limit_enabled:
+        await login_rate_limiter.login_succeeded(username)
+
+
 def create_user(db: Session, user_data: UserCreate) -> User:
     # 先构造密码哈希
     tmp_user = User(username=user_data.username, email=user_data.email)
@@ -75,8 +265,7 @@ def change_password(
 ) -> bool:
     if not user.check_password(old_password):
         return False
-    user.set_password(new_password)
-    db.commit()
+    UserDAO(db).update(user, password_hash=hash_password(new_password))
     return True
 
 
@@ -99,3 +288,145 @@ def bootstrap_default_admin(session: Session) -> None:
     except Exception as e:
         session.rollback()
         logger.warning(f"引导管理员异常（已忽略）：{e}")
+
+
+def _get_password_executor() -> tuple[Executor, threading.BoundedSemaphore]:
+    """惰性创建密码哈希执行器及其并发槽位。"""
+    global _password_executor, _password_slots
+
+    with _password_executor_lock:
+        if _password_executor is None or _password_slots is None:
+            workers = auth_config.password_hash_workers
+            if auth_config.password_hash_executor == "process":
+                _password_executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                _password_executor = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="password-hash"
+                )
+            _password_slots = threading.BoundedSemaphore(
+                workers + auth_config.password_hash_queue_size
+            )
+            logger.info(
+                f"密码哈希执行器已启动：{auth_config.password_hash_executor} x {workers}，"
+                f"排队上限 {auth_config.password_hash_queue_size}"
+            )
+        return _password_executor, _password_slots
+
+
+async def _run_password_task(func: Callable[..., Any], *args: Any) -> Any:
+    """在密码哈希执行器中运行 `func`，排队已满时抛出 503。"""
+    if auth_config.password_hash_workers <= 0:
+        return func(*args)
+
+    executor, slots = _get_password_executor()
+    if not slots.acquire(blocking=False):
+        logger.warning("密码哈希队列已满，拒绝请求")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="服务繁忙，请稍后重试",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = executor.submit(func, *args)
+    except BaseException:
+        slots.release()
+        raise
+    # 以实际计算结束为准释放槽位，请求被取消时也不会提前放行新的任务
+    future.add_done_callback(lambda _: slots.release())
+    return await asyncio.wrap_future(future)
+
+
+def shutdown_password_executor() -> None:
+    """关闭密码哈希执行器（应用关闭时调用，之后再次使用会重新创建）。"""
+    global _password_executor, _password_slots
+
+    with _password_executor_lock:
+        if _password_executor is not None:
+            _password_executor.shutdown(wait=False, cancel_futures=True)
+        _password_executor = None
+        _password_slots = None
+
+
+async def hash_password_async(password: str) -> str:
+    # 显式传入 cost：进程池中的子进程不一定与主进程读取到相同的配置
+    return await _run_password_task(hash_password, password, auth_config.bcrypt_rounds)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    return await _run_password_task(verify_password, password, password_hash)
+
+
+async def get_user_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+    return await AsyncUserDAO(db).get_by_username(username)
+
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await AsyncUserDAO(db).get(user_id)
+
+
+async def get_user_snapshot_by_username_async(
+    db: AsyncSession, username: str
+) -> Optional[CurrentUser]:
+    """
+    经实体缓存返回用户快照（只读，不能用于写操作）。
+
+    不做单飞合并：调用方先取 `user_cache.generation()` 再读取，若加入一次更早开始的读取，
+    可能把失效之前的快照以失效之后的代数写入已认证用户缓存；重复读取由实体缓存吸收。
+    """
+    return await AsyncUserDAO(db).get_cached_by("username", username)
+
+
+async def authenticate_user_async(
+    db: AsyncSession, username: str, password: str
+) -> Optional[User]:
+    user = await get_user_by_username_async(db, username)
+    if not user or not await verify_password_async(password, user.password_hash):
+        return None
+    if needs_rehash(user.password_hash):
+        await _rehash_password_async(db, user, password)
+    return user
+
+
+async def _rehash_password_async(db: AsyncSession, user: User, password: str) -> None:
+    """按当前 cost 重新计算哈希；执行器繁忙时跳过，留到下次登录。"""
+    try:
+        password_hash = await hash_password_async(password)
+    except HTTPException:
+        return
+    old_rounds = hash_rounds(user.password_hash)
+    await AsyncUserDAO(db).update(user, password_hash=password_hash)
+    logger.info(
+        f"已更新用户 {user.id} 的密码哈希 cost：{old_rounds} -> {auth_config.bcrypt_rounds}"
+    )
+
+
+async def create_user_async(db: AsyncSession, user_data: UserCreate) -> User:
+    password_hash = await hash_password_async(user_data.password)
+    return await AsyncUserDAO(db).create(
+        user_data.username, user_data.email, password_hash
+    )
+
+
+async def update_user_async(
+    db: AsyncSession, user: User, user_data: UserUpdate
+) -> User:
+    update_data = user_data.model_dump(exclude_unset=True)
+    return await AsyncUserDAO(db).update(user, **update_data)
+
+
+async def delete_users_async(db: AsyncSession, user_ids: Sequence[int]) -> int:
+    """删除用户及其全部刷新令牌（无外键级联），返回删除的用户数。"""
+    user_ids = list(dict.fromkeys(user_ids))
+    # 先删令牌：即使随后删除用户失败，也不会留下可继续轮转的令牌
+    await AsyncRefreshTokenDAO(db).delete_for_users(user_ids)
+    return await AsyncUserDAO(db).delete_many(user_ids)
+
+
+async def change_password_async(
+    db: AsyncSession, user: User, old_password: str, new_password: str
+) -> bool:
+    if not await verify_password_async(old_password, user.password_hash):
+        return False
+    password_hash = await hash_password_async(new_password)
+    await AsyncUserDAO(db).update(user, password_hash=password_hash)
+    return True
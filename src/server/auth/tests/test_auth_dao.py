@@ -3,10 +3,15 @@
 认证DAO层测试
 """
 
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.server.auth.dao import UserDAO
+from src.server.auth.dao import AsyncUserDAO, UserDAO, user_cache_tag
 from src.server.auth.models import User
+from src.server.auth.schemas import CurrentUser
+from src.server.auth.user_cache import user_cache
+from src.server.response_cache import response_cache
 
 
 def test_user_dao_get_by_username(test_db_session: Session):
@@ -58,3 +63,69 @@ def test_user_dao_update(test_db_session: Session):
 
     assert updated_user.email == "updated@example.com"
     assert updated_user.name == "Updated Name"
+
+
+@pytest.mark.asyncio
+async def test_async_user_dao(test_async_db_session: AsyncSession):
+    """测试异步 DAO 的创建、查询与更新"""
+    dao = AsyncUserDAO(test_async_db_session)
+
+    user = await dao.create("asyncuser", "async@example.com", "hashed_password")
+    assert user.id is not None
+
+    by_id = await dao.get(user.id)
+    assert by_id is not None and by_id.username == "asyncuser"
+    by_username = await dao.get_by_username("asyncuser")
+    assert by_username is not None and by_username.id == user.id
+    by_email = await dao.get_by_email("async@example.com")
+    assert by_email is not None and by_email.id == user.id
+    assert await dao.get_by_username("nonexistent") is None
+
+    updated = await dao.update(user, name="Async Name")
+    assert updated.name == "Async Name"
+
+
+def test_user_dao_entity_cache_invalidated_on_update(test_db_session: Session):
+    """测试用户快照缓存在更新（包括改用户名）后失效"""
+    dao = UserDAO(test_db_session)
+    user = dao.create("cacheduser", "cached@example.com", "hashed_password")
+
+    assert dao.get_cached_by("username", "cacheduser").email == "cached@example.com"
+    assert dao.get_cached(user.id).username == "cacheduser"
+
+    dao.update(user, username="renameduser", email="renamed@example.com")
+
+    assert dao.get_cached_by("username", "cacheduser") is None
+    assert dao.get_cached_by("username", "renameduser").email == "renamed@example.com"
+    assert dao.get_cached(user.id).username == "renameduser"
+
+
+def test_user_dao_bulk_writes_invalidate_user_caches(test_db_session: Session):
+    """测试批量写入后失效已认证用户缓存与该用户的响应缓存"""
+    dao = UserDAO(test_db_session)
+    user = dao.create("bulkuser", "bulk@example.com", "hashed_password")
+    key = ("bulkuser", "/api/auth/profile", "")
+    claims, snapshot = {"sub": "bulkuser"}, CurrentUser.model_validate(user)
+
+    user_cache.put("bulk-token", claims, snapshot, user_cache.generation())
+    response_cache.put(
+        key, b"{}", "application/json", [user_cache_tag(user.id)], response_cache.generation
+    )
+
+    row = {
+        "id": user.id,
+        "username": "bulkuser",
+        "email": "new@example.com",
+        "password_hash": "hashed_password",
+    }
+    dao.upsert_many(
+        [row],
+        index_elements=["id"],
+        update_columns=["email"],
+    )
+    assert user_cache.get("bulk-token") is None
+    assert response_cache.get(key) is None
+
+    user_cache.put("bulk-token", claims, snapshot, user_cache.generation())
+    dao.delete_many([user.id])
+    assert user_cache.get("bulk-token") is None
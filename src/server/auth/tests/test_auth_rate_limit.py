@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+登录限流测试
+"""
+
+import pytest
+
+from src.server.auth import rate_limit, service
+from src.server.auth.rate_limit import (
+    LoginRateLimiter,
+    SQLiteBucketStore,
+    TokenBucketLimiter,
+)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_token_bucket_burst_and_refill(monkeypatch):
+    """测试突发耗尽后按速率回填，拒绝时返回等待秒数"""
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    limiter = TokenBucketLimiter(capacity=3, refill_per_second=0.5)
+
+    assert [limiter.acquire("ip") for _ in range(3)] == [0, 0, 0]
+    assert limiter.acquire("ip") == pytest.approx(2.0)
+    assert limiter.acquire("other") == 0
+
+    clock.now += 2
+    assert limiter.acquire("ip") == 0
+    assert limiter.acquire("ip") > 0
+
+
+def test_token_bucket_evicts_refilled_keys(monkeypatch):
+    """测试键数量超过上限时淘汰已回满的桶"""
+    clock = _Clock()
+    monkeypatch.setattr(rate_limit.time, "monotonic", clock)
+    limiter = TokenBucketLimiter(capacity=1, refill_per_second=1, shards=1, max_keys=2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    clock.now += 5
+    limiter.acquire("c")
+    assert len(limiter) == 1
+
+
+def test_sqlite_bucket_store_is_shared(tmp_path):
+    """测试两个 SQLite 存储实例（模拟两个工作进程）共享同一份计数"""
+    path = tmp_path / "rate_limit.db"
+    worker_a = SQLiteBucketStore(path, "buckets", capacity=2, refill_per_second=0.01)
+    worker_b = SQLiteBucketStore(path, "buckets", capacity=2, refill_per_second=0.01)
+
+    assert worker_a.acquire("ip") == 0
+    assert worker_b.acquire("ip") == 0
+    assert worker_a.acquire("ip") > 0
+    assert worker_b.acquire("ip") > 0
+
+    worker_b.reset("ip")
+    assert worker_a.acquire("ip") == 0
+
+
+def test_login_is_rejected_before_password_check(test_client, monkeypatch):
+    """测试超限的登录直接返回 429，不再进行密码校验；成功登录重置用户名的桶"""
+    limiter = LoginRateLimiter(
+        TokenBucketLimiter(capacity=100, refill_per_second=0.01),
+        TokenBucketLimiter(capacity=2, refill_per_second=0.01),
+    )
+    monkeypatch.setattr(service, "login_rate_limiter", limiter)
+    test_client.post(
+        "/api/auth/register",
+        json={"username": "erin", "email": "erin@example.com", "password": "Password123"},
+    )
+
+    wrong = {"username": "erin", "password": "wrong-password"}
+    assert test_client.post("/api/auth/login", json=wrong).status_code == 401
+    right = {"username": "erin", "password": "Password123"}
+    assert test_client.post("/api/auth/login", json=right).status_code == 200
+    # 成功后用户名的桶被重置
+    assert test_client.post("/api/auth/login", json=wrong).status_code == 401
+    assert test_client.post("/api/auth/login", json=wrong).status_code == 401
+
+    async def fail_authenticate(*_args):
+        raise AssertionError("被限流的请求不应进行密码校验")
+
+    monkeypatch.setattr(service, "authenticate_user_async", fail_authenticate)
+    resp = test_client.post("/api/auth/login", json=right)
+    assert resp.status_code == 429
+    assert int(resp.headers["Retry-After"]) >= 1
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+刷新令牌吊销列表测试
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.server.auth.dao import AsyncRefreshTokenDAO, AsyncUserDAO
+from src.server.auth.revocation import BloomFilter, RevocationList
+
+
+def test_bloom_filter_has_no_false_negatives():
+    """测试布隆过滤器不漏报，且误判率接近配置值"""
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for index in range(1000):
+        bloom.add(f"family-{index}")
+
+    assert all(f"family-{index}" in bloom for index in range(1000))
+    false_positives = sum(f"other-{index}" in bloom for index in range(10000))
+    assert false_positives < 300
+
+
+def test_revocation_list_check_and_overflow():
+    """测试精确集合溢出前判定确定，溢出后布隆命中的未知项需要回库确认"""
+    revocations = RevocationList(capacity=100, error_rate=0.001, exact_max_entries=2)
+    revocations.add("a")
+    revocations.add("b")
+    assert revocations.check("a") is True
+    assert revocations.check("unknown") is False
+
+    revocations.add("c")
+    # "a" 被挤出精确集合，但仍在布隆过滤器中
+    assert revocations.check("a") is None
+    assert revocations.check("c") is True
+
+    revocations.load(["x"])
+    assert revocations.check("a") is False
+    assert revocations.check("x") is True
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_dao_rotate_and_revoke(test_async_db_session: AsyncSession):
+    """测试轮转只能成功一次，吊销后可按时间增量查询"""
+    user = await AsyncUserDAO(test_async_db_session).create("carol", "c@example.com", "x")
+    user_id = user.id
+    dao = AsyncRefreshTokenDAO(test_async_db_session)
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+    await dao.create("jti-1", "family-1", user_id, expires_at)
+
+    assert await dao.rotate("jti-1", "jti-2", "family-1", user_id, expires_at) is True
+    assert await dao.rotate("jti-1", "jti-3", "family-1", user_id, expires_at) is False
+    assert await dao.is_family_revoked("family-1") is False
+
+    since = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert await dao.revoke_family("family-1") == user_id
+    assert await dao.revoke_family("family-1") is None
+    assert await dao.is_family_revoked("family-1") is True
+    assert await dao.list_revoked_families(since) == [("family-1", user_id)]
+    assert await dao.list_revoked_families() == [("family-1", user_id)]
+    assert await dao.list_revoked_families(datetime.now(timezone.utc)) == []
@@ -79,3 +79,87 @@ def test_change_password_flow(test_client):
         "/api/auth/login", json={"username": "bob", "password": "NewPassword123"}
     )
     assert resp.status_code == 200
+
+
+def _login(test_client, username: str) -> dict:
+    test_client.post(
+        "/api/auth/register",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": "Password123",
+        },
+    )
+    return test_client.post(
+        "/api/auth/login", json={"username": username, "password": "Password123"}
+    ).json()
+
+
+def _bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_refresh_rotation_and_reuse_detection(test_client):
+    tokens = _login(test_client, "carol")
+
+    # 刷新令牌不能当作访问令牌使用
+    resp = test_client.get("/api/auth/profile", headers=_bearer(tokens["refresh_token"]))
+    assert resp.status_code == 401
+
+    resp = test_client.post("/api/auth/refresh", headers=_bearer(tokens["refresh_token"]))
+    assert resp.status_code == 200, resp.text
+    rotated = resp.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    resp = test_client.get("/api/auth/profile", headers=_bearer(rotated["access_token"]))
+    assert resp.status_code == 200
+
+    # 重放已轮转的刷新令牌：整个家族被吊销
+    resp = test_client.post("/api/auth/refresh", headers=_bearer(tokens["refresh_token"]))
+    assert resp.status_code == 401
+    resp = test_client.get("/api/auth/profile", headers=_bearer(rotated["access_token"]))
+    assert resp.status_code == 401
+    resp = test_client.post("/api/auth/refresh", headers=_bearer(rotated["refresh_token"]))
+    assert resp.status_code == 401
+
+
+def test_logout_revokes_only_its_session(test_client):
+    first = _login(test_client, "dave")
+    second = test_client.post(
+        "/api/auth/login", json={"username": "dave", "password": "Password123"}
+    ).json()
+    # 先访问一次，让令牌进入已认证用户缓存
+    resp = test_client.get("/api/auth/profile", headers=_bearer(first["access_token"]))
+    assert resp.status_code == 200
+
+    resp = test_client.post("/api/auth/logout", headers=_bearer(first["refresh_token"]))
+    assert resp.status_code == 200
+
+    resp = test_client.get("/api/auth/profile", headers=_bearer(first["access_token"]))
+    assert resp.status_code == 401
+    resp = test_client.post("/api/auth/refresh", headers=_bearer(first["refresh_token"]))
+    assert resp.status_code == 401
+    resp = test_client.get("/api/auth/profile", headers=_bearer(second["access_token"]))
+    assert resp.status_code == 200
+
+
+def test_profile_cache_invalidated_on_update(test_client):
+    tokens = _login(test_client, "erin")
+    headers = _bearer(tokens["access_token"])
+
+    first = test_client.get("/api/auth/profile", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    resp = test_client.get(
+        "/api/auth/profile", headers={**headers, "If-None-Match": etag}
+    )
+    assert resp.status_code == 304
+
+    resp = test_client.put("/api/auth/profile", json={"name": "Erin"}, headers=headers)
+    assert resp.status_code == 200
+
+    resp = test_client.get(
+        "/api/auth/profile", headers={**headers, "If-None-Match": etag}
+    )
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "Erin"
+    assert resp.headers["etag"] != etag
@@ -3,11 +3,24 @@
 认证服务层测试
 """
 
+import asyncio
+import threading
 from datetime import timedelta
 
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.server.auth.models import User
+from src.server.auth.models import (
+    RefreshToken,
+    User,
+    calibrate_rounds,
+    hash_password,
+    hash_rounds,
+    needs_rehash,
+)
 from src.server.auth.schemas import UserRole
 from src.server.auth.schemas import UserCreate, UserUpdate
 from src.server.auth.service import (
@@ -19,7 +32,21 @@ from src.server.auth.service import (
     update_user,
     change_password,
     bootstrap_default_admin,
+    authenticate_user_async,
+    change_password_async,
+    create_user_async,
+    delete_users_async,
+    get_user_by_username_async,
+    hash_password_async,
+    issue_token_pair_async,
+    rotate_refresh_token_async,
+    shutdown_password_executor,
+    update_user_async,
+    verify_password_async,
 )
+from src.server.auth import service as auth_service
+from src.server.auth.dao import AsyncUserDAO
+from src.server.auth.config import auth_config
 
 
 def test_get_user_by_username(test_db_session: Session):
@@ -164,3 +191,192 @@ def test_bootstrap_default_admin(test_db_session: Session):
 
     user_count = test_db_session.query(User).filter(User.username == "admin").count()
     assert user_count == 1
+
+
+@pytest.mark.asyncio
+async def test_password_hash_async_roundtrip():
+    """测试在执行器中哈希与校验密码"""
+    password_hash = await hash_password_async("password123")
+
+    assert await verify_password_async("password123", password_hash) is True
+    assert await verify_password_async("wrongpassword", password_hash) is False
+
+
+@pytest.mark.asyncio
+async def test_authenticate_and_change_password_async(
+    test_async_db_session: AsyncSession,
+):
+    """测试异步认证与修改密码"""
+    db = test_async_db_session
+    user = await create_user_async(
+        db,
+        UserCreate(
+            username="testuser", email="test@example.com", password="oldpassword"
+        ),
+    )
+
+    result = await authenticate_user_async(db, "testuser", "oldpassword")
+    assert result is not None
+    assert result.id == user.id
+    assert await authenticate_user_async(db, "testuser", "wrong") is None
+    assert await authenticate_user_async(db, "nobody", "x") is None
+
+    assert not await change_password_async(db, user, "wrong", "new12345")
+    assert await change_password_async(db, user, "oldpassword", "new12345")
+    assert user.check_password("new12345") is True
+
+    updated = await update_user_async(db, user, UserUpdate(name="Updated Name"))
+    assert updated.name == "Updated Name"
+    reloaded = await get_user_by_username_async(db, "testuser")
+    assert reloaded is not None
+    assert reloaded.name == "Updated Name"
+
+
+@pytest.mark.asyncio
+async def test_delete_users_async_removes_refresh_tokens(
+    test_async_db_session: AsyncSession,
+):
+    """测试删除用户时显式删除其刷新令牌，令牌随后无法轮转"""
+    db = test_async_db_session
+    user = await create_user_async(
+        db, UserCreate(username="leaving", email="l@example.com", password="password1")
+    )
+    other = await create_user_async(
+        db, UserCreate(username="staying", email="s@example.com", password="password1")
+    )
+    user_id, other_id = user.id, other.id
+    tokens = await issue_token_pair_async(db, user)
+    await issue_token_pair_async(db, other)
+
+    assert await delete_users_async(db, [user_id]) == 1
+
+    remaining = await db.execute(select(RefreshToken.user_id))
+    assert remaining.scalars().all() == [other_id]
+    assert await get_user_by_username_async(db, "leaving") is None
+    with pytest.raises(HTTPException) as exc_info:
+        await rotate_refresh_token_async(db, tokens["refresh_token"])
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_user_snapshot_reads_are_not_coalesced(
+    test_async_session_factory, monkeypatch
+):
+    """测试失效之后开始的读取不会加入失效之前开始的读取（否则会拿到旧快照）"""
+    async with test_async_session_factory() as db:
+        user = await create_user_async(
+            db, UserCreate(username="dave", email="d@example.com", password="password1")
+        )
+
+    original = AsyncUserDAO.get_cached_by
+    read_done = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow_first_read(self, field, value):
+        snapshot = await original(self, field, value)
+        if not read_done.is_set():
+            read_done.set()
+            await release.wait()
+        return snapshot
+
+    monkeypatch.setattr(AsyncUserDAO, "get_cached_by", slow_first_read)
+
+    async def snapshot():
+        async with test_async_session_factory() as db:
+            return await auth_service.get_user_snapshot_by_username_async(db, "dave")
+
+    stale_read = asyncio.ensure_future(snapshot())
+    await read_done.wait()
+    async with test_async_session_factory() as db:
+        user = await get_user_by_username_async(db, "dave")
+        await update_user_async(db, user, UserUpdate(name="Renamed"))
+
+    fresh = await asyncio.wait_for(snapshot(), timeout=2)
+    assert fresh.name == "Renamed"
+    release.set()
+    assert (await stale_read).name is None
+
+
+@pytest.mark.asyncio
+async def test_password_executor_sheds_load_when_full(monkeypatch):
+    """测试排队已满时返回 503"""
+    monkeypatch.setattr(auth_config, "password_hash_workers", 1)
+    monkeypatch.setattr(auth_config, "password_hash_queue_size", 0)
+    shutdown_password_executor()
+
+    release = threading.Event()
+    try:
+        task = asyncio.ensure_future(auth_service._run_password_task(release.wait, 5))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await verify_password_async("password123", "invalid")
+        assert exc_info.value.status_code == 503
+
+        release.set()
+        assert await task is True
+    finally:
+        release.set()
+        shutdown_password_executor()
+
+
+def test_hash_rounds_and_needs_rehash(monkeypatch):
+    """测试读取哈希中的 cost 并与配置比较"""
+    monkeypatch.setattr(auth_config, "bcrypt_rounds", 5)
+    password_hash = hash_password("password123", rounds=4)
+    assert hash_rounds(password_hash) == 4
+    assert hash_rounds("not-a-hash") is None
+    assert needs_rehash(password_hash) is True
+    assert needs_rehash(hash_password("password123")) is False
+
+
+def test_calibrate_rounds_picks_largest_cost_within_target():
+    """测试校准选取不超过目标耗时的最大 cost，并在超过目标后停止测量"""
+    measured = []
+
+    def fake_measure(rounds: int) -> float:
+        measured.append(rounds)
+        return 2 ** (rounds - 10) * 60.0
+
+    chosen, timings = calibrate_rounds(250, measure=fake_measure)
+    assert chosen == 12
+    assert measured == [10, 11, 12, 13]
+    assert timings[13] == 480.0
+
+
+def test_authenticate_user_rehashes_outdated_cost(test_db_session: Session, monkeypatch):
+    """测试登录成功时把旧 cost 的哈希升级为配置的 cost"""
+    monkeypatch.setattr(auth_config, "bcrypt_rounds", 5)
+    user = User(username="rehash", email="rehash@example.com")
+    user.password_hash = hash_password("password123", rounds=4)
+    test_db_session.add(user)
+    test_db_session.commit()
+
+    assert authenticate_user(test_db_session, "rehash", "wrong") is None
+    assert hash_rounds(user.password_hash) == 4
+
+    assert authenticate_user(test_db_session, "rehash", "password123") is not None
+    assert hash_rounds(user.password_hash) == 5
+    assert user.check_password("password123")
+
+
+@pytest.mark.asyncio
+async def test_authenticate_user_async_rehashes_outdated_cost(
+    test_async_db_session: AsyncSession, monkeypatch
+):
+    """测试异步登录路径同样升级旧 cost 的哈希"""
+    monkeypatch.setattr(auth_config, "bcrypt_rounds", 5)
+    user = User(
+        username="rehash_async",
+        email="rehash_async@example.com",
+        password_hash=hash_password("password123", rounds=4),
+    )
+    test_async_db_session.add(user)
+    await test_async_db_session.commit()
+
+    result = await authenticate_user_async(
+        test_async_db_session, "rehash_async", "password123"
+    )
+    assert result is not None
+    assert hash_rounds(result.password_hash) == 5
+    shutdown_password_executor()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+已认证用户缓存测试
+"""
+
+import time
+
+from src.server.auth.schemas import CurrentUser, UserRole, UserStatus
+from src.server.auth.user_cache import AuthenticatedUserCache
+
+
+def _snapshot(user_id: int = 1, username: str = "alice") -> CurrentUser:
+    return CurrentUser(
+        id=user_id,
+        username=username,
+        email=f"{username}@example.com",
+        role=UserRole.USER,
+        status=UserStatus.ACTIVE,
+    )
+
+
+def test_user_cache_hit_miss_and_invalidate():
+    """测试命中、未命中与按用户失效"""
+    cache = AuthenticatedUserCache(max_entries=10, ttl_seconds=60)
+
+    assert cache.get("token-a") is None
+    cache.put("token-a", {"sub": "alice"}, _snapshot(), cache.generation())
+    cache.put("token-b", {"sub": "alice"}, _snapshot(), cache.generation())
+
+    assert cache.get("token-a").username == "alice"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+    cache.invalidate_user(1)
+    assert cache.get("token-a") is None
+    assert cache.get("token-b") is None
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_user_cache_lru_and_expiry():
+    """测试 LRU 淘汰与令牌过期"""
+    cache = AuthenticatedUserCache(max_entries=2, ttl_seconds=60)
+    cache.put("t1", {}, _snapshot(1, "u1"), cache.generation())
+    cache.put("t2", {}, _snapshot(2, "u2"), cache.generation())
+    cache.get("t1")
+    cache.put("t3", {}, _snapshot(3, "u3"), cache.generation())
+
+    assert cache.get("t2") is None
+    assert cache.get("t1") is not None
+    assert cache.stats()["evictions"] == 1
+
+    # 已过期的令牌不会被缓存
+    cache.put("t4", {"exp": time.time() - 1}, _snapshot(4, "u4"), cache.generation())
+    assert cache.get("t4") is None
+
+
+def test_user_cache_skips_put_after_concurrent_invalidation():
+    """测试读取期间该用户被失效时不写入旧快照，其他用户不受影响"""
+    cache = AuthenticatedUserCache(max_entries=10, ttl_seconds=60)
+    generation = cache.generation()
+    cache.invalidate_user(1)
+
+    cache.put("stale", {}, _snapshot(1, "alice"), generation)
+    cache.put("other", {}, _snapshot(2, "bob"), generation)
+    assert cache.get("stale") is None
+    assert cache.get("other") is not None
+
+    cache.put("fresh", {}, _snapshot(1, "alice"), cache.generation())
+    assert cache.get("fresh") is not None
+
+
+def test_profile_update_invalidates_cached_user(test_client):
+    """测试更新资料后缓存的快照失效"""
+    test_client.post(
+        "/api/auth/register",
+        json={
+            "username": "carol",
+            "email": "carol@example.com",
+            "password": "Password123",
+        },
+    )
+    login = test_client.post(
+        "/api/auth/login", json={"username": "carol", "password": "Password123"}
+    ).json()
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+
+    assert test_client.get("/api/auth/profile", headers=headers).json()["name"] is None
+    resp = test_client.put("/api/auth/profile", json={"name": "Carol"}, headers=headers)
+    assert resp.status_code == 200
+
+    assert (
+        test_client.get("/api/auth/profile", headers=headers).json()["name"] == "Carol"
+    )
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+已认证用户缓存（模板版）
+
+公开接口：
+- `AuthenticatedUserCache`：令牌摘要 -> 用户快照的 TTL + LRU 缓存
+- `user_cache`：进程内全局实例
+
+内部方法：
+- `_digest`
+
+说明：
+- 键为令牌的 SHA-256 摘要，内存中不保留原始令牌。
+- 命中时 `get_current_user` 跳过 `jwt.decode` 与按用户名查询。
+- 条目过期时间取 TTL 与令牌 `exp` 中较早者；用户资料、密码、角色/状态变更时按用户失效。
+- 读取用户前先取 `generation()`，写入时传回：读取期间该用户被失效过则不写入，
+  避免把失效前读到的旧角色/状态放回缓存。
+- 多进程部署时各进程独立缓存，其他进程中的变更最多延迟 TTL 秒生效。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Mapping
+
+from .config import auth_config
+from .schemas import CurrentUser
+
+
+@dataclass(frozen=True)
+class _Entry:
+    user: CurrentUser
+    expires_at: float
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class AuthenticatedUserCache:
+    """按条目数量限界的 TTL + LRU 缓存，线程安全。"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[bytes, _Entry] = OrderedDict()
+        self._keys_by_user: dict[int, set[bytes]] = {}
+        # 失效序号：每次失效加一；记录每个用户最近一次失效时的序号
+        self._sequence = 0
+        self._invalidated_at: dict[int, int] = {}
+        # 为限制内存而丢弃的失效记录中最大的序号，之前开始的读取一律不写入
+        self._forgotten_up_to = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, token: str) -> CurrentUser | None:
+        """返回缓存的用户快照，未命中或已过期返回 None。"""
+        if not self.enabled:
+            return None
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key, entry)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.user
+
+    def generation(self) -> int:
+        """读取用户之前调用，结果传给 `put`。"""
+        with self._lock:
+            return self._sequence
+
+    def put(
+        self,
+        token: str,
+        claims: Mapping[str, Any],
+        user: CurrentUser,
+        generation: int,
+    ) -> None:
+        """
+        写入缓存；令牌剩余有效期短于 TTL 时以令牌过期时间为准。
+
+        `generation` 之后该用户被失效过时不写入。
+        """
+        if not self.enabled:
+            return
+        ttl = self.ttl_seconds
+        exp = claims.get("exp")
+        if isinstance(exp, (int, float)):
+            ttl = min(ttl, exp - time.time())
+        if ttl <= 0:
+            return
+        key = _digest(token)
+        entry = _Entry(user=user, expires_at=time.monotonic() + ttl)
+        with self._lock:
+            last_invalidated = max(
+                self._invalidated_at.get(user.id, 0), self._forgotten_up_to
+            )
+            if last_invalidated > generation:
+                return
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._unindex(key, previous)
+            self._entries[key] = entry
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._unindex(old_key, old_entry)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int) -> None:
+        """失效某个用户的全部缓存条目（资料、密码、角色或状态变更后调用）。"""
+        with self._lock:
+            self._sequence += 1
+            self._invalidated_at[user_id] = self._sequence
+            if len(self._invalidated_at) > max(self.max_entries, 1):
+                self._invalidated_at.clear()
+                self._forgotten_up_to = self._sequence
+            keys = self._keys_by_user.pop(user_id, set())
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sequence += 1
+            self._invalidated_at.clear()
+            self._forgotten_up_to = self._sequence
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict[str, int]:
+        """命中/未命中等计数，供日志或指标导出使用。"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: bytes, entry: _Entry) -> None:
+        del self._entries[key]
+        self._unindex(key, entry)
+
+    def _unindex(self, key: bytes, entry: _Entry) -> None:
+        keys = self._keys_by_user.get(entry.user.id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry.user.id]
+
+
+user_cache = AuthenticatedUserCache(
+    max_entries=auth_config.user_cache_max_entries,
+    ttl_seconds=auth_config.user_cache_ttl_seconds,
+)
@@ -16,7 +16,7 @@
 import json
 import os
 from pathlib import Path
-from typing import List
+from typing import List, Literal, Optional
 
 from dotenv import load_dotenv
 from pydantic import Field
@@ -35,12 +35,50 @@ class GlobalConfig(BaseSettings):
 
     database_protocol: str = Field(default="sqlite", title="数据库协议")
 
+    database_async_driver: str = Field(
+        default="aiosqlite",
+        title="异步数据库驱动",
+        description="异步引擎使用的 DBAPI，URL 形如 sqlite+aiosqlite:///...",
+    )
+
     database_path: Path = Field(
         default=Path("data") / "database.db",
         title="数据库路径",
         description="相对项目根目录的相对路径",
     )
 
+    sqlite_pragma_profile: str = Field(
+        default="production",
+        title="SQLite PRAGMA 配置档",
+        description="production（WAL 等调优）或 default（保持 SQLite 默认值）",
+    )
+
+    sqlite_journal_mode: Optional[str] = Field(
+        default=None, title="journal_mode", description="为空时取配置档的值"
+    )
+
+    sqlite_synchronous: Optional[str] = Field(
+        default=None, title="synchronous", description="为空时取配置档的值"
+    )
+
+    sqlite_mmap_size: Optional[int] = Field(
+        default=None, title="mmap_size（字节）", description="为空时取配置档的值"
+    )
+
+    sqlite_cache_size: Optional[int] = Field(
+        default=None,
+        title="cache_size",
+        description="负数表示 KiB，正数表示页数；为空时取配置档的值",
+    )
+
+    sqlite_temp_store: Optional[str] = Field(
+        default=None, title="temp_store", description="为空时取配置档的值"
+    )
+
+    sqlite_busy_timeout_ms: Optional[int] = Field(
+        default=None, title="busy_timeout（毫秒）", description="为空时取配置档的值"
+    )
+
     app_secret_key: str = Field(
         default="dev_secret_key_for_testing_only",
         title="应用密钥",
@@ -53,6 +91,219 @@ class GlobalConfig(BaseSettings):
         description="相对项目根目录的相对路径",
     )
 
+    json_response_engine: str = Field(
+        default="orjson",
+        title="JSON 响应引擎",
+        description="orjson 或 stdlib",
+    )
+
+    spa_static_mode: str = Field(
+        default="memory",
+        title="前端静态文件服务模式",
+        description="memory：启动时载入内存并预压缩；disk：每次请求读取文件系统",
+    )
+
+    server_workers: int = Field(
+        default=0,
+        title="工作进程数",
+        description="生产模式下的 uvicorn 工作进程数，0 表示 CPU 核数",
+    )
+
+    server_max_requests: int = Field(
+        default=0,
+        title="工作进程请求上限",
+        description="工作进程处理该数量请求后优雅退出并由主进程补齐，0 表示不限",
+    )
+
+    server_max_requests_jitter: int = Field(
+        default=0,
+        title="请求上限随机抖动",
+        description="每个进程的请求上限额外加上 [0, 该值] 的随机数，避免同时回收",
+    )
+
+    server_max_rss_mb: int = Field(
+        default=0,
+        title="工作进程内存上限（MiB）",
+        description="常驻内存超过该值后优雅退出并由主进程补齐，0 表示不限",
+    )
+
+    server_graceful_timeout: int = Field(
+        default=30,
+        title="优雅关闭超时（秒）",
+        description="工作进程退出时等待进行中请求完成的最长时间",
+    )
+
+    server_loop: Literal["auto", "uvloop", "asyncio"] = Field(
+        default="auto",
+        title="事件循环实现",
+        description="auto（安装了 uvloop 时使用）、uvloop 或 asyncio",
+    )
+
+    server_http: Literal["auto", "httptools", "h11"] = Field(
+        default="auto",
+        title="HTTP 协议实现",
+        description="auto（安装了 httptools 时使用）、httptools 或 h11",
+    )
+
+    metrics_enabled: bool = Field(
+        default=True,
+        title="是否启用指标",
+        description="启用后记录 HTTP/DB 指标并在 /api/metrics 暴露 Prometheus 文本格式",
+    )
+
+    db_pool_size: int = Field(
+        default=5,
+        title="连接池大小",
+        description="同步与异步引擎各自常驻的连接数（QueuePool）；DB 执行器默认使用同样数量的工作线程",
+    )
+
+    db_max_overflow: int = Field(
+        default=10,
+        title="连接池溢出上限",
+        description="连接全部被占用时最多额外新建的连接数，归还后关闭",
+    )
+
+    db_pool_timeout: float = Field(
+        default=30.0,
+        title="连接检出超时（秒）",
+        description="连接池与溢出连接都用尽时等待空闲连接的最长时间",
+    )
+
+    db_pool_recycle: int = Field(
+        default=-1,
+        title="连接回收时间（秒）",
+        description="连接建立超过该时长后在下次检出时重建，-1 表示不回收",
+    )
+
+    db_pool_pre_ping: bool = Field(
+        default=False,
+        title="检出前探测连接",
+        description="每次检出前执行一次轻量探测，丢弃已失效的连接（SQLite 文件库一般不需要）",
+    )
+
+    db_pool_warm_up: bool = Field(
+        default=True,
+        title="启动时预热连接池",
+        description="每个工作进程启动时预先建立 pool_size 个连接（并执行 PRAGMA），首批请求无需建连",
+    )
+
+    db_executor_workers: int = Field(
+        default=0,
+        title="DB 执行器工作线程数",
+        description="同步 ORM 调用使用的线程数，0 表示与连接池大小（db_pool_size）一致",
+    )
+
+    db_executor_queue_size: int = Field(
+        default=64,
+        title="DB 执行器排队上限",
+        description="超过 工作线程数 + 排队上限 的并发调用直接返回 503",
+    )
+
+    db_executor_queue_timeout_seconds: float = Field(
+        default=5.0,
+        title="DB 执行器排队超时（秒）",
+        description="排队超过该时长的调用不再执行并返回 503",
+    )
+
+    sql_slow_query_ms: float = Field(
+        default=200.0,
+        title="慢查询阈值（毫秒）",
+        description="单条语句耗时达到该值时写入 slow_sql.log",
+    )
+
+    sql_n_plus_one_threshold: int = Field(
+        default=10,
+        title="N+1 检测阈值",
+        description="单个请求中同一语句形状执行次数超过该值时告警，0 表示关闭",
+    )
+
+    response_cache_max_bytes: int = Field(
+        default=16 * 1024 * 1024,
+        title="GET 响应缓存容量（字节）",
+        description="按响应体总字节数 LRU 淘汰，0 表示关闭",
+    )
+
+    response_cache_ttl_seconds: float = Field(
+        default=30.0,
+        title="GET 响应缓存 TTL（秒）",
+        description="多进程部署下也是其他进程写入的最大可见延迟，0 表示关闭",
+    )
+
+    entity_cache_max_entries: int = Field(
+        default=10000,
+        title="DAO 实体缓存条目上限（每个实体）",
+        description="按主键 / 唯一键缓存的快照数量，超出时 LRU 淘汰，0 表示关闭",
+    )
+
+    entity_cache_ttl_seconds: float = Field(
+        default=60.0,
+        title="DAO 实体缓存 TTL（秒）",
+        description="多进程部署下也是其他进程修改的最大可见延迟，0 表示关闭",
+    )
+
+    entity_cache_negative_ttl_seconds: float = Field(
+        default=5.0,
+        title="DAO 实体负缓存 TTL（秒）",
+        description="记录“不存在”的时长，也是其他进程新建实体的最大可见延迟，0 表示不缓存未命中",
+    )
+
+    idempotency_enabled: bool = Field(
+        default=True,
+        title="是否启用幂等键",
+        description="启用后 idempotency_paths 中的 POST 请求可携带 Idempotency-Key 安全重试",
+    )
+
+    idempotency_paths: List[str] = Field(
+        default_factory=lambda: [
+            "/api/example/items",
+            "/api/example/items:batch",
+            "/api/auth/register",
+        ],
+        title="支持幂等键的路径",
+        description="精确匹配的 POST 路径列表（JSON）",
+    )
+
+    idempotency_ttl_seconds: float = Field(
+        default=86400.0,
+        title="幂等键保留时长（秒）",
+        description="在该时长内以同一键重试会重放首次的响应",
+    )
+
+    idempotency_lease_seconds: float = Field(
+        default=30.0,
+        title="幂等键处理租约（秒）",
+        description="处理中的键在该时长后视为中断，可被重新执行",
+    )
+
+    idempotency_sqlite_path: Path = Field(
+        default=Path("data") / "idempotency.db",
+        title="幂等键存储路径",
+        description="独立的 SQLite 文件，多个工作进程共享；相对项目根目录的相对路径",
+    )
+
+    idempotency_cache_max_entries: int = Field(
+        default=10000,
+        title="幂等键内存缓存条目上限",
+        description="最近完成的响应在进程内的 LRU 副本，0 表示只查 SQLite",
+    )
+
+    idempotency_max_body_bytes: int = Field(
+        default=64 * 1024,
+        title="幂等响应体上限（字节）",
+        description="更大的响应不保存，重试时会重新执行",
+    )
+
+    idempotency_cleanup_interval_seconds: float = Field(
+        default=60.0,
+        title="过期幂等键清理间隔（秒）",
+    )
+
+    idempotency_cleanup_batch_size: int = Field(
+        default=1000,
+        title="过期幂等键每批删除数量",
+        description="分批删除，避免长时间持有 SQLite 写锁",
+    )
+
     log_level: str = Field(default="info", title="日志级别")
 
     log_dir: Path = Field(
@@ -78,6 +329,39 @@ class GlobalConfig(BaseSettings):
         title="是否输出 JSON 日志",
     )
 
+    log_batched: bool = Field(
+        default=True,
+        title="是否批量写日志",
+        description="开启后每条日志只格式化一次，由后台线程批量写入控制台与各日志文件",
+    )
+
+    log_flush_interval_ms: int = Field(
+        default=200,
+        title="日志刷新间隔（毫秒）",
+        description="批量写入时后台线程的最长等待时间",
+    )
+
+    log_batch_size: int = Field(
+        default=256,
+        title="日志批量大小",
+        description="队列中积累到该数量时立即唤醒后台线程写入",
+    )
+
+    log_queue_size: int = Field(
+        default=10000,
+        title="日志队列上限",
+        description="队列写满后新记录被丢弃并计入 log_records_dropped_total",
+    )
+
+    log_access_sample_rates: dict[str, float] = Field(
+        default_factory=dict,
+        title="访问日志采样比例",
+        description=(
+            '路径前缀 -> 保留比例（0~1），按最长前缀匹配，如 {"/api/health": 0.01}；'
+            "状态码 >= 400 的请求始终记录"
+        ),
+    )
+
     @property
     def allowed_origins(self) -> List[str]:
         """允许的跨域来源
@@ -4,12 +4,15 @@ pytest 公共 fixtures（模板版）
 
 功能：
 - 统一测试环境变量
-- 提供内存 SQLite 的数据库引擎、会话与 TestClient
+- 提供临时 SQLite 文件的数据库引擎、会话（同步/异步共享同一文件）与 TestClient
 - 引导默认管理员
 
 公开接口：
+- `test_db_path`
 - `test_db_engine`
 - `test_db_session`
+- `test_async_session_factory`
+- `test_async_db_session`
 - `test_client`
 - `init_test_database`
 """
@@ -17,25 +20,42 @@ pytest 公共 fixtures（模板版）
 from __future__ import annotations
 
 import os
-from typing import Iterator
+import tempfile
+from pathlib import Path
+from typing import AsyncIterator, Iterator
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool, StaticPool
 from sqlalchemy.engine import Connection
 
 # 测试环境配置
 os.environ.setdefault("APP_ENV", "test")
 os.environ.setdefault("ALLOWED_ORIGINS", '["http://localhost:3000"]')
+os.environ.setdefault(
+    "IDEMPOTENCY_SQLITE_PATH", str(Path(tempfile.mkdtemp()) / "idempotency.db")
+)
+os.environ.setdefault(
+    "DATABASE_PATH", str(Path(tempfile.mkdtemp()) / "database.db")
+)
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="logs-"))
 
 
 @pytest.fixture(scope="function")
-def test_db_engine() -> Iterator[Connection]:
-    """提供共享内存 SQLite 连接（保持连接存活，保证多线程一致）。"""
+def test_db_path(tmp_path: Path) -> Path:
+    """每个测试独立的 SQLite 文件（同步与异步引擎都连接到这里）。"""
+    return tmp_path / "test.db"
+
+
+@pytest.fixture(scope="function")
+def test_db_engine(test_db_path: Path) -> Iterator[Connection]:
+    """提供共享 SQLite 连接（保持连接存活，保证多线程一致）。"""
     engine = create_engine(
-        "sqlite:///:memory:",
+        f"sqlite:///{test_db_path}",
         connect_args={"check_same_thread": False},
         poolclass=StaticPool,
     )
@@ -44,8 +64,18 @@ def test_db_engine() -> Iterator[Connection]:
 
     from src.server.database import Base
     import src.server.auth.models  # noqa: F401
+    import src.server.example_module.models  # noqa: F401
 
     Base.metadata.create_all(bind=keep_conn)
+    # 提交建表事务，后续会话的提交才会真正落盘，对异步连接可见
+    keep_conn.commit()
+
+    # 每个测试都是新库，主键会重复：清空进程内的实体缓存
+    from src.server.auth.dao import user_entity_cache
+    from src.server.example_module.dao import item_entity_cache
+
+    user_entity_cache.clear()
+    item_entity_cache.clear()
 
     try:
         yield keep_conn
@@ -70,15 +100,67 @@ def test_db_session(test_db_engine) -> Iterator[Session]:
 
 
 @pytest.fixture(scope="function")
-def test_client(test_db_session: Session) -> Iterator[TestClient]:
+def test_async_session_factory(
+    test_db_engine, test_db_path: Path
+) -> Iterator[async_sessionmaker[AsyncSession]]:
+    """提供连接到同一测试数据库文件的异步会话工厂。
+
+    使用 NullPool，避免 aiosqlite 连接跨越不同事件循环复用。
+    """
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{test_db_path}", poolclass=NullPool
+    )
+    yield async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture(scope="function")
+async def test_async_db_session(
+    test_async_session_factory: async_sessionmaker[AsyncSession],
+) -> AsyncIterator[AsyncSession]:
+    """提供异步数据库会话。"""
+    async with test_async_session_factory() as session:
+        yield session
+
+
+@pytest.fixture(scope="function")
+def test_client(
+    test_db_session: Session,
+    test_async_session_factory: async_sessionmaker[AsyncSession],
+) -> Iterator[TestClient]:
     """提供一个配置了测试数据库的 FastAPI TestClient。"""
     from src.server.main import app
-    from src.server.database import get_db
+    from src.server.database import get_async_db, get_db, get_session_factory
+    from src.server.auth.rate_limit import login_rate_limiter
+    from src.server.auth.revocation import revocation_list
+    from src.server.auth.user_cache import user_cache
+    from src.server.idempotency import idempotency_manager
+    from src.server.response_cache import response_cache
+
+    # 每个测试使用独立数据库，清空进程内缓存避免跨测试命中
+    user_cache.clear()
+    revocation_list.clear()
+    login_rate_limiter.clear()
+    response_cache.clear()
+    idempotency_manager.clear()
 
     def override_get_db() -> Iterator[Session]:
         yield test_db_session
 
+    # 同一个工厂：DB 执行器按工厂为每个工作线程保留会话
+    session_factory = sessionmaker(
+        bind=test_db_session.bind, autocommit=False, autoflush=False
+    )
+
+    def override_get_session_factory() -> sessionmaker:
+        return session_factory
+
+    async def override_get_async_db() -> AsyncIterator[AsyncSession]:
+        async with test_async_session_factory() as session:
+            yield session
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = override_get_session_factory
+    app.dependency_overrides[get_async_db] = override_get_async_db
 
     with TestClient(app) as client:
         yield client
@@ -3,28 +3,819 @@
 数据库访问对象（DAO）基类与线程池工具（模板版）
 
 公开接口：
-- `BaseDAO`：DAO 基类，持有 `db_session`
-- `run_in_thread`：将同步函数放入线程池执行
+- `BaseDAO[Model]`：DAO 基类，持有 `db_session`；声明 `model` 后提供通用操作
+  `get` / `get_by` / `get_many`（可按列投影）/ `exists` / `count` / `upsert_many` / `delete_many`
+- `AsyncBaseDAO[Model]`：异步 DAO 基类，持有 `AsyncSession`，通用操作与同步版一致
+- `EntityCache`：按主键 / 唯一键缓存不可变快照的进程内 TTL + LRU 缓存（可选负缓存）
+- `DBExecutor` / `get_db_executor()` / `shutdown_db_executor()`：专用于同步 ORM 调用的有界线程池
+- `run_in_thread`：将同步函数放入 DB 执行器执行
+- `run_in_db(func, session_factory)`：在 DB 执行器中以工作线程绑定的会话执行 `func(session)`
+- `SingleFlight` / `single_flight(key=...)`：合并并发的相同调用（同步与 async 函数均可），共享同一次执行的结果
+- `ENTITY_CACHE_LOOKUPS`：实体缓存查找次数指标（按实体与 hit/negative_hit/miss）
+- `DB_EXECUTOR_QUEUE_WAIT` / `DB_EXECUTOR_REJECTED`：DB 执行器排队时间与拒绝次数（queue_full/timeout）
+- `SINGLE_FLIGHT_CALLS`：单飞调用次数指标（按函数与 executed/coalesced/wait_timeout）
 
 内部方法：
-- 无
+- `_DAOMixin`：同步与异步基类共用的声明与语句构造
+- `_chunks`、`_db_busy`、`_record_queue_wait`、`_default_db_workers`、`_fresh_exception`
 
 说明：
 - 用于在服务或路由中将阻塞型 ORM 调用切换至线程池，避免阻塞事件循环。
+- 同步 ORM 调用使用独立的 DB 执行器而不是 asyncio 默认线程池：工作线程数默认与同步引擎的连接池大小一致
+  （`DB_EXECUTOR_WORKERS`），并发超过 工作线程数 + `DB_EXECUTOR_QUEUE_SIZE` 或排队超过
+  `DB_EXECUTOR_QUEUE_TIMEOUT_SECONDS` 时返回 503；每个任务的排队时间计入指标与访问日志的 `db_wait_ms`。
+  排队超时由调用方的截止时间保证（工作线程全部卡住时也会按时返回），任务被取消、不再执行；
+  已开始执行的任务不受该超时影响。
+- 使用 `get_async_db` 的路由应配合 `AsyncBaseDAO` 子类，无需线程池。
+- 通用操作基于 SQLAlchemy 2.0 `select()`：`get_many` 每 `SQLITE_MAX_VARIABLES` 个主键一条 `IN` 查询，
+  `upsert_many` 按每行列数分块为多行 `INSERT ... ON CONFLICT ... RETURNING`，写操作在同一事务中提交，
+  失败时回滚；传入 `columns` 时返回 Row 元组而不构造 ORM 对象，适合只需要少数列的批量读取。
+- 通用写操作（`upsert_many`、`delete_many`）提交后自动失效受影响实体的缓存。
+- 子类通过类属性 `entity_cache = EntityCache(...)` 声明启用实体缓存（同步与异步 DAO 可共用同一实例），
+  之后 `get_cached(pk)` / `get_cached_by(field, value)` 返回冻结的 Pydantic 快照，而不是 ORM 对象；
+  需要修改的写路径仍使用返回 ORM 对象的普通查询。
+- 写方法提交后调用 `_invalidate_cached(obj)`（或 `entity_cache.invalidate`）失效该实体的所有键，
+  新建实体时同时清除其主键 / 唯一键上的负缓存。
+- 未命中期间发生的失效会使本次结果不被写入，避免把提交前读到的旧数据放回缓存。
+- 多进程部署时各进程独立缓存：其他进程的修改最多延迟 `ENTITY_CACHE_TTL_SECONDS` 秒可见，
+  新建最多延迟 `ENTITY_CACHE_NEGATIVE_TTL_SECONDS` 秒可见。
+- `single_flight` 用于缓存未命中时的读路径（如缓存过期瞬间大量请求同一实体），合并键通常排除会话参数；
+  等待方拿到的是执行方会话中读出的结果，因此只适合返回快照 / 纯数据的只读函数，不要用于写操作或返回 ORM 对象的函数。
+  同步函数的等待方会阻塞所在线程，经 DB 执行器执行的读取应在派发之前的 async 函数上合并；
+  调用方在读取之前记录缓存代数（如 `user_cache.generation()`）的读取不要合并，否则可能以新代数缓存旧结果。
 """
 
+from __future__ import annotations
+
 import asyncio
-from typing import Any, Callable
+import concurrent.futures
+import contextvars
+import copy
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    ClassVar,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    Sequence,
+    TypeVar,
+)
+
+from fastapi import HTTPException, status
+from loguru import logger
+from pydantic import BaseModel
+from sqlalchemy import Executable, Row, Select, delete, func, inspect as sa_inspect, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.server.config import global_config
+from src.server.metrics import registry
+from src.server.sql_instrumentation import current_query_stats
+
+ENTITY_CACHE_LOOKUPS = registry.counter(
+    "dao_entity_cache_lookups_total", "实体缓存查找次数", ("entity", "result")
+)
+DB_EXECUTOR_QUEUE_WAIT = registry.histogram(
+    "dao_db_executor_queue_wait_seconds", "DB 执行器中任务开始执行前的排队时间"
+)
+DB_EXECUTOR_REJECTED = registry.counter(
+    "dao_db_executor_rejected_total", "DB 执行器拒绝的任务数", ("reason",)
+)
+SINGLE_FLIGHT_CALLS = registry.counter(
+    "dao_single_flight_calls_total", "单飞合并的调用次数", ("function", "result")
+)
+
+# 缓存键：(字段名, 字段值)
+EntityKey = tuple[str, Any]
+
+ModelT = TypeVar("ModelT")
+F = TypeVar("F", bound=Callable[..., Any])
+
+# 单飞等待方等待执行方的最长时间，超时后自行执行
+SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS = 10.0
+
+# SQLite 单条语句的绑定参数上限（3.32 之前为 999，之后默认 32766），取保守值
+SQLITE_MAX_VARIABLES = 999
+
+_MISSING = object()
+
+_db_executor: DBExecutor | None = None
+_db_executor_lock = threading.Lock()
+
+
+class EntityCache:
+    """主键 / 唯一键 -> 不可变快照的 TTL + LRU 缓存，线程安全。"""
+
+    def __init__(
+        self,
+        model: type[Any],
+        schema: type[BaseModel],
+        unique_keys: tuple[str, ...] = (),
+        negative: bool = False,
+        pk: str = "id",
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        negative_ttl_seconds: float | None = None,
+    ):
+        if not schema.model_config.get("frozen"):
+            raise ValueError(f"{schema.__name__} 需要 frozen=True 才能作为缓存快照")
+        self.model = model
+        self.schema = schema
+        self.name = model.__tablename__
+        self.pk = pk
+        self.fields = (pk, *unique_keys)
+        self.negative = negative
+        self.max_entries = (
+            global_config.entity_cache_max_entries if max_entries is None else max_entries
+        )
+        self.ttl_seconds = (
+            global_config.entity_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        )
+        self.negative_ttl_seconds = (
+            global_config.entity_cache_negative_ttl_seconds
+            if negative_ttl_seconds is None
+            else negative_ttl_seconds
+        )
+        # 键 -> (快照或 None 表示不存在, 过期时间)
+        self._entries: OrderedDict[EntityKey, tuple[BaseModel | None, float]] = (
+            OrderedDict()
+        )
+        self._keys_by_pk: dict[Any, set[EntityKey]] = {}
+        # 每次失效加一；未命中开始后若发生过失效，则不写入本次结果
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def check_field(self, field: str) -> None:
+        if field not in self.fields:
+            raise ValueError(f"{self.name} 的实体缓存只支持按 {self.fields} 查找")
+
+    def lookup(self, field: str, value: Any) -> Any:
+        """返回快照、None（负缓存命中）或 `_MISSING`（需要查库）。"""
+        if not self.enabled:
+            return _MISSING
+        key = (field, value)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                result = _MISSING
+            else:
+                self._entries.move_to_end(key)
+                result = entry[0]
+        if result is _MISSING:
+            ENTITY_CACHE_LOOKUPS.inc(self.name, "miss")
+        else:
+            ENTITY_CACHE_LOOKUPS.inc(self.name, "hit" if result is not None else "negative_hit")
+        return result
+
+    def store(self, field: str, value: Any, obj: Any, generation: int) -> BaseModel | None:
+        """把查库结果转换为快照并写入（`obj` 为 None 时写入负缓存），返回快照。"""
+        snapshot = None if obj is None else self.schema.model_validate(obj, from_attributes=True)
+        if snapshot is None:
+            ttl = self.negative_ttl_seconds if self.negative else 0
+        else:
+            ttl = self.ttl_seconds
+        if not self.enabled or ttl <= 0:
+            return snapshot
+        key = (field, value)
+        with self._lock:
+            if generation != self.generation:
+                return snapshot
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (snapshot, time.monotonic() + ttl)
+            if snapshot is not None:
+                self._keys_by_pk.setdefault(getattr(snapshot, self.pk), set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        return snapshot
+
+    def invalidate(self, pk_value: Any, **unique_values: Any) -> None:
+        """失效主键为 `pk_value` 的实体的所有键，以及给定主键 / 唯一键值上的（负）缓存。"""
+        with self._lock:
+            self.generation += 1
+            keys = self._keys_by_pk.pop(pk_value, set())
+            keys.add((self.pk, pk_value))
+            keys.update(unique_values.items())
+            for key in keys:
+                if key in self._entries:
+                    self._remove(key)
+
+    def invalidate_entity(self, obj: Any) -> None:
+        self.invalidate(
+            getattr(obj, self.pk),
+            **{field: getattr(obj, field) for field in self.fields[1:]},
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._keys_by_pk.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remove(self, key: EntityKey) -> None:
+        snapshot, _ = self._entries.pop(key)
+        if snapshot is None:
+            return
+        pk_value = getattr(snapshot, self.pk)
+        keys = self._keys_by_pk.get(pk_value)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_pk[pk_value]
+
+
+def _chunks(values: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class _DAOMixin(Generic[ModelT]):
+    """同步与异步 DAO 共用的声明与语句构造，执行由子类完成。"""
+
+    # 子类声明 `model = Item` 以使用通用 CRUD 方法
+    model: ClassVar[type | None] = None
+    # 子类声明 `entity_cache = EntityCache(...)` 以启用按主键 / 唯一键的快照缓存
+    entity_cache: ClassVar[EntityCache | None] = None
+
+    def _require_model(self) -> type[ModelT]:
+        if self.model is None:
+            raise TypeError(f"{type(self).__name__} 未声明 model")
+        return self.model
+
+    def _pk_column(self) -> Any:
+        return sa_inspect(self._require_model(), raiseerr=True).primary_key[0]
 
-class BaseDAO:
+    def _select_by_pks(
+        self, pk_values: Sequence[Any], columns: Sequence[str] | None
+    ) -> Select:
+        model = self._require_model()
+        entities = [getattr(model, c) for c in columns] if columns else [model]
+        return select(*entities).where(self._pk_column().in_(pk_values))
+
+    def _select_filtered(self, entity: Any, filters: dict[str, Any]) -> Select:
+        return select(entity).select_from(self._require_model()).filter_by(**filters)
+
+    def _upsert_stmt(
+        self,
+        rows: Sequence[dict[str, Any]],
+        index_elements: Sequence[str],
+        update_columns: Sequence[str] | None,
+    ) -> Any:
+        model = self._require_model()
+        stmt = sqlite_insert(model).values(list(rows))
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(index_elements),
+                set_={c: stmt.excluded[c] for c in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+        # 返回主键与实体缓存的唯一键，用于失效缓存
+        fields = self.entity_cache.fields if self.entity_cache else (self._pk_column().key,)
+        return stmt.returning(*(getattr(model, f) for f in fields))
+
+    def _rows_chunk_size(self, rows: Sequence[dict[str, Any]]) -> int:
+        return max(1, SQLITE_MAX_VARIABLES // max(1, len(rows[0])))
+
+    def _invalidate_rows(self, rows: Sequence[Row]) -> list[Any]:
+        """按 RETURNING 的 (主键, 唯一键...) 行失效实体缓存，返回主键列表。"""
+        cache = self.entity_cache
+        if cache is not None:
+            for row in rows:
+                cache.invalidate(row[0], **dict(zip(cache.fields[1:], row[1:])))
+        pk_values = [row[0] for row in rows]
+        self._after_bulk_write(pk_values)
+        return pk_values
+
+    def _invalidate_pks(self, pk_values: Sequence[Any]) -> None:
+        if self.entity_cache is not None:
+            for pk_value in pk_values:
+                self.entity_cache.invalidate(pk_value)
+        self._after_bulk_write(pk_values)
+
+    def _after_bulk_write(self, pk_values: Sequence[Any]) -> None:
+        """通用批量写提交后的钩子（如失效响应缓存），默认不做任何事。"""
+
+    def _require_cache(self, field: str | None = None) -> EntityCache:
+        cache = self.entity_cache
+        if cache is None:
+            raise TypeError(f"{type(self).__name__} 未声明 entity_cache")
+        if field is not None:
+            cache.check_field(field)
+        return cache
+
+    def _invalidate_cached(self, *objs: Any) -> None:
+        """写操作提交后调用：失效这些实体的缓存（包括其键上的负缓存）。"""
+        if self.entity_cache is not None:
+            for obj in objs:
+                self.entity_cache.invalidate_entity(obj)
+
+
+class BaseDAO(_DAOMixin[ModelT]):
     """DAO 基类"""
 
     def __init__(self, db_session: Session):
         self.db_session = db_session
 
+    def get(self, pk_value: Any) -> ModelT | None:
+        return self.db_session.get(self._require_model(), pk_value)
+
+    def get_by(self, **filters: Any) -> ModelT | None:
+        """按等值条件返回第一条记录。"""
+        stmt = self._select_filtered(self._require_model(), filters).limit(1)
+        return self.db_session.scalars(stmt).first()
+
+    def get_many(
+        self,
+        pk_values: Iterable[Any],
+        columns: Sequence[str] | None = None,
+        chunk_size: int = SQLITE_MAX_VARIABLES,
+    ) -> list[Any]:
+        """
+        按主键批量读取：每 `chunk_size` 个主键一条 `IN` 查询，结果不保证与输入顺序一致。
+
+        给出 `columns` 时返回只含这些列的 Row 元组，不构造 ORM 对象。
+        """
+        pk_values = list(dict.fromkeys(pk_values))
+        results: list[Any] = []
+        for chunk in _chunks(pk_values, chunk_size):
+            stmt = self._select_by_pks(chunk, columns)
+            if columns:
+                results.extend(self.db_session.execute(stmt).all())
+            else:
+                results.extend(self.db_session.scalars(stmt).all())
+        return results
+
+    def exists(self, **filters: Any) -> bool:
+        stmt = self._select_filtered(self._pk_column(), filters).limit(1)
+        return self.db_session.execute(stmt).first() is not None
+
+    def count(self, **filters: Any) -> int:
+        return self.db_session.scalar(self._select_filtered(func.count(), filters))
+
+    def upsert_many(
+        self,
+        rows: Sequence[dict[str, Any]],
+        index_elements: Sequence[str],
+        update_columns: Sequence[str] | None = None,
+    ) -> list[Any]:
+        """
+        `INSERT ... ON CONFLICT` 批量写入，在同一事务中按绑定参数上限分块。
+
+        `update_columns` 为空时冲突行被跳过，否则用新值覆盖这些列；返回插入或更新的主键。
+        `rows` 中每个字典需有相同的键。
+        """
+        if not rows:
+            return []
+        returned: list[Row] = []
+        try:
+            for chunk in _chunks(rows, self._rows_chunk_size(rows)):
+                stmt = self._upsert_stmt(chunk, index_elements, update_columns)
+                returned.extend(self.db_session.execute(stmt).all())
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        return self._invalidate_rows(returned)
+
+    def delete_many(
+        self, pk_values: Iterable[Any], chunk_size: int = SQLITE_MAX_VARIABLES
+    ) -> int:
+        """按主键批量删除并提交，返回删除的行数。"""
+        pk_values = list(dict.fromkeys(pk_values))
+        deleted = 0
+        try:
+            for chunk in _chunks(pk_values, chunk_size):
+                stmt = delete(self._require_model()).where(self._pk_column().in_(chunk))
+                deleted += self.db_session.execute(stmt).rowcount
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        self._invalidate_pks(pk_values)
+        return deleted
+
+    def get_cached(self, pk_value: Any) -> Any:
+        return self.get_cached_by(self._require_cache().pk, pk_value)
+
+    def get_cached_by(self, field: str, value: Any) -> Any:
+        """按主键或声明的唯一键返回快照，不存在时返回 None。"""
+        cache = self._require_cache(field)
+        snapshot = cache.lookup(field, value)
+        if snapshot is not _MISSING:
+            return snapshot
+        generation = cache.generation
+        stmt: Executable = (
+            select(cache.model).where(getattr(cache.model, field) == value).limit(1)
+        )
+        obj = self.db_session.scalars(stmt).first()
+        return cache.store(field, value, obj, generation)
+
+
+class AsyncBaseDAO(_DAOMixin[ModelT]):
+    """异步 DAO 基类"""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db_session = db_session
+
+    async def get(self, pk_value: Any) -> ModelT | None:
+        return await self.db_session.get(self._require_model(), pk_value)
+
+    async def get_by(self, **filters: Any) -> ModelT | None:
+        """按等值条件返回第一条记录。"""
+        stmt = self._select_filtered(self._require_model(), filters).limit(1)
+        return (await self.db_session.scalars(stmt)).first()
+
+    async def get_many(
+        self,
+        pk_values: Iterable[Any],
+        columns: Sequence[str] | None = None,
+        chunk_size: int = SQLITE_MAX_VARIABLES,
+    ) -> list[Any]:
+        """按主键批量读取，语义同 `BaseDAO.get_many`。"""
+        pk_values = list(dict.fromkeys(pk_values))
+        results: list[Any] = []
+        for chunk in _chunks(pk_values, chunk_size):
+            stmt = self._select_by_pks(chunk, columns)
+            if columns:
+                results.extend((await self.db_session.execute(stmt)).all())
+            else:
+                results.extend((await self.db_session.scalars(stmt)).all())
+        return results
+
+    async def exists(self, **filters: Any) -> bool:
+        stmt = self._select_filtered(self._pk_column(), filters).limit(1)
+        return (await self.db_session.execute(stmt)).first() is not None
+
+    async def count(self, **filters: Any) -> int:
+        return await self.db_session.scalar(self._select_filtered(func.count(), filters))
+
+    async def upsert_many(
+        self,
+        rows: Sequence[dict[str, Any]],
+        index_elements: Sequence[str],
+        update_columns: Sequence[str] | None = None,
+    ) -> list[Any]:
+        """`INSERT ... ON CONFLICT` 批量写入，语义同 `BaseDAO.upsert_many`。"""
+        if not rows:
+            return []
+        returned: list[Row] = []
+        try:
+            for chunk in _chunks(rows, self._rows_chunk_size(rows)):
+                stmt = self._upsert_stmt(chunk, index_elements, update_columns)
+                returned.extend((await self.db_session.execute(stmt)).all())
+            await self.db_session.commit()
+        except Exception:
+            await self.db_session.rollback()
+            raise
+        return self._invalidate_rows(returned)
+
+    async def delete_many(
+        self, pk_values: Iterable[Any], chunk_size: int = SQLITE_MAX_VARIABLES
+    ) -> int:
+        """按主键批量删除并提交，返回删除的行数。"""
+        pk_values = list(dict.fromkeys(pk_values))
+        deleted = 0
+        try:
+            for chunk in _chunks(pk_values, chunk_size):
+                stmt = delete(self._require_model()).where(self._pk_column().in_(chunk))
+                deleted += (await self.db_session.execute(stmt)).rowcount
+            await self.db_session.commit()
+        except Exception:
+            await self.db_session.rollback()
+            raise
+        self._invalidate_pks(pk_values)
+        return deleted
+
+    async def get_cached(self, pk_value: Any) -> Any:
+        return await self.get_cached_by(self._require_cache().pk, pk_value)
+
+    async def get_cached_by(self, field: str, value: Any) -> Any:
+        """按主键或声明的唯一键返回快照，不存在时返回 None。"""
+        cache = self._require_cache(field)
+        snapshot = cache.lookup(field, value)
+        if snapshot is not _MISSING:
+            return snapshot
+        generation = cache.generation
+        stmt: Executable = (
+            select(cache.model).where(getattr(cache.model, field) == value).limit(1)
+        )
+        obj = (await self.db_session.scalars(stmt)).first()
+        return cache.store(field, value, obj, generation)
+
+
+class DBExecutor:
+    """
+    专用于同步 ORM 调用的固定大小线程池。
+
+    并发上限为 工作者数量 + 排队上限，超出时直接返回 503；排队超过 `queue_timeout_seconds`
+    的任务开始执行前被放弃并返回 503（客户端多半已超时，不再占用连接）。
+    每个工作线程为每个会话工厂保留一个会话，任务结束时 `close()` 归还连接并清空身份映射后复用。
+    """
+
+    def __init__(self, workers: int, queue_size: int, queue_timeout_seconds: float):
+        self.workers = workers
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="db"
+        )
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._local = threading.local()
+
+    def _session(self, session_factory: Callable[[], Session]) -> Session:
+        sessions = getattr(self._local, "sessions", None)
+        if sessions is None:
+            sessions = self._local.sessions = {}
+        session = sessions.get(session_factory)
+        if session is None:
+            session = sessions[session_factory] = session_factory()
+            # 任务结束即 close()，对象随之分离：提交后不过期，返回的对象在事件循环中仍可读取
+            session.expire_on_commit = False
+        return session
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        session_factory: Callable[[], Session] | None = None,
+    ) -> Any:
+        """在执行器中运行 `func(*args)`；给出 `session_factory` 时运行 `func(session, *args)`。"""
+        if not self._slots.acquire(blocking=False):
+            DB_EXECUTOR_REJECTED.inc("queue_full")
+            logger.warning("DB 执行器队列已满，拒绝请求")
+            raise _db_busy()
+        submitted_at = time.perf_counter()
+
+        def task() -> Any:
+            waited = time.perf_counter() - submitted_at
+            _record_queue_wait(waited)
+            if waited > self.queue_timeout_seconds:
+                DB_EXECUTOR_REJECTED.inc("timeout")
+                raise _db_busy()
+            if session_factory is None:
+                return func(*args)
+            session = self._session(session_factory)
+            try:
+                return func(session, *args)
+            finally:
+                session.close()
+
+        # 与 asyncio.to_thread 一样复制上下文，SQL 统计与日志上下文仍计入当前请求
+        context = contextvars.copy_context()
+        try:
+            future = self._executor.submit(context.run, task)
+        except BaseException:
+            self._slots.release()
+            raise
+        # 以任务实际结束为准释放槽位，请求被取消时也不会提前放行新的任务
+        future.add_done_callback(lambda _: self._slots.release())
+        waiting = asyncio.wrap_future(future)
+        try:
+            # shield：超时后若任务已开始执行仍需等待其结果
+            return await asyncio.wait_for(
+                asyncio.shield(waiting), self.queue_timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            # 工作线程全部被占用时任务一直轮不到，调用方在此放弃；cancel 成功说明任务尚未开始
+            if future.cancel():
+                _record_queue_wait(time.perf_counter() - submitted_at)
+                DB_EXECUTOR_REJECTED.inc("timeout")
+                logger.warning("DB 执行器排队超时，拒绝请求")
+                raise _db_busy() from None
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        # 已在执行（可能已经提交写入）：等待完成而不是返回 503
+        return await waiting
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _record_queue_wait(waited: float) -> None:
+    DB_EXECUTOR_QUEUE_WAIT.observe(waited)
+    stats = current_query_stats()
+    if stats is not None:
+        stats.queue_wait_ms += waited * 1000
+
+
+def _db_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="服务繁忙，请稍后重试",
+        headers={"Retry-After": "1"},
+    )
+
+
+def _default_db_workers() -> int:
+    """与同步引擎的连接池大小一致：每个工作线程最多占用一个池内连接。"""
+    from src.server.database import engine
+
+    size = getattr(engine.pool, "size", None)
+    return size() if callable(size) else 5
+
+
+def get_db_executor() -> DBExecutor:
+    """惰性创建进程内的 DB 执行器（关闭后再次调用会重新创建）。"""
+    global _db_executor
+
+    with _db_executor_lock:
+        if _db_executor is None:
+            workers = global_config.db_executor_workers or _default_db_workers()
+            _db_executor = DBExecutor(
+                workers,
+                global_config.db_executor_queue_size,
+                global_config.db_executor_queue_timeout_seconds,
+            )
+            logger.info(
+                f"DB 执行器已启动：{workers} 个工作线程，"
+                f"排队上限 {global_config.db_executor_queue_size}"
+            )
+        return _db_executor
+
+
+def shutdown_db_executor() -> None:
+    """关闭 DB 执行器（应用关闭时调用）。"""
+    global _db_executor
+
+    with _db_executor_lock:
+        if _db_executor is not None:
+            _db_executor.shutdown()
+        _db_executor = None
+
 
 async def run_in_thread(sync_func: Callable[[], Any]) -> Any:
-    """将同步函数放到默认线程池中执行并返回结果。"""
-    return await asyncio.to_thread(sync_func)
+    """将同步函数放到 DB 执行器中执行并返回结果。"""
+    return await get_db_executor().run(sync_func)
+
+
+async def run_in_db(
+    func: Callable[[Session], Any],
+    session_factory: Callable[[], Session] | None = None,
+) -> Any:
+    """
+    在 DB 执行器中以工作线程绑定的会话运行 `func(session)` 并返回结果。
+
+    `session_factory` 默认为 `SessionLocal`，路由中通常传入 `Depends(get_session_factory)` 的结果。
+    """
+    if session_factory is None:
+        from src.server.database import SessionLocal
+
+        session_factory = SessionLocal
+    return await get_db_executor().run(func, session_factory=session_factory)
+
+
+class SingleFlight:
+    """
+    合并并发的相同调用：同一键同时只执行一次，其余调用共享执行结果（包括异常）。
+
+    同步调用在线程之间合并（等待方阻塞在各自的工作线程中），异步调用在同一事件循环内合并。
+    只合并同时进行的调用，执行完成后不保留结果；需要跨时间复用请配合 `EntityCache` 等缓存。
+    等待超过 `wait_timeout_seconds` 时不再等待执行方，改为自行执行；执行方的异常在等待方中
+    以新的异常实例抛出（`from` 执行方的异常），不会在多个线程间共享同一个异常对象。
+    """
+
+    def __init__(
+        self, name: str, wait_timeout_seconds: float = SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS
+    ):
+        self.name = name
+        self.wait_timeout_seconds = wait_timeout_seconds
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, concurrent.futures.Future] = {}
+        self._async_calls: dict[Hashable, asyncio.Future] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        with self._lock:
+            shared = self._calls.get(key)
+            if shared is None:
+                future: concurrent.futures.Future = concurrent.futures.Future()
+                self._calls[key] = future
+        if shared is not None:
+            SINGLE_FLIGHT_CALLS.inc(self.name, "coalesced")
+            done, _ = concurrent.futures.wait([shared], self.wait_timeout_seconds)
+            if not done:
+                SINGLE_FLIGHT_CALLS.inc(self.name, "wait_timeout")
+                return func()
+            exc = shared.exception()
+            if exc is not None:
+                raise _fresh_exception(exc) from exc
+            return shared.result()
+
+        SINGLE_FLIGHT_CALLS.inc(self.name, "executed")
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+    async def do_async(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        while True:
+            shared = self._async_calls.get(key)
+            if shared is not None:
+                try:
+                    # shield：等待方被取消或超时时不能取消共享的 future
+                    outcome = await asyncio.wait_for(
+                        asyncio.shield(shared), self.wait_timeout_seconds
+                    )
+                except asyncio.TimeoutError:
+                    SINGLE_FLIGHT_CALLS.inc(self.name, "wait_timeout")
+                    return await func()
+                if outcome is _MISSING:
+                    # 执行方被取消，重新竞争执行权
+                    continue
+                SINGLE_FLIGHT_CALLS.inc(self.name, "coalesced")
+                ok, value = outcome
+                if ok:
+                    return value
+                raise _fresh_exception(value) from value
+
+            future = asyncio.get_running_loop().create_future()
+            self._async_calls[key] = future
+            SINGLE_FLIGHT_CALLS.inc(self.name, "executed")
+            result: Any = _MISSING
+            try:
+                value = await func()
+                result = (True, value)
+                return value
+            except Exception as exc:
+                result = (False, exc)
+                raise
+            finally:
+                del self._async_calls[key]
+                future.set_result(result)
+
+
+def _fresh_exception(exc: BaseException) -> BaseException:
+    """复制执行方的异常供等待方抛出（保留类型与属性，不带 traceback），无法复制时改用 RuntimeError。"""
+    try:
+        return copy.copy(exc)
+    except Exception:
+        return RuntimeError(f"合并调用的执行方失败：{exc!r}")
+
+
+def single_flight(
+    key: Callable[..., Hashable] | None = None,
+    name: str | None = None,
+    wait_timeout_seconds: float = SINGLE_FLIGHT_WAIT_TIMEOUT_SECONDS,
+) -> Callable[[F], F]:
+    """
+    装饰器：合并对被装饰函数的并发相同调用，支持同步与 async 函数。
+
+    `key` 接收与被装饰函数相同的参数并返回合并键，用于排除会话等每个请求不同的参数，
+    如 `@single_flight(key=lambda db, item_id: item_id)`；默认以全部参数作为键（须可哈希）。
+    """
+
+    def decorator(func: F) -> F:
+        flight = SingleFlight(
+            name or f"{func.__module__}.{func.__qualname__}", wait_timeout_seconds
+        )
+
+        def make_key(args: tuple, kwargs: dict) -> Hashable:
+            if key is not None:
+                return key(*args, **kwargs)
+            return (args, tuple(sorted(kwargs.items())))
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await flight.do_async(
+                    make_key(args, kwargs), lambda: func(*args, **kwargs)
+                )
+
+            async_wrapper.single_flight = flight  # type: ignore[attr-defined]
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return flight.do(make_key(args, kwargs), lambda: func(*args, **kwargs))
+
+        wrapper.single_flight = flight  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
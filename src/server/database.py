@@ -4,52 +4,246 @@
 
 公开接口：
 - `Base`：SQLAlchemy 声明基类
-- `engine`：数据库引擎
+- `engine`：数据库引擎（连接池参数见 `GlobalConfig.db_pool_*`）
+- `InstrumentedQueuePool`：记录检出耗时、溢出连接与检出超时的 QueuePool
+- `InstrumentedAsyncQueuePool`：异步引擎使用的同类连接池（AsyncAdaptedQueuePool）
 - `SessionLocal`：会话工厂
 - `get_db()`：FastAPI 依赖获取会话
+- `get_session_factory()`：FastAPI 依赖获取会话工厂（流式响应等需自行管理会话生命周期的场景）
+- `async_engine`：基于 aiosqlite 的异步引擎
+- `AsyncSessionLocal`：异步会话工厂
+- `get_async_db()`：FastAPI 依赖获取异步会话
 - `init_database()`：创建所有表
 - `get_database_info()`：返回数据库文件信息
+- `SQLITE_PRAGMA_PROFILES`：SQLite PRAGMA 配置档
+- `resolve_sqlite_pragmas()`：合并配置档与单项覆盖后的 PRAGMA
+- `install_sqlite_pragmas()`：为引擎注册 connect 事件，在每个新连接上执行 PRAGMA
+- `get_sqlite_pragma_values()` / `log_sqlite_pragmas()`：读取/记录实际生效值
+- `get_pool_status()`：同步引擎连接池的当前状态
+- `check_database_health()`：执行 `SELECT 1` 并返回耗时、连接池状态与检出统计（`/api/health/db`）
+- `warm_up_pool()`：预先建立 `pool_size` 个连接
 
 内部方法：
 - 无
 
 说明：
-- 使用 SQLite，路由中通过 `asyncio.to_thread` 调用同步 ORM，避免阻塞事件循环。
+- 使用 SQLite，路由中通过 DB 执行器（`dao_base.run_in_db` / `run_in_thread`）调用同步 ORM，避免阻塞事件循环。
+- 路由也可按路由器粒度改用 `get_async_db` + 异步 DAO，直接在事件循环中 await 数据库 I/O。
+- 异步会话关闭了 `expire_on_commit`，提交后仍可直接读取对象属性（异步模式下不支持隐式懒加载）。
+- 同步与异步引擎都注册了指标事件（连接检出数、SQL 语句数），`get_db`/`get_async_db`
+  记录会话数，见 `src.server.metrics`。
+- 同步与异步引擎都注册了 SQL 计时事件：按请求统计语句数与耗时、慢查询写入 slow_sql.log，
+  见 `src.server.sql_instrumentation`。
+- 同步引擎使用 `InstrumentedQueuePool`，大小 / 溢出 / 超时 / 回收 / 检出前探测由 `DB_POOL_*` 配置；
+  检出与归还事件维护 `db_connections_in_use`，检出耗时、溢出连接与超时分别记入
+  `db_pool_checkout_seconds`、`db_pool_overflow_total`、`db_pool_checkout_timeouts_total`
+  （按 `engine` 标签区分 sync / async）。QueuePool 没有“开始检出”事件，耗时在 `_do_get` 中测量。
+- 异步引擎（aiosqlite）使用 `InstrumentedAsyncQueuePool`，同样由 `DB_POOL_*` 配置（每个引擎各自一套连接），
+  连接及其 PRAGMA 只在首次建立时执行一次。池化的 aiosqlite 连接绑定创建它的事件循环：
+  每个工作进程只有一个事件循环，可以安全复用；测试环境（`APP_ENV=test`）中 TestClient 每次使用新的
+  事件循环，因此保留 NullPool。连接池预热只针对同步引擎。
+- 默认使用 production 配置档（WAL + synchronous=NORMAL + busy_timeout 等），
+  显著降低并发写入时的 "database is locked"；同步与异步引擎都会应用。
 """
 
 from __future__ import annotations
 
 import os
-from typing import Any, Iterator
-from sqlalchemy import create_engine
+from time import perf_counter
+from typing import Any, AsyncIterator, Iterator
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
 from pathlib import Path
 from loguru import logger
 
 from src.server.config import global_config
-from src.server.schemas import DatabaseInfo
+from src.server.metrics import (
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_OVERFLOW,
+    DB_SESSIONS,
+    DB_SESSIONS_IN_USE,
+    install_db_metrics,
+)
+from src.server.schemas import DatabaseHealth, DatabaseInfo, DatabasePoolStatus
+from src.server.sql_instrumentation import install_sql_instrumentation
 
 Base: Any = declarative_base()
 PROJECT_ROOT = Path.cwd()
 DATABASE_PATH = PROJECT_ROOT / global_config.database_path
 
+SQLITE_PRAGMA_PROFILES: dict[str, dict[str, str | int]] = {
+    "default": {},
+    "production": {
+        # busy_timeout 放在最前，切换 WAL 时若遇到锁也会等待而不是立即失败
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    },
+}
+
+_SQLITE_PRAGMA_NAMES = (
+    "busy_timeout",
+    "journal_mode",
+    "synchronous",
+    "mmap_size",
+    "cache_size",
+    "temp_store",
+)
+
+
+def resolve_sqlite_pragmas() -> dict[str, str | int]:
+    """合并配置档与 `GlobalConfig.sqlite_*` 单项覆盖，返回需要执行的 PRAGMA。"""
+    profile = global_config.sqlite_pragma_profile
+    if profile not in SQLITE_PRAGMA_PROFILES:
+        raise ValueError(f"未知的 SQLite PRAGMA 配置档：{profile}")
+    pragmas = dict(SQLITE_PRAGMA_PROFILES[profile])
+    overrides: dict[str, str | int | None] = {
+        "busy_timeout": global_config.sqlite_busy_timeout_ms,
+        "journal_mode": global_config.sqlite_journal_mode,
+        "synchronous": global_config.sqlite_synchronous,
+        "mmap_size": global_config.sqlite_mmap_size,
+        "cache_size": global_config.sqlite_cache_size,
+        "temp_store": global_config.sqlite_temp_store,
+    }
+    pragmas.update({k: v for k, v in overrides.items() if v is not None})
+    return pragmas
+
+
+def install_sqlite_pragmas(
+    target_engine: Engine, pragmas: dict[str, str | int] | None = None
+) -> None:
+    """为引擎注册 connect 事件，每个新建的 DBAPI 连接都会执行一次 PRAGMA。"""
+    pragmas = resolve_sqlite_pragmas() if pragmas is None else pragmas
+    if not pragmas:
+        return
+    statements = [f"PRAGMA {name}={value}" for name, value in pragmas.items()]
+
+    def _apply_pragmas(dbapi_connection, _connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    event.listen(target_engine, "connect", _apply_pragmas)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录检出耗时、溢出连接与检出超时的 QueuePool。"""
+
+    # 指标的 engine 标签
+    engine_label = "sync"
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        started_at = perf_counter()
+        try:
+            connection = super()._do_get()
+        except sa_exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc(self.engine_label)
+            raise
+        DB_POOL_CHECKOUT_SECONDS.observe(perf_counter() - started_at, self.engine_label)
+        # overflow 为已建连接数减去 pool_size，新建的连接使其超过 0 时即为溢出连接
+        if self.overflow() > max(overflow_before, 0):
+            DB_POOL_OVERFLOW.inc(self.engine_label)
+        return connection
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """异步引擎的 `InstrumentedQueuePool`（队列实现来自 AsyncAdaptedQueuePool）。"""
+
+    engine_label = "async"
+
+
+def _pool_options() -> dict[str, Any]:
+    return {
+        "pool_size": global_config.db_pool_size,
+        "max_overflow": global_config.db_max_overflow,
+        "pool_timeout": global_config.db_pool_timeout,
+        "pool_recycle": global_config.db_pool_recycle,
+        "pool_pre_ping": global_config.db_pool_pre_ping,
+    }
+
+
+def _async_pool_options() -> dict[str, Any]:
+    if global_config.app_env == "test":
+        return {"poolclass": NullPool}
+    return {"poolclass": InstrumentedAsyncQueuePool, **_pool_options()}
+
+
 SQLALCHEMY_DATABASE_URL = f"{global_config.database_protocol}:///{DATABASE_PATH}"
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},  # SQLite 特有
     echo=False,
+    poolclass=InstrumentedQueuePool,
+    **_pool_options(),
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_SQLALCHEMY_DATABASE_URL = (
+    f"{global_config.database_protocol}+{global_config.database_async_driver}"
+    f":///{DATABASE_PATH}"
+)
+async_engine = create_async_engine(
+    ASYNC_SQLALCHEMY_DATABASE_URL, echo=False, **_async_pool_options()
+)
+
+if global_config.database_protocol == "sqlite":
+    install_sqlite_pragmas(engine)
+    install_sqlite_pragmas(async_engine.sync_engine)
+
+install_sql_instrumentation(engine)
+install_sql_instrumentation(async_engine.sync_engine)
+
+if global_config.metrics_enabled:
+    install_db_metrics(engine)
+    install_db_metrics(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 def get_db() -> Iterator:
     """获取数据库会话（FastAPI 依赖）。"""
     db = SessionLocal()
+    DB_SESSIONS.inc("sync")
+    DB_SESSIONS_IN_USE.inc("sync")
     try:
         yield db
     finally:
         db.close()
+        DB_SESSIONS_IN_USE.dec("sync")
+
+
+def get_session_factory() -> sessionmaker:
+    """获取会话工厂（FastAPI 依赖）。
+
+    `get_db` 的会话会在响应发送前关闭，流式响应需要用工厂在生成器内自行创建会话。
+    """
+    return SessionLocal
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """获取异步数据库会话（FastAPI 依赖）。"""
+    DB_SESSIONS.inc("async")
+    DB_SESSIONS_IN_USE.inc("async")
+    try:
+        async with AsyncSessionLocal() as db:
+            yield db
+    finally:
+        DB_SESSIONS_IN_USE.dec("async")
 
 
 def init_database() -> None:
@@ -66,6 +260,11 @@ def init_database() -> None:
             if DATABASE_PATH.exists():
                 DATABASE_PATH.unlink()
                 logger.info("测试环境：已删除数据库文件，确保干净环境")
+            # WAL 模式下的附属文件
+            for suffix in ("-wal", "-shm"):
+                DATABASE_PATH.with_name(DATABASE_PATH.name + suffix).unlink(
+                    missing_ok=True
+                )
     except Exception as e:
         logger.warning(f"测试环境数据库清理失败（可忽略）：{e}")
 
@@ -107,3 +306,84 @@ def get_database_info() -> DatabaseInfo:
         database_exists=DATABASE_PATH.exists(),
         database_size=DATABASE_PATH.stat().st_size if DATABASE_PATH.exists() else None,
     )
+
+
+def get_sqlite_pragma_values(target_engine: Engine | None = None) -> dict[str, Any]:
+    """查询连接上实际生效的 PRAGMA 值。"""
+    with (target_engine or engine).connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in _SQLITE_PRAGMA_NAMES
+        }
+
+
+def log_sqlite_pragmas() -> None:
+    """启动时记录 SQLite 实际生效的 PRAGMA，便于确认配置档已应用。"""
+    if global_config.database_protocol != "sqlite":
+        return
+    values = get_sqlite_pragma_values()
+    logger.info(
+        f"SQLite PRAGMA（配置档 {global_config.sqlite_pragma_profile}）："
+        + ", ".join(f"{name}={value}" for name, value in values.items())
+    )
+
+
+def get_pool_status(target_engine: Engine | None = None) -> DatabasePoolStatus:
+    """返回连接池的当前状态。"""
+    pool = (target_engine or engine).pool
+    if not isinstance(pool, QueuePool):
+        return DatabasePoolStatus(pool_class=type(pool).__name__)
+    return DatabasePoolStatus(
+        pool_class=type(pool).__name__,
+        size=pool.size(),
+        max_overflow=global_config.db_max_overflow,
+        timeout_seconds=pool.timeout(),
+        checked_in=pool.checkedin(),
+        checked_out=pool.checkedout(),
+        overflow=max(pool.overflow(), 0),
+    )
+
+
+def check_database_health(target_engine: Engine | None = None) -> DatabaseHealth:
+    """检出一个连接执行 `SELECT 1`，返回耗时、连接池状态与累计检出统计。"""
+    target = target_engine or engine
+    started_at = perf_counter()
+    error = None
+    try:
+        with target.connect() as conn:
+            conn.exec_driver_sql("SELECT 1").scalar()
+    except Exception as e:
+        error = str(e)
+        logger.warning(f"数据库健康检查失败：{e}")
+    return DatabaseHealth(
+        status="error" if error else "ok",
+        latency_ms=round((perf_counter() - started_at) * 1000, 3),
+        pool=get_pool_status(target),
+        checkouts=DB_POOL_CHECKOUT_SECONDS.count("sync"),
+        checkout_timeouts=int(DB_POOL_CHECKOUT_TIMEOUTS.value("sync")),
+        overflow_connections=int(DB_POOL_OVERFLOW.value("sync")),
+        error=error,
+    )
+
+
+def warm_up_pool(
+    target_engine: Engine | None = None, connections: int | None = None
+) -> int:
+    """
+    同时检出 `connections`（默认 pool_size）个连接并各执行一次 `SELECT 1` 后归还，
+    使连接（及其 PRAGMA）在首批请求之前建立好。返回建立的连接数。
+    """
+    target = target_engine or engine
+    if connections is None:
+        pool = target.pool
+        connections = pool.size() if isinstance(pool, QueuePool) else 1
+    opened = []
+    try:
+        for _ in range(connections):
+            conn = target.connect()
+            opened.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    finally:
+        for conn in opened:
+            conn.close()
+    return len(opened)
@@ -4,29 +4,227 @@
 
 公开接口：
 - `ExampleItemDAO`
+- `AsyncExampleItemDAO`：基于 `AsyncSession` 的异步版本
+- `ITEMS_CACHE_TAG`、`item_cache_tag(item_id)`：GET 响应缓存的失效标签
+- `item_entity_cache`：按 id / name 缓存 `ItemOut` 快照的实体缓存（含负缓存），同步与异步 DAO 共用
+- `fts_match_expression(query)`：把用户输入转换为安全的 FTS5 前缀查询表达式
+
+内部方法：
+- `_prefix_upper_bound`、`_filter_by_prefix`、`_insert_ignoring_conflicts`
+
+说明：
+- 名称唯一性交由数据库唯一约束保证：创建使用 `INSERT ... ON CONFLICT DO NOTHING RETURNING`，
+  未返回行即表示名称已存在，不再先查询再插入（并发下存在竞态）。
+- 冲突不会抛出异常，但 INSERT 已开启写事务，抛出 `ValueError` 前先回滚以释放 SQLite 写锁。
+- `RETURNING` 已带回全部列：提交前把新对象移出会话，之后的提交或回滚都不会使其过期，
+  调用方读取属性时不再触发一次 SELECT（异步会话中也不会触发隐式懒加载）。
+- 写入提交后失效实体缓存，并按标签失效 GET 响应缓存（单项标签与列表标签）。
+- 全文搜索查询 FTS5 虚拟表（见 `models.ITEM_SEARCH_DDL`），按 bm25 相关度（`rank`，越小越相关）与 id 排序，
+  以 (rank, id) 做键集分页。
 """
 
 from __future__ import annotations
 
+import re
+from typing import Iterator, Sequence
+
+from sqlalchemy import Row, select, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.server.dao.dao_base import BaseDAO
-from .models import Item
+from src.server.dao.dao_base import AsyncBaseDAO, BaseDAO, EntityCache
+from src.server.response_cache import response_cache
+from .models import ITEM_SEARCH_TABLE, Item
+from .schemas import ItemOut
+
+ITEMS_CACHE_TAG = "example_items"
+
+
+def item_cache_tag(item_id: int) -> str:
+    return f"example_item:{item_id}"
+
+
+item_entity_cache = EntityCache(Item, ItemOut, unique_keys=("name",), negative=True)
+
+
+def _prefix_upper_bound(prefix: str) -> str | None:
+    """
+    大于所有以 prefix 开头的字符串的最小上界；prefix 全由 U+10FFFF 组成时不存在上界，返回 None。
+
+    末尾字符为 U+10FFFF 时丢弃它并递增前一个字符；递增时跳过代理区（U+D800–U+DFFF），
+    SQLite 以 UTF-8 字节序比较文本，与码点顺序一致。
+    """
+    while prefix:
+        code = ord(prefix[-1]) + 1
+        if code == 0xD800:
+            code = 0xE000
+        if code <= 0x10FFFF:
+            return prefix[:-1] + chr(code)
+        prefix = prefix[:-1]
+    return None
+
+
+def _filter_by_prefix(stmt, name_prefix: str | None):
+    """名称前缀过滤（区分大小写），改写为范围条件以便使用 name 上的唯一索引。"""
+    if not name_prefix:
+        return stmt
+    stmt = stmt.where(Item.name >= name_prefix)
+    upper_bound = _prefix_upper_bound(name_prefix)
+    if upper_bound is not None:
+        stmt = stmt.where(Item.name < upper_bound)
+    return stmt
+
+
+def _insert_ignoring_conflicts():
+    return sqlite_insert(Item).on_conflict_do_nothing(index_elements=[Item.name])
+
+
+# 与 unicode61 分词器一致：字母与数字为词元字符，其余（包括下划线）均为分隔符
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+_SEARCH_SQL = f"""
+    SELECT i.id, i.name, f.rank
+    FROM {ITEM_SEARCH_TABLE} AS f JOIN example_items AS i ON i.id = f.rowid
+    WHERE f.{ITEM_SEARCH_TABLE} MATCH :match {{after}}
+    ORDER BY f.rank, i.id
+    LIMIT :limit
+"""
+_SEARCH_FIRST_PAGE = text(_SEARCH_SQL.format(after=""))
+_SEARCH_AFTER = text(
+    _SEARCH_SQL.format(after="AND (f.rank > :rank OR (f.rank = :rank AND i.id > :id))")
+)
 
 
-class ExampleItemDAO(BaseDAO):
+def fts_match_expression(query: str) -> str | None:
+    """
+    每个词元作为带引号的短语并做前缀匹配，词元之间为 AND；没有可检索的词元时返回 None。
+
+    用户输入中的 FTS5 运算符（AND/OR/NEAR、括号、引号、星号等）都按普通文本处理。
+    """
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class ExampleItemDAO(BaseDAO[Item]):
+    model = Item
+    entity_cache = item_entity_cache
+
     def __init__(self, db_session: Session):
         super().__init__(db_session)
 
+    def _after_bulk_write(self, pk_values: Sequence[int]) -> None:
+        if pk_values:
+            response_cache.invalidate_tags(
+                ITEMS_CACHE_TAG, *(item_cache_tag(item_id) for item_id in pk_values)
+            )
+
     def create(self, name: str) -> Item:
-        exists = self.db_session.query(Item).filter(Item.name == name).first()
-        if exists:
+        stmt = _insert_ignoring_conflicts().values(name=name).returning(Item)
+        item = self.db_session.scalars(stmt).one_or_none()
+        if item is None:
+            self.db_session.rollback()
             raise ValueError("名称已存在")
-        item = Item(name=name)
-        self.db_session.add(item)
+        self.db_session.expunge(item)
         self.db_session.commit()
-        self.db_session.refresh(item)
+        self._invalidate_cached(item)
+        response_cache.invalidate_tags(item_cache_tag(item.id), ITEMS_CACHE_TAG)
         return item
 
-    def get(self, item_id: int) -> Item | None:
-        return self.db_session.query(Item).filter(Item.id == item_id).first()
+    def create_many(
+        self, names: Sequence[str], chunk_size: int = 500
+    ) -> dict[str, int]:
+        """
+        在同一事务中按块批量插入，已存在的名称被跳过。
+
+        返回本次新插入的 名称 -> id；`names` 需已去重。
+        """
+        created: dict[str, int] = {}
+        stmt = _insert_ignoring_conflicts().returning(Item.id, Item.name)
+        try:
+            for start in range(0, len(names), chunk_size):
+                chunk = names[start : start + chunk_size]
+                rows = self.db_session.execute(stmt, [{"name": n} for n in chunk])
+                created.update((row.name, row.id) for row in rows)
+            self.db_session.commit()
+        except Exception:
+            self.db_session.rollback()
+            raise
+        for name, item_id in created.items():
+            self.entity_cache.invalidate(item_id, name=name)
+        self._after_bulk_write(list(created.values()))
+        return created
+
+    def get_ids_by_names(
+        self, names: Sequence[str], chunk_size: int = 500
+    ) -> dict[str, int]:
+        """按名称批量查询 id，返回 名称 -> id。"""
+        found: dict[str, int] = {}
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start : start + chunk_size]
+            rows = self.db_session.execute(
+                select(Item.id, Item.name).where(Item.name.in_(chunk))
+            )
+            found.update((row.name, row.id) for row in rows)
+        return found
+
+    def list_after(
+        self, after_id: int | None, limit: int, name_prefix: str | None = None
+    ) -> list[Item]:
+        """按 id 升序的键集分页：返回 id > after_id 的至多 limit 项。"""
+        stmt = (
+            _filter_by_prefix(select(Item), name_prefix).order_by(Item.id).limit(limit)
+        )
+        if after_id is not None:
+            stmt = stmt.where(Item.id > after_id)
+        return list(self.db_session.scalars(stmt))
+
+    def search(
+        self, match: str, limit: int, after: tuple[float, int] | None = None
+    ) -> list[Row[tuple[int, str, float]]]:
+        """按相关度返回 (id, name, rank)；`after` 为上一页最后一项的 (rank, id)。"""
+        if after is None:
+            stmt, params = _SEARCH_FIRST_PAGE, {}
+        else:
+            stmt, params = _SEARCH_AFTER, {"rank": after[0], "id": after[1]}
+        rows = self.db_session.execute(stmt, {"match": match, "limit": limit, **params})
+        return list(rows)
+
+    def iter_rows(
+        self, name_prefix: str | None = None, batch_size: int = 1000
+    ) -> Iterator[Sequence[Row[tuple[int, str]]]]:
+        """以服务端游标按批次返回 (id, name) 行，内存占用与表大小无关。"""
+        stmt = (
+            _filter_by_prefix(select(Item.id, Item.name), name_prefix)
+            .order_by(Item.id)
+            .execution_options(yield_per=batch_size)
+        )
+        yield from self.db_session.execute(stmt).partitions()
+
+
+class AsyncExampleItemDAO(AsyncBaseDAO[Item]):
+    model = Item
+    entity_cache = item_entity_cache
+
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session)
+
+    def _after_bulk_write(self, pk_values: Sequence[int]) -> None:
+        if pk_values:
+            response_cache.invalidate_tags(
+                ITEMS_CACHE_TAG, *(item_cache_tag(item_id) for item_id in pk_values)
+            )
+
+    async def create(self, name: str) -> Item:
+        stmt = _insert_ignoring_conflicts().values(name=name).returning(Item)
+        item = (await self.db_session.scalars(stmt)).one_or_none()
+        if item is None:
+            await self.db_session.rollback()
+            raise ValueError("名称已存在")
+        self.db_session.expunge(item)
+        await self.db_session.commit()
+        self._invalidate_cached(item)
+        response_cache.invalidate_tags(item_cache_tag(item.id), ITEMS_CACHE_TAG)
+        return item
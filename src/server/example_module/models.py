@@ -4,15 +4,18 @@
 
 公开接口：
 - `Item`
+- `ITEM_SEARCH_TABLE`、`ITEM_SEARCH_DDL`：项目名称的 FTS5 全文索引（外部内容表 + 同步触发器）
 
 规范注释：
 - 本项目中，为了保持模型的简洁性和可维护性，禁止使用外键关系。
   所有跨表关联应通过服务层手动处理，以提高灵活性和降低耦合度。
+- FTS5 虚拟表不属于 ORM 元数据：`create_all` 建出 `example_items` 后由事件监听器执行 `ITEM_SEARCH_DDL`，
+  已有数据库由 Alembic 迁移创建并回填；触发器保证任何写入（包括原生 SQL）都会同步索引。
 """
 
 from __future__ import annotations
 
-from sqlalchemy import Integer, String
+from sqlalchemy import DDL, Integer, String, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.server.database import Base
@@ -23,3 +26,33 @@ class Item(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, nullable=False)
+
+
+ITEM_SEARCH_TABLE = "example_items_fts"
+
+# 外部内容表只存倒排索引，不重复存储名称；prefix 为 2、3 字符前缀建立额外索引，加速短前缀查询
+ITEM_SEARCH_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {ITEM_SEARCH_TABLE} USING fts5("
+    "name, content='example_items', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    f"CREATE TRIGGER IF NOT EXISTS {ITEM_SEARCH_TABLE}_ai AFTER INSERT ON example_items BEGIN "
+    f"INSERT INTO {ITEM_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {ITEM_SEARCH_TABLE}_ad AFTER DELETE ON example_items BEGIN "
+    f"INSERT INTO {ITEM_SEARCH_TABLE}({ITEM_SEARCH_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); END",
+    f"CREATE TRIGGER IF NOT EXISTS {ITEM_SEARCH_TABLE}_au AFTER UPDATE OF name ON example_items BEGIN "
+    f"INSERT INTO {ITEM_SEARCH_TABLE}({ITEM_SEARCH_TABLE}, rowid, name) "
+    "VALUES ('delete', old.id, old.name); "
+    f"INSERT INTO {ITEM_SEARCH_TABLE}(rowid, name) VALUES (new.id, new.name); END",
+)
+
+for _statement in ITEM_SEARCH_DDL:
+    event.listen(
+        Item.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite")
+    )
+# 触发器随 example_items 一起删除，虚拟表需要单独删除
+event.listen(
+    Item.__table__,
+    "after_drop",
+    DDL(f"DROP TABLE IF EXISTS {ITEM_SEARCH_TABLE}").execute_if(dialect="sqlite"),
+)
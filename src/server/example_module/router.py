@@ -5,18 +5,41 @@
 公开接口：
 - GET /api/example/ping
 - POST /api/example/items
+- POST /api/example/items:batch
+- GET /api/example/items
+- GET /api/example/items/search
+- GET /api/example/items:export
 - GET /api/example/items/{item_id}
+
+说明：
+- 返回值通过 `model_response` 直接序列化为 JSON bytes，`response_model` 仅用于文档。
+- 同步 ORM 调用经 `run_in_db` 在 DB 执行器中执行，使用工作线程绑定的会话；执行器繁忙时返回 503。
+- `GET /items/{item_id}` 经 `cached_get` 缓存序列化结果并支持 ETag（If-None-Match）条件请求，
+  创建项目时由 DAO 按标签失效。
 """
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, sessionmaker
 
-from src.server.database import get_db
-from .schemas import ItemCreate, ItemOut
+from src.server.database import get_session_factory
+from src.server.response_cache import cached_get
+from src.server.responses import model_response
+from .dao import item_cache_tag
+from .schemas import (
+    ItemBatchCreate,
+    ItemBatchOut,
+    ItemCreate,
+    ItemOut,
+    ItemPage,
+    ItemSearchPage,
+)
 from . import service
-from src.server.dao.dao_base import run_in_thread
+from src.server.dao.dao_base import run_in_db
 
 router = APIRouter(prefix="/api/example", tags=["示例"])
 
@@ -46,11 +69,112 @@ async def ping() -> dict[str, str]:
         400: {"description": "请求参数错误"},
     },
 )
-async def create_item(payload: ItemCreate, db: Session = Depends(get_db)):
-    def _create():
+async def create_item(
+    payload: ItemCreate,
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    def _create(db: Session):
         return service.create_item(db, payload.name)
 
-    return await run_in_thread(_create)
+    item = await run_in_db(_create, session_factory)
+    return model_response(ItemOut, item, status_code=status.HTTP_201_CREATED)
+
+
+@router.post(
+    "/items:batch",
+    response_model=ItemBatchOut,
+    summary="批量创建项目",
+    description="在一个事务中批量创建项目，已存在或请求内重复的名称会被跳过，并逐项返回处理结果",
+    response_description="返回新建数量与逐项结果",
+    responses={
+        200: {"description": "批量处理完成"},
+        422: {"description": "名称为空、过长或数量超过上限"},
+    },
+)
+async def create_items_batch(
+    payload: ItemBatchCreate,
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    def _create(db: Session):
+        return service.create_items_batch(db, payload.names)
+
+    result = await run_in_db(_create, session_factory)
+    return model_response(ItemBatchOut, result)
+
+
+@router.get(
+    "/items",
+    response_model=ItemPage,
+    summary="分页列出项目",
+    description="按 id 升序的键集分页；将上一页返回的 next_cursor 作为 cursor 获取下一页",
+    response_description="返回当前页项目与下一页游标",
+    responses={
+        200: {"description": "获取项目列表成功"},
+    },
+)
+async def list_items(
+    cursor: Optional[int] = Query(
+        default=None, ge=0, description="上一页最后一项的 id"
+    ),
+    limit: int = Query(default=20, ge=1, le=service.MAX_PAGE_LIMIT),
+    name_prefix: Optional[str] = Query(
+        default=None, min_length=1, max_length=100, description="名称前缀（区分大小写）"
+    ),
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    def _list(db: Session):
+        return service.list_items(db, cursor, limit, name_prefix)
+
+    page = await run_in_db(_list, session_factory)
+    return model_response(ItemPage, page)
+
+
+@router.get(
+    "/items/search",
+    response_model=ItemSearchPage,
+    summary="搜索项目",
+    description=(
+        "按名称全文搜索（SQLite FTS5），每个词做前缀匹配、词之间为“与”，按相关度排序；"
+        "将上一页返回的 next_cursor 作为 cursor 获取下一页"
+    ),
+    response_description="返回当前页项目与下一页游标",
+    responses={
+        200: {"description": "搜索成功"},
+        400: {"description": "游标无效"},
+    },
+)
+async def search_items(
+    q: str = Query(..., min_length=1, max_length=100, description="搜索词"),
+    limit: int = Query(default=20, ge=1, le=service.MAX_PAGE_LIMIT),
+    cursor: Optional[str] = Query(default=None, max_length=64, description="分页游标"),
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    def _search(db: Session):
+        return service.search_items(db, q, limit, cursor)
+
+    page = await run_in_db(_search, session_factory)
+    return model_response(ItemSearchPage, page)
+
+
+@router.get(
+    "/items:export",
+    summary="导出全部项目",
+    description="以 NDJSON 流式导出项目（每行一个 JSON 对象），服务端按批次读取，内存占用恒定",
+    response_description="application/x-ndjson 数据流",
+    responses={
+        200: {"description": "导出成功", "content": {"application/x-ndjson": {}}},
+    },
+)
+async def export_items(
+    name_prefix: Optional[str] = Query(
+        default=None, min_length=1, max_length=100, description="名称前缀（区分大小写）"
+    ),
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    return StreamingResponse(
+        service.export_items_ndjson(session_factory, name_prefix),
+        media_type="application/x-ndjson",
+    )
 
 
 @router.get(
@@ -61,11 +185,17 @@ async def create_item(payload: ItemCreate, db: Session = Depends(get_db)):
     response_description="返回指定项目的详细信息",
     responses={
         200: {"description": "获取项目成功"},
+        304: {"description": "项目未变化（条件请求）"},
         404: {"description": "项目不存在"},
     },
 )
-async def get_item(item_id: int, db: Session = Depends(get_db)):
-    def _get():
-        return service.get_item(db, item_id)
+async def get_item(
+    item_id: int,
+    request: Request,
+    session_factory: sessionmaker = Depends(get_session_factory),
+):
+    async def _build():
+        item = await service.get_item_async(session_factory, item_id)
+        return model_response(ItemOut, item)
 
-    return await run_in_thread(_get)
+    return await cached_get(request, _build, tags=[item_cache_tag(item_id)])
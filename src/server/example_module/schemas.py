@@ -3,18 +3,61 @@
 示例模块 Pydantic 模型（模板版）
 
 公开接口：
-- `ItemCreate`、`ItemOut`
+- `ItemCreate`、`ItemOut`、`ItemPage`
+- `ItemSearchPage`：全文搜索结果页
+- `ItemBatchCreate`、`ItemBatchResult`、`ItemBatchOut`：批量创建
 """
 
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Annotated, Literal, Optional
+
+from pydantic import BaseModel, Field, ConfigDict, StringConstraints
 
 
 class ItemCreate(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
 
 
+# 单次批量创建的名称数量上限
+MAX_BATCH_SIZE = 5000
+
+ItemName = Annotated[str, StringConstraints(min_length=1, max_length=100)]
+
+
+class ItemBatchCreate(BaseModel):
+    names: list[ItemName] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+class ItemBatchResult(BaseModel):
+    name: str
+    id: Optional[int] = Field(default=None, description="项目 id（重复出现的名称为空）")
+    status: Literal["created", "exists", "duplicate"] = Field(
+        ...,
+        description="created：新建；exists：名称已存在；duplicate：请求内重复出现",
+    )
+
+
+class ItemBatchOut(BaseModel):
+    created: int
+    results: list[ItemBatchResult]
+
+
 class ItemOut(BaseModel):
     id: int
     name: str
 
-    model_config = ConfigDict(from_attributes=True)
+    # 冻结：同时作为 DAO 实体缓存的快照类型
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
+
+class ItemPage(BaseModel):
+    items: list[ItemOut]
+    next_cursor: Optional[int] = Field(
+        default=None, description="下一页游标（最后一项的 id），为空表示没有更多数据"
+    )
+
+
+class ItemSearchPage(BaseModel):
+    items: list[ItemOut]
+    next_cursor: Optional[str] = Field(
+        default=None, description="下一页游标（不透明字符串），为空表示没有更多结果"
+    )
@@ -4,7 +4,12 @@
 
 公开接口：
 - create_item(db, name)
-- get_item(db, item_id)
+- create_items_batch(db, names)：单事务批量创建，返回逐项结果
+- get_item(db, item_id)：经实体缓存返回 `ItemOut` 快照
+- get_item_async(session_factory, item_id)：在 DB 执行器中执行 `get_item`，并发的相同 id 在派发前合并为一次
+- list_items(db, cursor, limit, name_prefix)：键集分页
+- search_items(db, q, limit, cursor)：FTS5 全文 / 前缀搜索，按相关度的键集分页
+- export_items_ndjson(session_factory, name_prefix)：按批次生成 NDJSON
 
 内部方法：
 - 无
@@ -15,11 +20,21 @@
 
 from __future__ import annotations
 
-from sqlalchemy.orm import Session
+from typing import Iterator
+
+from sqlalchemy.orm import Session, sessionmaker
 from fastapi import HTTPException, status
-from .dao import ExampleItemDAO
 
+from src.server.dao.dao_base import run_in_db, single_flight
+from src.server.responses import dumps_json
+from .dao import ExampleItemDAO, fts_match_expression
 from .models import Item
+from .schemas import ItemBatchOut, ItemBatchResult, ItemOut, ItemPage, ItemSearchPage
+
+# 分页大小上限、导出时每批从游标读取的行数与批量插入每条语句的行数
+MAX_PAGE_LIMIT = 100
+EXPORT_BATCH_SIZE = 1000
+INSERT_CHUNK_SIZE = 500
 
 
 def create_item(db: Session, name: str) -> Item:
@@ -32,9 +47,91 @@ def create_item(db: Session, name: str) -> Item:
         )
 
 
-def get_item(db: Session, item_id: int) -> Item:
+def create_items_batch(db: Session, names: list[str]) -> ItemBatchOut:
+    unique_names = list(dict.fromkeys(names))
     dao = ExampleItemDAO(db)
-    item = dao.get(item_id)
+    created = dao.create_many(unique_names, INSERT_CHUNK_SIZE)
+    existing_names = [name for name in unique_names if name not in created]
+    existing = dao.get_ids_by_names(existing_names, INSERT_CHUNK_SIZE)
+
+    results: list[ItemBatchResult] = []
+    seen: set[str] = set()
+    for name in names:
+        if name in seen:
+            results.append(ItemBatchResult(name=name, status="duplicate"))
+            continue
+        seen.add(name)
+        if name in created:
+            results.append(
+                ItemBatchResult(name=name, id=created[name], status="created")
+            )
+        else:
+            results.append(
+                ItemBatchResult(name=name, id=existing.get(name), status="exists")
+            )
+    return ItemBatchOut(created=len(created), results=results)
+
+
+def get_item(db: Session, item_id: int) -> ItemOut:
+    dao = ExampleItemDAO(db)
+    item = dao.get_cached(item_id)
     if not item:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="未找到")
     return item
+
+
+@single_flight(key=lambda session_factory, item_id: item_id)
+async def get_item_async(session_factory: sessionmaker, item_id: int) -> ItemOut:
+    """在事件循环中合并后再派发：等待方不占用 DB 执行器的工作线程。"""
+    return await run_in_db(lambda db: get_item(db, item_id), session_factory)
+
+
+def list_items(
+    db: Session, cursor: int | None, limit: int, name_prefix: str | None = None
+) -> ItemPage:
+    limit = min(limit, MAX_PAGE_LIMIT)
+    # 多取一条判断是否还有下一页，避免额外的 COUNT 查询
+    items = ExampleItemDAO(db).list_after(cursor, limit + 1, name_prefix)
+    has_more = len(items) > limit
+    items = items[:limit]
+    return ItemPage.model_validate(
+        {"items": items, "next_cursor": items[-1].id if has_more else None}
+    )
+
+
+def _parse_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, item_id = cursor.rsplit(":", 1)
+        return float(rank), int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="无效的游标")
+
+
+def search_items(
+    db: Session, q: str, limit: int, cursor: str | None = None
+) -> ItemSearchPage:
+    limit = min(limit, MAX_PAGE_LIMIT)
+    match = fts_match_expression(q)
+    if match is None:
+        return ItemSearchPage(items=[], next_cursor=None)
+    after = _parse_search_cursor(cursor) if cursor else None
+    rows = ExampleItemDAO(db).search(match, limit + 1, after)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    # repr 保证浮点数往返无损，下一页的比较与本页完全一致
+    next_cursor = f"{rows[-1].rank!r}:{rows[-1].id}" if has_more else None
+    return ItemSearchPage(
+        items=[ItemOut(id=row.id, name=row.name) for row in rows],
+        next_cursor=next_cursor,
+    )
+
+
+def export_items_ndjson(
+    session_factory: sessionmaker, name_prefix: str | None = None
+) -> Iterator[bytes]:
+    """逐批读取并输出 NDJSON；会话由生成器自行持有，直到导出结束或客户端断开。"""
+    with session_factory() as db:
+        for rows in ExampleItemDAO(db).iter_rows(name_prefix, EXPORT_BATCH_SIZE):
+            yield b"".join(
+                dumps_json({"id": row.id, "name": row.name}) + b"\n" for row in rows
+            )
@@ -4,9 +4,16 @@
 """
 
 import pytest
+from pydantic import ValidationError
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from src.server.example_module.dao import ExampleItemDAO
+from src.server.example_module.dao import (
+    AsyncExampleItemDAO,
+    ExampleItemDAO,
+    fts_match_expression,
+)
 from src.server.example_module.models import Item
 
 
@@ -19,12 +26,15 @@ def test_example_item_dao_create(test_db_session: Session):
 
     assert item is not None
     assert item.name == "test_item"
+    # RETURNING 的结果在提交后仍可直接读取，不会重新加载
+    assert not sa_inspect(item).expired_attributes
 
     # 测试重复名称
     with pytest.raises(ValueError) as exc_info:
         dao.create("test_item")
 
     assert str(exc_info.value) == "名称已存在"
+    assert not test_db_session.in_transaction()
 
 
 def test_example_item_dao_get(test_db_session: Session):
@@ -46,3 +56,137 @@ def test_example_item_dao_get(test_db_session: Session):
     # 获取不存在的项目
     retrieved_item = dao.get(999999)
     assert retrieved_item is None
+
+
+def test_example_item_dao_list_and_iter(test_db_session: Session):
+    """测试键集分页与按批次迭代"""
+    for name in ["b-1", "a-1", "b-2", "c-1"]:
+        test_db_session.add(Item(name=name))
+    test_db_session.commit()
+
+    dao = ExampleItemDAO(test_db_session)
+
+    first = dao.list_after(None, 2)
+    assert [item.name for item in first] == ["b-1", "a-1"]
+    rest = dao.list_after(first[-1].id, 10)
+    assert [item.name for item in rest] == ["b-2", "c-1"]
+    assert [item.name for item in dao.list_after(None, 10, "b-")] == ["b-1", "b-2"]
+
+    batches = list(dao.iter_rows(batch_size=3))
+    assert [len(batch) for batch in batches] == [3, 1]
+    assert [row.name for row in next(dao.iter_rows("b"))] == ["b-1", "b-2"]
+
+
+def test_example_item_dao_prefix_filter_at_code_point_limits(test_db_session: Session):
+    """测试前缀末尾为 U+10FFFF 或 U+D7FF 时范围上界仍然正确"""
+    names = ["a\U0010ffff", "a\U0010ffffz", "b", "\U0010ffff", "\ud7ffx", "\ue000"]
+    for name in names:
+        test_db_session.add(Item(name=name))
+    test_db_session.commit()
+
+    dao = ExampleItemDAO(test_db_session)
+
+    def names_with(prefix: str) -> list[str]:
+        return [item.name for item in dao.list_after(None, 10, prefix)]
+
+    assert names_with("a\U0010ffff") == ["a\U0010ffff", "a\U0010ffffz"]
+    assert names_with("\U0010ffff") == ["\U0010ffff"]
+    assert names_with("\ud7ff") == ["\ud7ffx"]
+
+
+@pytest.mark.asyncio
+async def test_async_example_item_dao(test_async_db_session: AsyncSession):
+    """测试异步 DAO 的创建与查询"""
+    dao = AsyncExampleItemDAO(test_async_db_session)
+
+    item = await dao.create("async_item")
+    assert item.name == "async_item"
+
+    with pytest.raises(ValueError) as exc_info:
+        await dao.create("async_item")
+    assert str(exc_info.value) == "名称已存在"
+    assert not test_async_db_session.in_transaction()
+
+    retrieved_item = await dao.get(item.id)
+    assert retrieved_item is not None
+    assert retrieved_item.name == "async_item"
+    assert await dao.get(999999) is None
+
+
+def test_example_item_dao_create_many(test_db_session: Session):
+    """测试批量插入跳过已存在名称并按块执行"""
+    dao = ExampleItemDAO(test_db_session)
+    existing = dao.create("b")
+
+    created = dao.create_many(["a", "b", "c", "d", "e"], chunk_size=2)
+    assert set(created) == {"a", "c", "d", "e"}
+    assert dao.get_ids_by_names(["b", "missing"]) == {"b": existing.id}
+    assert test_db_session.query(Item).count() == 5
+
+
+def test_example_item_dao_entity_cache(test_db_session: Session):
+    """测试按 id / 名称读取快照、负缓存与创建时的失效"""
+    dao = ExampleItemDAO(test_db_session)
+    item = dao.create("cached_item")
+
+    snapshot = dao.get_cached(item.id)
+    assert snapshot.name == "cached_item"
+    assert dao.get_cached_by("name", "cached_item") == snapshot
+
+    # 绕过 DAO 修改数据：命中缓存时仍返回旧快照，说明没有查库
+    test_db_session.execute(text("UPDATE example_items SET name = 'renamed'"))
+    test_db_session.commit()
+    assert dao.get_cached(item.id).name == "cached_item"
+
+    # 负缓存：创建后立即清除该名称上的“不存在”记录
+    assert dao.get_cached_by("name", "later") is None
+    later = dao.create("later")
+    assert dao.get_cached_by("name", "later").id == later.id
+
+    with pytest.raises(ValueError):
+        dao.get_cached_by("id_or_name", 1)
+
+
+@pytest.mark.asyncio
+async def test_async_example_item_dao_shares_entity_cache(
+    test_async_db_session: AsyncSession,
+):
+    """测试异步 DAO 与同步 DAO 共用实体缓存，快照不可修改"""
+    dao = AsyncExampleItemDAO(test_async_db_session)
+    assert await dao.get_cached(1) is None
+
+    await dao.create("async_item")
+
+    snapshot = await dao.get_cached(1)
+    assert snapshot.name == "async_item"
+    with pytest.raises(ValidationError):
+        snapshot.name = "changed"
+
+
+def test_example_item_search_index_follows_writes(test_db_session: Session):
+    """测试触发器在插入、改名、删除后同步全文索引"""
+    dao = ExampleItemDAO(test_db_session)
+    item = dao.create("Crème brûlée")
+    creme, tat = fts_match_expression("creme"), fts_match_expression("tat")
+    assert creme is not None and tat is not None
+
+    # remove_diacritics：无重音的输入也能匹配
+    assert [row.id for row in dao.search(creme, 10)] == [item.id]
+
+    test_db_session.execute(
+        text("UPDATE example_items SET name = 'tarte tatin' WHERE id = :id"),
+        {"id": item.id},
+    )
+    test_db_session.commit()
+    assert dao.search(creme, 10) == []
+    assert len(dao.search(tat, 10)) == 1
+
+    dao.delete_many([item.id])
+    assert dao.search(tat, 10) == []
+
+
+def test_fts_match_expression_quotes_tokens():
+    """测试搜索词被拆成带引号的前缀短语"""
+    assert fts_match_expression('foo "bar" OR*') == '"foo"* "bar"* "OR"*'
+    assert fts_match_expression("a_b") == '"a"* "b"*'
+    assert fts_match_expression(" -()* ") is None
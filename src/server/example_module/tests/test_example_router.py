@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import json
 from http import HTTPStatus
 
 
@@ -26,3 +27,145 @@ def test_create_and_get_item(test_client):
     # 查询不存在
     resp4 = test_client.get("/api/example/items/999999")
     assert resp4.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_list_items_keyset_pagination(test_client):
+    for name in ["apple", "apricot", "banana", "avocado", "blueberry"]:
+        test_client.post("/api/example/items", json={"name": name})
+
+    # 第一页
+    resp = test_client.get("/api/example/items", params={"limit": 2})
+    assert resp.status_code == HTTPStatus.OK, resp.text
+    page = resp.json()
+    assert [item["name"] for item in page["items"]] == ["apple", "apricot"]
+    assert page["next_cursor"] == page["items"][-1]["id"]
+
+    # 使用游标获取后续页
+    resp = test_client.get(
+        "/api/example/items", params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    page = resp.json()
+    assert [item["name"] for item in page["items"]] == ["banana", "avocado"]
+
+    resp = test_client.get(
+        "/api/example/items", params={"limit": 2, "cursor": page["next_cursor"]}
+    )
+    assert [item["name"] for item in resp.json()["items"]] == ["blueberry"]
+    assert resp.json()["next_cursor"] is None
+
+    # 名称前缀过滤
+    resp = test_client.get("/api/example/items", params={"name_prefix": "a"})
+    assert [item["name"] for item in resp.json()["items"]] == [
+        "apple",
+        "apricot",
+        "avocado",
+    ]
+
+    # 超过上限
+    resp = test_client.get("/api/example/items", params={"limit": 1000})
+    assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_export_items_ndjson(test_client):
+    for name in ["apple", "banana", "avocado"]:
+        test_client.post("/api/example/items", json={"name": name})
+
+    resp = test_client.get("/api/example/items:export")
+    assert resp.status_code == HTTPStatus.OK
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert [line["name"] for line in lines] == ["apple", "banana", "avocado"]
+
+    resp = test_client.get("/api/example/items:export", params={"name_prefix": "b"})
+    assert [json.loads(line)["name"] for line in resp.text.splitlines()] == ["banana"]
+
+
+def test_create_items_batch(test_client):
+    test_client.post("/api/example/items", json={"name": "item-0"})
+
+    names = [f"item-{i}" for i in range(1200)]
+    resp = test_client.post("/api/example/items:batch", json={"names": names})
+    assert resp.status_code == HTTPStatus.OK, resp.text
+    body = resp.json()
+    assert body["created"] == 1199
+    assert body["results"][0]["status"] == "exists"
+    assert all(r["status"] == "created" for r in body["results"][1:])
+
+    resp = test_client.get("/api/example/items", params={"limit": 1})
+    assert resp.json()["next_cursor"] is not None
+
+    # 空列表与空名称
+    resp = test_client.post("/api/example/items:batch", json={"names": []})
+    assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    resp = test_client.post("/api/example/items:batch", json={"names": [""]})
+    assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+def test_get_item_cached_with_etag(test_client):
+    item = test_client.post("/api/example/items", json={"name": "cached"}).json()
+
+    resp = test_client.get(f"/api/example/items/{item['id']}")
+    assert resp.status_code == HTTPStatus.OK
+    etag = resp.headers["etag"]
+    assert resp.headers["cache-control"] == "private, no-cache"
+
+    # 携带 ETag 重新验证：未变化返回 304
+    resp2 = test_client.get(
+        f"/api/example/items/{item['id']}", headers={"If-None-Match": etag}
+    )
+    assert resp2.status_code == HTTPStatus.NOT_MODIFIED
+    assert resp2.content == b""
+
+    # 404 不缓存：创建后立即可见
+    missing = item["id"] + 1
+    assert test_client.get(f"/api/example/items/{missing}").status_code == 404
+    test_client.post("/api/example/items", json={"name": "later"})
+    assert test_client.get(f"/api/example/items/{missing}").status_code == 200
+
+
+def test_search_items_prefix_ranking_and_pagination(test_client):
+    test_client.post(
+        "/api/example/items:batch",
+        json={"names": ["red apple pie", "apple", "green apple", "banana", "pineapple"]},
+    )
+
+    # 前缀匹配：词首匹配 "app"，不匹配词中的 "pineapple"
+    resp = test_client.get("/api/example/items/search", params={"q": "app"})
+    assert resp.status_code == HTTPStatus.OK, resp.text
+    names = [item["name"] for item in resp.json()["items"]]
+    assert names[0] == "apple"
+    assert sorted(names) == ["apple", "green apple", "red apple pie"]
+
+    # 多个词之间为“与”
+    resp = test_client.get("/api/example/items/search", params={"q": "apple re"})
+    assert [item["name"] for item in resp.json()["items"]] == ["red apple pie"]
+
+    # 按 (rank, id) 键集分页，结果不重复不遗漏
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"q": "apple", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        page = test_client.get("/api/example/items/search", params=params).json()
+        seen.extend(item["name"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == names
+
+
+def test_search_items_handles_operators_and_bad_cursor(test_client):
+    test_client.post("/api/example/items", json={"name": "hello world"})
+
+    # FTS5 语法字符按普通文本处理，不会报错
+    for q in ['"hello', "hello OR", "(wor*", "-"]:
+        resp = test_client.get("/api/example/items/search", params={"q": q})
+        assert resp.status_code == HTTPStatus.OK, (q, resp.text)
+    resp = test_client.get("/api/example/items/search", params={"q": "-"})
+    assert resp.json() == {"items": [], "next_cursor": None}
+
+    resp = test_client.get(
+        "/api/example/items/search", params={"q": "hello", "cursor": "oops"}
+    )
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
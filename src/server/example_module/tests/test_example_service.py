@@ -4,11 +4,17 @@
 """
 
 import pytest
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from fastapi import HTTPException
 
 from src.server.example_module.models import Item
-from src.server.example_module.service import create_item, get_item
+from src.server.example_module.service import (
+    create_item,
+    create_items_batch,
+    export_items_ndjson,
+    get_item,
+    list_items,
+)
 
 
 def test_create_item(test_db_session: Session):
@@ -47,3 +53,38 @@ def test_get_item(test_db_session: Session):
 
     assert exc_info.value.status_code == 404
     assert exc_info.value.detail == "未找到"
+
+
+def test_list_and_export_items(test_db_session: Session):
+    """测试分页列出与 NDJSON 导出"""
+    for i in range(5):
+        create_item(test_db_session, f"item-{i}")
+
+    page = list_items(test_db_session, cursor=None, limit=3)
+    assert [item.name for item in page.items] == ["item-0", "item-1", "item-2"]
+    assert page.next_cursor == page.items[-1].id
+
+    page = list_items(test_db_session, cursor=page.next_cursor, limit=3)
+    assert [item.name for item in page.items] == ["item-3", "item-4"]
+    assert page.next_cursor is None
+
+    factory = sessionmaker(bind=test_db_session.bind)
+    body = b"".join(export_items_ndjson(factory, name_prefix="item-"))
+    assert body.count(b"\n") == 5
+    assert body.startswith(b'{"id":')
+
+
+def test_create_items_batch(test_db_session: Session):
+    """测试批量创建的逐项结果"""
+    existing = create_item(test_db_session, "old")
+
+    result = create_items_batch(test_db_session, ["new-1", "old", "new-2", "new-1"])
+    assert result.created == 2
+    assert [(r.name, r.status) for r in result.results] == [
+        ("new-1", "created"),
+        ("old", "exists"),
+        ("new-2", "created"),
+        ("new-1", "duplicate"),
+    ]
+    assert result.results[1].id == existing.id
+    assert result.results[3].id is None
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+"""
+POST 请求幂等键（Idempotency-Key）
+
+公开接口：
+- `IdempotencyMiddleware`：纯 ASGI 中间件，对配置的 POST 路径按 `Idempotency-Key` 请求头去重
+- `IdempotencyManager`：内存 LRU + 持久化存储 + 进程内并发合并
+- `SQLiteIdempotencyStore`：存放已完成响应的 SQLite 表（带过期时间，按批清理）
+- `StoredResponse`：一次完成的响应（状态码、响应头、响应体与请求指纹）
+- `idempotency_manager`：按 `GlobalConfig` 创建的全局实例
+- `run_idempotency_cleanup(manager)`：后台定时按批删除过期键
+- 指标：`IDEMPOTENCY_REQUESTS`（按结果）
+
+内部方法：
+- `_read_body`、`_scoped_key`、`_error_response`
+
+说明：
+- 键的作用域为 (路径, Authorization 摘要, 客户端给出的键)，不同用户之间不会串用。
+- 同一键的请求体指纹（blake2b）不同时返回 422；另一个进程正在处理同一键时返回 409。
+- 同一进程内的并发重复请求只执行一次，其余请求等待其结果后原样重放（响应头 `Idempotent-Replayed: true`）。
+- 只保存状态码 < 500 且响应体不超过 `IDEMPOTENCY_MAX_BODY_BYTES` 的响应；5xx 或执行中断会释放预留，允许重试。
+- 执行前先在 SQLite 中写入“处理中”预留（带租约），进程崩溃后租约到期即可被重新获取。
+- 响应体超过 256 字节时以 zlib 压缩存储。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.server.config import global_config
+from src.server.metrics import registry
+
+IDEMPOTENCY_REQUESTS = registry.counter(
+    "http_idempotency_requests_total", "携带幂等键的请求数", ("result",)
+)
+
+# 幂等键的最大长度（字符）
+MAX_KEY_LENGTH = 255
+# 响应体达到该长度才压缩，更短的 JSON 压缩收益不抵开销
+COMPRESS_MIN_BYTES = 256
+# 预留状态：尚未完成的请求
+_PENDING = 0
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    fingerprint: str
+    status: int
+    headers: tuple[tuple[str, str], ...]
+    body: bytes
+
+    def messages(self, replayed: bool) -> list[Message]:
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in self.headers
+            if name != "content-length"
+        ]
+        headers.append((b"content-length", str(len(self.body)).encode()))
+        if replayed:
+            headers.append((b"idempotent-replayed", b"true"))
+        return [
+            {"type": "http.response.start", "status": self.status, "headers": headers},
+            {"type": "http.response.body", "body": self.body},
+        ]
+
+
+def _error_response(status: int, detail: str) -> StoredResponse:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    return StoredResponse("", status, (("content-type", "application/json"),), body)
+
+
+class SQLiteIdempotencyStore:
+    """已完成响应的持久化存储，多个工作进程共享同一个 SQLite 文件。"""
+
+    _RESERVE_SQL = """
+        INSERT INTO idempotency_keys (key, fingerprint, status, expires_at)
+        VALUES (:key, :fingerprint, 0, :lease_until)
+        ON CONFLICT (key) DO UPDATE SET
+            fingerprint = excluded.fingerprint,
+            status = 0,
+            headers = NULL,
+            body = NULL,
+            compressed = 0,
+            expires_at = excluded.expires_at
+        WHERE idempotency_keys.expires_at < :now
+        RETURNING key
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        """每个线程一个连接，首次使用时建表。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, status INTEGER NOT NULL, "
+                "headers TEXT, body BLOB, compressed INTEGER NOT NULL DEFAULT 0, "
+                "expires_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_idempotency_keys_expires_at "
+                "ON idempotency_keys (expires_at)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def reserve(
+        self, key: str, fingerprint: str, lease_seconds: float
+    ) -> tuple[bool, StoredResponse | None]:
+        """
+        尝试预留键：成功返回 (True, None)。
+
+        键已存在时返回 (False, 记录)，记录的 status 为 0 表示其他请求仍在处理；
+        记录恰好在两条语句之间被清理时返回 (False, None)，调用方重试即可。
+        """
+        now = time.time()
+        conn = self._connect()
+        reserved = conn.execute(
+            self._RESERVE_SQL,
+            {
+                "key": key,
+                "fingerprint": fingerprint,
+                "lease_until": now + lease_seconds,
+                "now": now,
+            },
+        ).fetchone()
+        if reserved is not None:
+            return True, None
+        row = conn.execute(
+            "SELECT fingerprint, status, headers, body, compressed "
+            "FROM idempotency_keys WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return False, None
+        fingerprint, status, headers, body, compressed = row
+        if status == _PENDING:
+            return False, StoredResponse(fingerprint, _PENDING, (), b"")
+        if compressed:
+            body = zlib.decompress(body)
+        return False, StoredResponse(
+            fingerprint,
+            status,
+            tuple(tuple(pair) for pair in json.loads(headers)),
+            bytes(body or b""),
+        )
+
+    def complete(self, key: str, response: StoredResponse, ttl_seconds: float) -> None:
+        compressed = len(response.body) >= COMPRESS_MIN_BYTES
+        body = zlib.compress(response.body) if compressed else response.body
+        self._connect().execute(
+            "UPDATE idempotency_keys SET status = ?, headers = ?, body = ?, "
+            "compressed = ?, expires_at = ? WHERE key = ?",
+            (
+                response.status,
+                json.dumps(response.headers),
+                body,
+                int(compressed),
+                time.time() + ttl_seconds,
+                key,
+            ),
+        )
+
+    def release(self, key: str) -> None:
+        self._connect().execute(
+            "DELETE FROM idempotency_keys WHERE key = ? AND status = 0", (key,)
+        )
+
+    def purge_expired(self, batch_size: int) -> int:
+        """删除一批已过期的键，返回删除数量。"""
+        cursor = self._connect().execute(
+            "DELETE FROM idempotency_keys WHERE rowid IN ("
+            "SELECT rowid FROM idempotency_keys WHERE expires_at < ? LIMIT ?)",
+            (time.time(), batch_size),
+        )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM idempotency_keys")
+
+
+class IdempotencyManager:
+    """内存 LRU 在前、SQLite 在后，并合并同一进程内的并发重复请求。"""
+
+    def __init__(
+        self,
+        store: SQLiteIdempotencyStore,
+        ttl_seconds: float,
+        lease_seconds: float,
+        max_entries: int,
+        max_body_bytes: int,
+    ):
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.lease_seconds = lease_seconds
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        # 键 -> (响应, 过期时间)；只在事件循环线程中访问
+        self._recent: OrderedDict[str, tuple[StoredResponse, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[StoredResponse | None]] = {}
+
+    def _recent_get(self, key: str) -> StoredResponse | None:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del self._recent[key]
+            return None
+        self._recent.move_to_end(key)
+        return entry[0]
+
+    def _recent_put(self, key: str, response: StoredResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        self._recent[key] = (response, time.time() + self.ttl_seconds)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_entries:
+            self._recent.popitem(last=False)
+
+    @staticmethod
+    def _replay(response: StoredResponse, fingerprint: str, result: str) -> tuple[StoredResponse, bool]:
+        if response.fingerprint != fingerprint:
+            IDEMPOTENCY_REQUESTS.inc("mismatch")
+            return _error_response(422, "幂等键已用于不同的请求内容"), False
+        IDEMPOTENCY_REQUESTS.inc(result)
+        return response, True
+
+    async def handle(
+        self,
+        key: str,
+        fingerprint: str,
+        run: Callable[[], Awaitable[StoredResponse]],
+    ) -> tuple[StoredResponse, bool]:
+        """返回 (要发送的响应, 是否为重放)；`run` 执行实际的请求处理并返回完整响应。"""
+        while True:
+            recent = self._recent_get(key)
+            if recent is not None:
+                return self._replay(recent, fingerprint, "replayed")
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                # shield：等待方被取消时不能取消共享的 future
+                result = await asyncio.shield(inflight)
+                if result is None:
+                    # 执行方失败或被取消，重新竞争执行权
+                    continue
+                return self._replay(result, fingerprint, "coalesced")
+
+            future: asyncio.Future[StoredResponse | None] = (
+                asyncio.get_running_loop().create_future()
+            )
+            self._inflight[key] = future
+            outcome: StoredResponse | None = None
+            try:
+                outcome, replayed = await self._execute(key, fingerprint, run)
+                if outcome is None:
+                    continue
+                return outcome, replayed
+            finally:
+                del self._inflight[key]
+                # 409 / 422 等错误响应不代表该键的结果，等待方自行重新判断
+                future.set_result(outcome if outcome and outcome.fingerprint else None)
+
+    async def _execute(
+        self,
+        key: str,
+        fingerprint: str,
+        run: Callable[[], Awaitable[StoredResponse]],
+    ) -> tuple[StoredResponse | None, bool]:
+        reserved, stored = await asyncio.to_thread(
+            self.store.reserve, key, fingerprint, self.lease_seconds
+        )
+        if not reserved:
+            if stored is None:
+                return None, False
+            if stored.status == _PENDING:
+                IDEMPOTENCY_REQUESTS.inc("conflict")
+                return _error_response(409, "相同幂等键的请求正在处理中，请稍后重试"), False
+            self._recent_put(key, stored)
+            return self._replay(stored, fingerprint, "replayed")
+
+        try:
+            response = await run()
+        except BaseException:
+            await asyncio.to_thread(self.store.release, key)
+            raise
+        IDEMPOTENCY_REQUESTS.inc("executed")
+        response = StoredResponse(fingerprint, response.status, response.headers, response.body)
+        if response.status < 500 and len(response.body) <= self.max_body_bytes:
+            await asyncio.to_thread(self.store.complete, key, response, self.ttl_seconds)
+            self._recent_put(key, response)
+        else:
+            await asyncio.to_thread(self.store.release, key)
+        return response, False
+
+    def purge_expired(self, batch_size: int) -> int:
+        """按批删除过期键直到没有剩余，返回删除总数（在线程中调用）。"""
+        total = 0
+        while True:
+            deleted = self.store.purge_expired(batch_size)
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    def clear(self) -> None:
+        self._recent.clear()
+        self.store.clear()
+
+
+async def _read_body(receive: Receive) -> tuple[bytes, list[Message]]:
+    """读取完整请求体，同时保留原始消息以便原样交给下游应用。"""
+    messages: list[Message] = []
+    chunks: list[bytes] = []
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks), messages
+
+
+def _scoped_key(path: str, key: str, authorization: str | None) -> str:
+    principal = (
+        hashlib.blake2b(authorization.encode("utf-8"), digest_size=16).hexdigest()
+        if authorization
+        else "-"
+    )
+    return f"{path}\n{principal}\n{key}"
+
+
+class IdempotencyMiddleware:
+    """
+    纯 ASGI 中间件：只处理 `paths` 中的 POST 请求且携带 `Idempotency-Key` 时生效，
+    其余请求原样透传。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        paths: list[str],
+        manager: IdempotencyManager | None = None,
+    ) -> None:
+        self.app = app
+        self.paths = frozenset(paths)
+        self.manager = manager or idempotency_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        raw_key = headers.get("idempotency-key")
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            for message in _error_response(
+                400, f"Idempotency-Key 长度需在 1 到 {MAX_KEY_LENGTH} 之间"
+            ).messages(replayed=False):
+                await send(message)
+            return
+
+        body, request_messages = await _read_body(receive)
+        fingerprint = hashlib.blake2b(body, digest_size=16).hexdigest()
+        key = _scoped_key(scope["path"], raw_key, headers.get("authorization"))
+
+        async def run() -> StoredResponse:
+            pending = list(request_messages)
+
+            async def replay_receive() -> Message:
+                if pending:
+                    return pending.pop(0)
+                return await receive()
+
+            status = 500
+            response_headers: list[tuple[str, str]] = []
+            chunks: list[bytes] = []
+
+            async def capture(message: Message) -> None:
+                nonlocal status
+                if message["type"] == "http.response.start":
+                    status = message["status"]
+                    response_headers.extend(
+                        (name.decode("latin-1").lower(), value.decode("latin-1"))
+                        for name, value in message.get("headers", [])
+                    )
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, replay_receive, capture)
+            return StoredResponse("", status, tuple(response_headers), b"".join(chunks))
+
+        response, replayed = await self.manager.handle(key, fingerprint, run)
+        for message in response.messages(replayed):
+            await send(message)
+
+
+async def run_idempotency_cleanup(
+    manager: IdempotencyManager, interval_seconds: float, batch_size: int
+) -> None:
+    """定时在线程池中按批删除过期的幂等键。"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            deleted = await asyncio.to_thread(manager.purge_expired, batch_size)
+            if deleted:
+                logger.debug(f"已清理 {deleted} 个过期的幂等键")
+        except Exception as exc:
+            logger.warning(f"清理过期幂等键失败：{exc}")
+
+
+idempotency_manager = IdempotencyManager(
+    SQLiteIdempotencyStore(
+        global_config.project_root / global_config.idempotency_sqlite_path
+    ),
+    ttl_seconds=global_config.idempotency_ttl_seconds,
+    lease_seconds=global_config.idempotency_lease_seconds,
+    max_entries=global_config.idempotency_cache_max_entries,
+    max_body_bytes=global_config.idempotency_max_body_bytes,
+)
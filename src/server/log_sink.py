@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+批量日志写入
+
+公开接口：
+- `BatchedLogSink`：Loguru 流式 sink；记录只格式化一次，由后台线程按批写入各个目标
+- `LogDestination`：写入目标（标准输出或文件）及其记录筛选条件
+- `RotatingLogFile`：带缓冲的追加写文件，按大小轮转、按天数或文件数清理
+- `AccessLogSampler`：按路径前缀对访问日志采样，错误请求始终保留
+- `parse_size()` / `parse_retention()`：解析 "20 MB"、"14 days"、"10 files" 形式的配置
+
+内部方法：
+- 无
+
+说明：
+- 队列有上限，写满时直接丢弃并计入 `log_records_dropped_total` 指标，而不是无限增长。
+- 后台线程每隔 flush 间隔或积累到批量大小时被唤醒，每个目标每批只做一次 write + flush。
+- 进程退出或 sink 被移除（`logger.remove()`）时会写完队列中剩余的记录。
+- 轮转按编码后的字节数判断；多工作进程时各进程写独立文件（`per_process`），不会互相轮转。
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import random
+import sys
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Mapping, TextIO
+
+from src.server.metrics import registry
+
+if TYPE_CHECKING:
+    import loguru
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped_total", "日志队列写满时丢弃的记录数"
+)
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(b|kb|mb|gb)?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"b": 1, "kb": 1024, "mb": 1024**2, "gb": 1024**3}
+_STAMP_PATTERN = r"\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2}_\d{6}"
+_RETENTION_PATTERN = re.compile(
+    r"^\s*(\d+)\s*(files?|hours?|days?|weeks?)\s*$", re.IGNORECASE
+)
+
+
+def parse_size(value: str) -> int | None:
+    """解析 "20 MB" 形式的大小，无法解析时返回 None。"""
+    match = _SIZE_PATTERN.match(value)
+    if not match:
+        return None
+    return int(float(match.group(1)) * _SIZE_UNITS[(match.group(2) or "b").lower()])
+
+
+def parse_retention(value: str) -> int | timedelta | None:
+    """解析 "14 days" / "10 files"：返回保留时长或保留文件数，无法解析时返回 None。"""
+    match = _RETENTION_PATTERN.match(value)
+    if not match:
+        return None
+    amount, unit = int(match.group(1)), match.group(2).lower().rstrip("s")
+    if unit == "file":
+        return amount
+    return timedelta(**{f"{unit}s": amount})
+
+
+class RotatingLogFile:
+    """
+    追加写入的日志文件，超过 `max_bytes` 时重命名为带时间戳的文件后重新打开。
+
+    `per_process=True` 时每个进程写自己的 `<名称>.<pid>.log`，避免多个工作进程同时轮转同一文件；
+    轮转文件名带时间戳与 pid，保留策略对所有进程的轮转文件统一生效，
+    进程关闭时当前文件也按轮转文件归档。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int | None = None,
+        retention: int | timedelta | None = None,
+        encoding: str = "utf-8",
+        buffer_size: int = 64 * 1024,
+        per_process: bool = False,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.retention = retention
+        self.encoding = encoding
+        self.buffer_size = buffer_size
+        self.per_process = per_process
+        self.pid = os.getpid()
+        self.active_path = (
+            self.path.with_name(f"{self.path.stem}.{self.pid}{self.path.suffix}")
+            if per_process
+            else self.path
+        )
+        self._rotated_pattern = re.compile(
+            rf"^{re.escape(self.path.stem)}\.{_STAMP_PATTERN}(\.\d+)?"
+            rf"{re.escape(self.path.suffix)}$"
+        )
+        self._file = self._open()
+
+    def _open(self) -> TextIO:
+        self.active_path.parent.mkdir(parents=True, exist_ok=True)
+        file = open(
+            self.active_path, "a", encoding=self.encoding, buffering=self.buffer_size
+        )
+        self._size = os.fstat(file.fileno()).st_size
+        return file
+
+    def write(self, text: str) -> None:
+        # 按编码后的字节数计算：中文日志的字符数远小于字节数
+        size = len(text.encode(self.encoding))
+        if self.max_bytes and self._size + size > self.max_bytes and self._size > 0:
+            self._rotate()
+        self._file.write(text)
+        self._file.flush()
+        self._size += size
+
+    def _rotate(self, reopen: bool = True) -> None:
+        self._file.close()
+        stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S_%f")
+        name = f"{self.path.stem}.{stamp}"
+        if self.per_process:
+            name += f".{self.pid}"
+        self.active_path.rename(self.path.with_name(name + self.path.suffix))
+        self._cleanup()
+        if reopen:
+            self._file = self._open()
+
+    def _cleanup(self) -> None:
+        if self.retention is None:
+            return
+        rotated = sorted(
+            (
+                p
+                for p in self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}")
+                if self._rotated_pattern.match(p.name)
+            ),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        if isinstance(self.retention, int):
+            expired = rotated[self.retention :]
+        else:
+            cutoff = datetime.now().timestamp() - self.retention.total_seconds()
+            expired = [p for p in rotated if p.stat().st_mtime < cutoff]
+        for path in expired:
+            path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if not self.per_process or os.getpid() != self.pid:
+            self._file.close()
+        elif self._size > 0:
+            # 工作进程退出后不会再写该文件：归档为轮转文件，交由保留策略清理
+            self._rotate(reopen=False)
+        else:
+            self._file.close()
+            self.active_path.unlink(missing_ok=True)
+
+
+class LogDestination:
+    """一个写入目标：`accepts(record)` 为真的记录会写入 `stream`。"""
+
+    def __init__(
+        self,
+        name: str,
+        stream: RotatingLogFile | TextIO,
+        accepts: Callable[["loguru.Record"], bool],
+    ) -> None:
+        self.name = name
+        self.stream = stream
+        self.accepts = accepts
+
+    def write(self, text: str) -> None:
+        if isinstance(self.stream, RotatingLogFile):
+            self.stream.write(text)
+        elif not self.stream.closed:
+            # 标准输出可能在解释器退出（或测试捕获结束）时先被关闭
+            self.stream.write(text)
+            self.stream.flush()
+
+    def close(self) -> None:
+        if isinstance(self.stream, RotatingLogFile):
+            self.stream.close()
+
+
+class AccessLogSampler:
+    """
+    访问日志采样：按最长前缀匹配 `rates`（路径 -> 保留比例 0~1）。
+
+    非访问日志、ERROR 及以上级别与状态码 >= 400 的访问日志始终保留。
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        self.rates = sorted(rates.items(), key=lambda item: len(item[0]), reverse=True)
+
+    def __call__(self, record: Mapping[str, Any]) -> bool:
+        extra = record["extra"]
+        if not self.rates or extra.get("log_type") != "access":
+            return True
+        if record["level"].no >= 40 or extra.get("status_code", 0) >= 400:
+            return True
+        path = extra.get("path", "")
+        for prefix, rate in self.rates:
+            if path.startswith(prefix):
+                return rate >= 1 or random.random() < rate
+        return True
+
+
+class BatchedLogSink:
+    """
+    批量写入的 Loguru sink（实现 write/stop，按流式 sink 注册）。
+
+    `write` 在记录日志的线程中调用，只做入队；格式化由 Loguru 在入队前完成一次。
+    """
+
+    def __init__(
+        self,
+        destinations: list[LogDestination],
+        flush_interval: float = 0.2,
+        batch_size: int = 256,
+        queue_size: int = 10000,
+    ) -> None:
+        self.destinations = destinations
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._queue: deque[Any] = deque()
+        self._wakeup = threading.Event()
+        self._drain_lock = threading.Lock()
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name="log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def write(self, message: Any) -> None:
+        if len(self._queue) >= self.queue_size:
+            LOG_RECORDS_DROPPED.inc()
+            return
+        self._queue.append(message)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.drain()
+
+    def drain(self) -> None:
+        """将队列中的记录按目标分组写出（后台线程周期调用，也可手动调用）。"""
+        with self._drain_lock:
+            batches: dict[int, list[str]] = {}
+            queue = self._queue
+            while queue:
+                message = queue.popleft()
+                record = message.record
+                for index, destination in enumerate(self.destinations):
+                    if destination.accepts(record):
+                        batches.setdefault(index, []).append(message)
+            for index, lines in batches.items():
+                try:
+                    self.destinations[index].write("".join(lines))
+                except Exception as exc:  # 日志写入失败不能影响请求处理
+                    print(f"日志写入失败（{self.destinations[index].name}）：{exc}", file=sys.stderr)
+
+    def stop(self) -> None:
+        """停止后台线程并写完剩余记录（`logger.remove()` 时由 Loguru 调用）。"""
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.drain()
+        for destination in self.destinations:
+            destination.close()
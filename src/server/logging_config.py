@@ -5,7 +5,16 @@ Loguru 日志初始化。
 职责：
 - 统一初始化控制台和本地文件日志
 - 将标准 logging 转发到 Loguru
-- 提供 app/access/error 三类日志输出
+- 提供 app/access/error/slow_sql 四类日志输出
+- 按 `LOG_ACCESS_SAMPLE_RATES` 对访问日志采样
+
+说明：
+- `LOG_BATCHED=true`（默认）时只注册一个 `BatchedLogSink`：每条记录格式化一次，
+  由后台线程按过滤条件分发并批量写入控制台与各文件；此时 `LOG_SERIALIZE` 同时作用于控制台。
+- 批量模式自行实现按大小轮转与按天数/文件数清理；`LOG_ROTATION`/`LOG_RETENTION`
+  不是 "20 MB"、"14 days" 这类写法时退回为每个目标一个 Loguru sink。
+- 批量模式下 prod 多工作进程（`SERVER_SUPERVISED=1`）时每个工作进程写 `app.<pid>.log` 等独立文件，
+  退出时归档为轮转文件。
 """
 
 from __future__ import annotations
@@ -20,6 +29,15 @@ import loguru
 from loguru import logger
 
 from src.server.config import global_config
+from src.server.log_sink import (
+    AccessLogSampler,
+    BatchedLogSink,
+    LogDestination,
+    RotatingLogFile,
+    parse_retention,
+    parse_size,
+)
+from src.server.process_manager import SUPERVISED_ENV
 
 _LOGGING_CONFIGURED = False
 
@@ -71,13 +89,79 @@ def _is_access_log(record: loguru.Record) -> bool:
 
 
 def _is_app_log(record: loguru.Record) -> bool:
-    return record["extra"].get("log_type", "app") != "access"
+    return record["extra"].get("log_type", "app") not in ("access", "slow_sql")
+
+
+def _is_slow_sql_log(record: loguru.Record) -> bool:
+    return record["extra"].get("log_type") == "slow_sql"
 
 
 def _is_error_log(record: loguru.Record) -> bool:
     return record["level"].no >= logging.ERROR
 
 
+def _level_no(name: str) -> int:
+    return logger.level(name.upper()).no
+
+
+def _add_batched_sink(log_dir: Path, sampler: AccessLogSampler) -> bool:
+    """注册批量写入 sink；轮转/保留配置无法解析时返回 False。"""
+    max_bytes = parse_size(global_config.log_rotation)
+    retention = parse_retention(global_config.log_retention)
+    if max_bytes is None or retention is None:
+        return False
+
+    app_level = _level_no(global_config.log_level)
+
+    # 多工作进程时每个进程写自己的文件，避免同时轮转同一文件
+    per_process = os.getenv(SUPERVISED_ENV) == "1"
+
+    def open_file(name: str) -> RotatingLogFile:
+        return RotatingLogFile(
+            log_dir / name,
+            max_bytes=max_bytes,
+            retention=retention,
+            per_process=per_process,
+        )
+
+    destinations = [
+        LogDestination("stdout", sys.stdout, lambda r: r["level"].no >= app_level),
+        LogDestination(
+            "app",
+            open_file("app.log"),
+            lambda r: r["level"].no >= app_level and _is_app_log(r),
+        ),
+        LogDestination(
+            "access",
+            open_file("access.log"),
+            lambda r: r["level"].no >= logging.INFO and _is_access_log(r),
+        ),
+        LogDestination(
+            "slow_sql",
+            open_file("slow_sql.log"),
+            lambda r: r["level"].no >= logging.WARNING and _is_slow_sql_log(r),
+        ),
+        LogDestination("error", open_file("error.log"), _is_error_log),
+    ]
+    sink = BatchedLogSink(
+        destinations,
+        flush_interval=global_config.log_flush_interval_ms / 1000,
+        batch_size=global_config.log_batch_size,
+        queue_size=global_config.log_queue_size,
+    )
+    logger.add(
+        sink,
+        level=min(app_level, logging.INFO),
+        format=COMMON_LOG_FORMAT,
+        filter=sampler,
+        colorize=False,
+        serialize=global_config.log_serialize,
+        backtrace=True,
+        diagnose=global_config.app_env == "dev",
+    )
+    return True
+
+
 def _configure_standard_logging() -> None:
     intercept_handler = InterceptHandler()
     logging.basicConfig(handlers=[intercept_handler], level=0, force=True)
@@ -103,15 +187,24 @@ def setup_logging() -> None:
 
     log_dir = _resolve_log_dir()
     log_dir.mkdir(parents=True, exist_ok=True)
-    use_enqueue = global_config.app_env != "test" and not os.getenv("PYTEST_CURRENT_TEST")
+    use_enqueue = global_config.app_env != "test" and not os.getenv(
+        "PYTEST_CURRENT_TEST"
+    )
 
     logger.remove()
     logger.configure(extra=DEFAULT_LOG_EXTRA)
 
+    sampler = AccessLogSampler(global_config.log_access_sample_rates)
+    if global_config.log_batched and _add_batched_sink(log_dir, sampler):
+        _configure_standard_logging()
+        _LOGGING_CONFIGURED = True
+        return
+
     logger.add(
         sys.stdout,
         level=global_config.log_level.upper(),
         format=COMMON_LOG_FORMAT,
+        filter=sampler,
         colorize=False,
         enqueue=use_enqueue,
         backtrace=True,
@@ -134,7 +227,20 @@ def setup_logging() -> None:
         log_dir / "access.log",
         level="INFO",
         format=COMMON_LOG_FORMAT,
-        filter=_is_access_log,
+        filter=lambda r: _is_access_log(r) and sampler(r),
+        rotation=global_config.log_rotation,
+        retention=global_config.log_retention,
+        serialize=global_config.log_serialize,
+        encoding="utf-8",
+        enqueue=use_enqueue,
+        backtrace=False,
+        diagnose=False,
+    )
+    logger.add(
+        log_dir / "slow_sql.log",
+        level="WARNING",
+        format=COMMON_LOG_FORMAT,
+        filter=_is_slow_sql_log,
         rotation=global_config.log_rotation,
         retention=global_config.log_retention,
         serialize=global_config.log_serialize,
@@ -157,5 +263,11 @@ def setup_logging() -> None:
         diagnose=global_config.app_env == "dev",
     )
 
+    if global_config.log_batched:
+        logger.warning(
+            f"无法解析日志轮转/保留配置（{global_config.log_rotation!r} / "
+            f"{global_config.log_retention!r}），未启用批量写日志"
+        )
+
     _configure_standard_logging()
     _LOGGING_CONFIGURED = True
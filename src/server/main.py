@@ -5,34 +5,68 @@ FastAPI 应用主入口。
 负责应用的生命周期管理、中间件配置、API路由挂载以及前端SPA的集成。
 """
 
+import asyncio
+import os
 from contextlib import asynccontextmanager
 from pathlib import Path
 from time import perf_counter
 from uuid import uuid4
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
-from fastapi.staticfiles import StaticFiles
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import Scope
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from src.server.config import global_config
-from src.server.database import get_database_info, init_database
+from src.server.dao.dao_base import shutdown_db_executor
+from src.server.database import (
+    AsyncSessionLocal,
+    async_engine,
+    check_database_health,
+    get_database_info,
+    init_database,
+    log_sqlite_pragmas,
+    warm_up_pool,
+)
 from src.server.logging_config import setup_logging
+from src.server.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from src.server.metrics import MetricsMiddleware, registry
+from src.server.process_manager import (
+    STARTUP_DONE_ENV,
+    SUPERVISED_ENV,
+    WorkerRecycleMiddleware,
+    run_migrations,
+)
+from src.server.responses import DefaultJSONResponse, model_response
+from src.server.schemas import DatabaseHealth
+from src.server.sql_instrumentation import report_n_plus_one, track_queries
+from src.server.startup_profile import format_phases, startup_phase
+from src.server.static_files import (
+    ASSETS_DIRNAME,
+    InMemorySPAStaticFiles,
+    SPAStaticFiles,
+)
 
 # 路由模块
 from src.server.auth.router import router as auth_router
+from src.server.auth.service import (
+    run_revocation_sync,
+    shutdown_password_executor,
+    sync_revocations,
+)
 from src.server.example_module.router import router as example_router
 
 # --- 配置与常量 ---
 PROJECT_ROOT = Path(global_config.project_root)
 DIST_DIR = PROJECT_ROOT / "dist"
 INDEX_FILE = DIST_DIR / "index.html"
-ASSETS_DIRNAME = "assets"  # Vite 默认的 hash 产物目录
 
-setup_logging()
+spa_app: InMemorySPAStaticFiles | SPAStaticFiles | None = None
+
+with startup_phase("日志初始化"):
+    setup_logging()
 
 
 # --- 应用生命周期 ---
@@ -40,19 +74,68 @@ setup_logging()
 async def lifespan(_: FastAPI):
     """
     应用生命周期管理：
-    - 启动时检查并按需初始化数据库。
+    - 启动时检查并按需初始化数据库、执行迁移（已有数据库升级到最新版本），
+      并记录 SQLite 实际生效的 PRAGMA。
+    - 生产模式下这些工作已由主进程完成（见 `process_manager.prepare_startup`），工作进程跳过。
+    - 前端构建产物的运行时压缩放到后台线程执行。
+    - 每个工作进程启动时预热同步引擎的连接池（`DB_POOL_WARM_UP`）。
+    - 每个工作进程启动时加载令牌吊销列表，之后在后台定时增量同步。
+    - 启用幂等键时在后台定时按批清理过期的键。
     """
     logger.info("应用启动中...")
-    db_info = get_database_info()
-    if not db_info.database_exists:
-        logger.warning("数据库不存在，正在执行初始化...")
-        init_database()
-        logger.success("数据库初始化完成。")
-    else:
-        logger.info(f"数据库已存在，大小: {db_info.database_size} 字节。")
+    if os.getenv(STARTUP_DONE_ENV) != "1":
+        with startup_phase("数据库检查/初始化"):
+            db_info = get_database_info()
+            if not db_info.database_exists:
+                logger.warning("数据库不存在，正在执行初始化...")
+                init_database()
+                logger.success("数据库初始化完成。")
+            else:
+                logger.info(f"数据库已存在，大小: {db_info.database_size} 字节。")
+        with startup_phase("数据库迁移"):
+            run_migrations(not db_info.database_exists)
+        with startup_phase("SQLite PRAGMA"):
+            log_sqlite_pragmas()
+
+    if global_config.db_pool_warm_up:
+        with startup_phase("连接池预热"):
+            opened = await asyncio.to_thread(warm_up_pool)
+        logger.info(f"连接池已预热：{opened} 个连接")
+
+    with startup_phase("吊销列表加载"):
+        revocations_since = await sync_revocations(AsyncSessionLocal)
+    revocation_task = asyncio.create_task(
+        run_revocation_sync(AsyncSessionLocal, revocations_since)
+    )
+
+    idempotency_task = None
+    if global_config.idempotency_enabled:
+        from src.server.idempotency import idempotency_manager, run_idempotency_cleanup
+
+        idempotency_task = asyncio.create_task(
+            run_idempotency_cleanup(
+                idempotency_manager,
+                global_config.idempotency_cleanup_interval_seconds,
+                global_config.idempotency_cleanup_batch_size,
+            )
+        )
 
+    compress_task = None
+    if isinstance(spa_app, InMemorySPAStaticFiles):
+        # 压缩不阻塞启动，完成前相应文件以原始内容提供
+        compress_task = asyncio.create_task(asyncio.to_thread(spa_app.compress_pending))
+
+    logger.info(f"启动阶段耗时：{format_phases()}")
     logger.success("应用启动完成。")
     yield
+    revocation_task.cancel()
+    if idempotency_task is not None:
+        idempotency_task.cancel()
+    if compress_task is not None:
+        await compress_task
+    shutdown_password_executor()
+    shutdown_db_executor()
+    await async_engine.dispose()
     logger.info("应用已关闭。")
 
 
@@ -61,6 +144,7 @@ fastapi_kwargs = {
     "title": "Fullstack Template Backend",
     "description": "提供身份验证、数据库交互及示例模块的后端服务。",
     "lifespan": lifespan,
+    "default_response_class": DefaultJSONResponse,
 }
 
 if global_config.app_env == "prod":
@@ -71,6 +155,12 @@ if global_config.app_env == "prod":
 
 app = FastAPI(**fastapi_kwargs)  # type: ignore
 
+if global_config.idempotency_enabled:
+    # 按需导入：关闭幂等键时不加载该模块
+    from src.server.idempotency import IdempotencyMiddleware
+
+    # 最内层：保存与重放的响应不包含按请求来源生成的 CORS 等响应头
+    app.add_middleware(IdempotencyMiddleware, paths=global_config.idempotency_paths)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=global_config.allowed_origins,
@@ -80,78 +170,137 @@ app.add_middleware(
 )
 
 
-class CacheControlMiddleware(BaseHTTPMiddleware):
+class CacheControlMiddleware:
     """
-    自定义中间件，为不同路径设置合适的 Cache-Control 响应头。
+    纯 ASGI 中间件，为不同路径设置合适的 Cache-Control 响应头。
     """
 
-    async def dispatch(self, request: Request, call_next):
-        response: Response = await call_next(request)
-        path = request.url.path
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        path: str = scope["path"]
         # 对 Vite 构建的带 hash 的静态资源进行长期缓存
         if path.startswith(f"/{ASSETS_DIRNAME}/"):
-            response.headers.setdefault(
-                "Cache-Control", "public, max-age=31536000, immutable"
-            )
+            cache_control, override = "public, max-age=31536000, immutable", False
         # 对 SPA 的入口文件和其它 HTML 页面禁用缓存，确保用户总能获取最新版本
         elif path == "/" or path.endswith(".html"):
-            response.headers["Cache-Control"] = "no-cache"
-        return response
+            cache_control, override = "no-cache", True
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cache_control(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if override:
+                    headers["Cache-Control"] = cache_control
+                else:
+                    headers.setdefault("Cache-Control", cache_control)
+            await send(message)
 
+        await self.app(scope, receive, send_with_cache_control)
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+
+class RequestLoggingMiddleware:
     """
-    记录每个 HTTP 请求的关键元数据，便于本地排查问题。
+    纯 ASGI 中间件，记录每个 HTTP 请求的关键元数据，便于本地排查问题。
+
+    不包装请求/响应流，流式响应的背压保持不变；访问日志在响应发送完毕后输出，
+    并附带本次请求执行的 SQL 语句数与总耗时（`db_queries`、`db_time_ms`），
+    以及在 DB 执行器中的排队时间（`db_wait_ms`）。
+    `path`、`status_code` 供访问日志采样使用。
     """
 
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get("X-Request-ID") or uuid4().hex
-        client_ip = request.client.host if request.client else "-"
-        request.state.request_id = request_id
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid4().hex
+        client = scope.get("client")
+        client_ip = client[0] if client else "-"
+        state = scope.setdefault("state", {})
+        state["request_id"] = request_id
+        status_code = 500
+
+        async def send_with_request_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
 
         started_at = perf_counter()
 
-        try:
-            with logger.contextualize(
-                request_id=request_id,
-                client_ip=client_ip,
-                user_id=getattr(request.state, "user_id", "-"),
-            ):
-                response: Response = await call_next(request)
-        except Exception:
-            duration_ms = (perf_counter() - started_at) * 1000
-            logger.bind(
-                log_type="access",
-                request_id=request_id,
-                client_ip=client_ip,
-                user_id=getattr(request.state, "user_id", "-"),
-            ).exception(
-                f"{request.method} {request.url.path} -> 500 in {duration_ms:.2f} ms"
-            )
-            raise
+        with track_queries() as query_stats:
+            try:
+                with logger.contextualize(
+                    request_id=request_id,
+                    client_ip=client_ip,
+                    user_id=state.get("user_id", "-"),
+                ):
+                    await self.app(scope, receive, send_with_request_id)
+                    report_n_plus_one(query_stats, f"{scope['method']} {scope['path']}")
+            except Exception:
+                duration_ms = (perf_counter() - started_at) * 1000
+                logger.bind(
+                    log_type="access",
+                    request_id=request_id,
+                    client_ip=client_ip,
+                    user_id=state.get("user_id", "-"),
+                    path=scope["path"],
+                    status_code=500,
+                    db_queries=query_stats.count,
+                    db_time_ms=round(query_stats.total_ms, 2),
+                    db_wait_ms=round(query_stats.queue_wait_ms, 2),
+                ).exception(
+                    f"{scope['method']} {scope['path']} -> 500 in {duration_ms:.2f} ms"
+                )
+                raise
 
         duration_ms = (perf_counter() - started_at) * 1000
-        user_id = getattr(request.state, "user_id", "-")
-        response.headers["X-Request-ID"] = request_id
-
         access_message = (
-            f"{request.method} {request.url.path} -> "
-            f"{response.status_code} in {duration_ms:.2f} ms"
+            f"{scope['method']} {scope['path']} -> "
+            f"{status_code} in {duration_ms:.2f} ms | "
+            f"db {query_stats.count} q / {query_stats.total_ms:.2f} ms"
+            f" (wait {query_stats.queue_wait_ms:.2f} ms)"
         )
         access_logger = logger.bind(
             log_type="access",
             request_id=request_id,
             client_ip=client_ip,
-            user_id=user_id,
+            user_id=state.get("user_id", "-"),
+            path=scope["path"],
+            status_code=status_code,
+            db_queries=query_stats.count,
+            db_time_ms=round(query_stats.total_ms, 2),
+            db_wait_ms=round(query_stats.queue_wait_ms, 2),
         )
-        access_level = "ERROR" if response.status_code >= 500 else "INFO"
+        access_level = "ERROR" if status_code >= 500 else "INFO"
         access_logger.log(access_level, access_message)
-        return response
 
 
 app.add_middleware(CacheControlMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
+if global_config.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+if os.getenv(SUPERVISED_ENV) == "1" and (
+    global_config.server_max_requests or global_config.server_max_rss_mb
+):
+    app.add_middleware(
+        WorkerRecycleMiddleware,
+        max_requests=global_config.server_max_requests,
+        max_requests_jitter=global_config.server_max_requests_jitter,
+        max_rss_mb=global_config.server_max_rss_mb,
+    )
 
 
 # --- API 路由 ---
@@ -162,45 +311,47 @@ def health():
     return {"status": "ok"}
 
 
-app.include_router(auth_router)
-app.include_router(example_router)
+@app.get(
+    "/api/health/db",
+    response_model=DatabaseHealth,
+    summary="数据库健康检查",
+    tags=["系统"],
+    responses={503: {"description": "数据库不可用"}},
+)
+async def health_db():
+    """执行 `SELECT 1` 并返回耗时、连接池状态（大小、检出、溢出）与检出统计。"""
+    # 不经 DB 执行器：执行器繁忙时健康检查仍能反映数据库本身的状态
+    result = await asyncio.to_thread(check_database_health)
+    status_code = 200 if result.status == "ok" else 503
+    return model_response(DatabaseHealth, result, status_code=status_code)
 
 
-# --- 前端 SPA 静态文件服务 ---
-class SPAStaticFiles(StaticFiles):
-    """
-    专为单页应用（SPA）设计的静态文件服务。
-    当请求的路径在文件系统中不存在时，会回退到服务 index.html，
-    从而支持前端路由。
-    """
+if global_config.metrics_enabled:
 
-    async def get_response(self, path: str, scope: Scope) -> Response:
-        try:
-            # 尝试像常规静态文件一样提供文件
-            return await super().get_response(path, scope)
-        except Exception:
-            # 如果找不到文件 (Starlette 会抛出 RuntimeError, FastAPI 转为 404)
-            # 并且请求的不是 API 路径，则返回 SPA 的入口 index.html
-            if scope["path"].startswith("/api"):
-                return Response(status_code=404)  # API 的 404 应该由 FastAPI 框架处理
-
-            if INDEX_FILE.exists():
-                return FileResponse(INDEX_FILE)
-            else:
-                logger.error(f"SPA 入口文件未找到: {INDEX_FILE}")
-                return Response(
-                    "Frontend entrypoint (index.html) not found.", status_code=500
-                )
+    @app.get("/api/metrics", summary="Prometheus 指标", tags=["系统"])
+    def metrics():
+        """以 Prometheus 文本格式输出当前进程的指标。"""
+        return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+app.include_router(auth_router)
+app.include_router(example_router)
 
 
+# --- 前端 SPA 静态文件服务 ---
 # 将前端构建产物目录挂载到根路径
 # 注意：这必须在所有 API 路由之后挂载，以作为路径匹配的回退
 if DIST_DIR.exists():
-    app.mount(
-        "/",
-        SPAStaticFiles(directory=str(DIST_DIR), html=True),
-        name="spa-frontend",
-    )
+    with startup_phase("载入前端构建产物"):
+        if global_config.spa_static_mode == "memory":
+            spa_app = InMemorySPAStaticFiles(
+                DIST_DIR, index_name=INDEX_FILE.name, compress_on_load=False
+            )
+        else:
+            spa_app = SPAStaticFiles(
+                directory=str(DIST_DIR), index_file=INDEX_FILE, html=True
+            )
+    app.mount("/", spa_app, name="spa-frontend")
 else:
     logger.warning(
         f"前端构建目录 '{DIST_DIR}' 不存在，将不会提供前端页面。"
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""
+进程内指标注册表（Prometheus 文本格式）
+
+公开接口：
+- `registry`：全局 `MetricsRegistry` 实例
+- `MetricsRegistry`：创建 `Counter` / `Gauge` / `Histogram` 并渲染文本格式
+- `Counter`、`Gauge`、`Histogram`
+- `MetricsMiddleware`：按路由模板记录请求数、延迟、进行中请求数与状态类别
+- `install_db_metrics(target_engine)`：记录连接检出与 SQL 语句数
+- HTTP/DB 指标常量：`HTTP_REQUESTS`、`HTTP_REQUEST_DURATION`、`HTTP_REQUESTS_IN_PROGRESS`、
+  `DB_SESSIONS`、`DB_SESSIONS_IN_USE`、`DB_CONNECTIONS_IN_USE`、`DB_QUERIES`、
+  `DB_POOL_CHECKOUT_SECONDS`、`DB_POOL_OVERFLOW`、`DB_POOL_CHECKOUT_TIMEOUTS`
+- `CONTENT_TYPE`：文本格式的 Content-Type
+
+内部方法：
+- `_ShardedValues`、`_ShardOwner`、`_format_labels`、`_format_value`、`_status_class`
+
+说明：
+- 热路径不加锁：每个线程写入自己的分片（事件循环线程一个，线程池中的 DB 调用各自一个），
+  只在线程首次写入时注册分片时加锁；抓取时汇总所有分片。
+- 线程结束后其分片并入一个共享的“已退出”分片，短生命周期线程不会让分片无限增长。
+- Gauge 只支持 inc/dec（各分片的增量求和），不支持跨线程的 set。
+- 多进程部署时每个工作进程各自计数，抓取到的是当前处理请求的那个进程的值。
+- 路由标签使用路由模板（如 `/api/example/items/{item_id}`），未匹配的路径统一记为 `<unmatched>`，
+  避免标签基数随 URL 无限增长。
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from bisect import bisect_left
+from math import inf
+from time import perf_counter
+from typing import Any, Callable, Iterable, Sequence
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _ShardedValues:
+    """
+    按线程分片的 标签 -> 值 存储，写入无锁，读取时汇总。
+
+    线程结束时其分片经 `merge` 并入 `_retired`，分片数量不超过存活的写入线程数 + 1。
+    """
+
+    def __init__(self, merge: Callable[[Any, Any], Any]) -> None:
+        self._merge = merge
+        self._local = threading.local()
+        self._retired: dict[tuple[str, ...], Any] = {}
+        self._shards: list[dict[tuple[str, ...], Any]] = []
+        self._register_lock = threading.Lock()
+
+    def shard(self) -> dict[tuple[str, ...], Any]:
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = {}
+            with self._register_lock:
+                self._shards.append(values)
+            # 线程结束时 threading.local 释放 owner，回调把分片并入 _retired
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(owner, self._retire, values)
+            self._local.values = values
+        return values
+
+    def _retire(self, values: dict[tuple[str, ...], Any]) -> None:
+        with self._register_lock:
+            self._shards = [shard for shard in self._shards if shard is not values]
+            for labels, value in values.items():
+                current = self._retired.get(labels)
+                self._retired[labels] = (
+                    value if current is None else self._merge(current, value)
+                )
+
+    def shards(self) -> list[dict[tuple[str, ...], Any]]:
+        """各分片的副本；在锁内复制，同一分片不会既在原处又在 _retired 中被计入。"""
+        with self._register_lock:
+            # dict.copy 在 C 层一次完成，不会与写入线程的插入交错
+            return [values.copy() for values in (self._retired, *self._shards)]
+
+    def clear(self) -> None:
+        with self._register_lock:
+            for values in (self._retired, *self._shards):
+                values.clear()
+
+
+class _ShardOwner:
+    """只由所属线程的 threading.local 持有，用于感知线程结束。"""
+
+    __slots__ = ("__weakref__",)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = _ShardedValues(self._merge)
+
+    def _check_labels(self, labels: tuple[str, ...]) -> None:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"指标 {self.name} 需要标签 {self.labelnames}，实际收到 {labels}"
+            )
+
+    @staticmethod
+    def _merge(current: Any, value: Any) -> Any:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def render(self) -> Iterable[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    @staticmethod
+    def _merge(current: float, value: float) -> float:
+        return current + value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        values = self._values.shard()
+        values[labels] = values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return sum(values.get(labels, 0.0) for values in self._values.shards())
+
+    def _collect(self) -> dict[tuple[str, ...], float]:
+        merged: dict[tuple[str, ...], float] = {}
+        for values in self._values.shards():
+            for labels, amount in values.items():
+                merged[labels] = merged.get(labels, 0.0) + amount
+        return merged
+
+    def render(self) -> Iterable[str]:
+        for labels, amount in sorted(self._collect().items()):
+            self._check_labels(labels)
+            yield (
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(amount)}"
+            )
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        if not self.buckets or self.buckets[-1] != inf:
+            self.buckets += (inf,)
+
+    @staticmethod
+    def _merge(current: list, value: list) -> list:
+        return [a + b for a, b in zip(current, value)]
+
+    def observe(self, value: float, *labels: str) -> None:
+        values = self._values.shard()
+        state = values.get(labels)
+        if state is None:
+            # 各桶的非累积计数 + [sum]
+            state = values[labels] = [0] * len(self.buckets) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def _collect(self) -> dict[tuple[str, ...], list]:
+        merged: dict[tuple[str, ...], list] = {}
+        for values in self._values.shards():
+            for labels, state in values.items():
+                target = merged.setdefault(labels, [0] * len(self.buckets) + [0.0])
+                for index, amount in enumerate(list(state)):
+                    target[index] += amount
+        return merged
+
+    def count(self, *labels: str) -> int:
+        state = self._collect().get(labels)
+        return int(sum(state[:-1])) if state else 0
+
+    def render(self) -> Iterable[str]:
+        for labels, state in sorted(self._collect().items()):
+            self._check_labels(labels)
+            cumulative = 0
+            for bound, amount in zip(self.buckets, state):
+                cumulative += amount
+                bucket_labels = _format_labels(
+                    self.labelnames + ("le",), labels + (_format_value(bound),)
+                )
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(state[-1])}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class MetricsRegistry:
+    """指标注册表，按注册顺序渲染。"""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"指标已注册：{metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def clear(self) -> None:
+        """清空所有已记录的值（测试使用）。"""
+        for metric in self._metrics.values():
+            metric.clear()
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP 请求总数", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP 请求处理耗时（秒）", ("method", "route")
+)
+HTTP_REQUESTS_IN_PROGRESS = registry.gauge(
+    "http_requests_in_progress", "正在处理的 HTTP 请求数", ("method",)
+)
+DB_SESSIONS = registry.counter("db_sessions_total", "已创建的数据库会话数", ("kind",))
+DB_SESSIONS_IN_USE = registry.gauge(
+    "db_sessions_in_use", "当前打开的数据库会话数", ("kind",)
+)
+DB_CONNECTIONS_IN_USE = registry.gauge(
+    "db_connections_in_use", "当前从连接池检出的连接数"
+)
+DB_QUERIES = registry.counter("db_queries_total", "已执行的 SQL 语句数")
+DB_POOL_CHECKOUT_SECONDS = registry.histogram(
+    "db_pool_checkout_seconds",
+    "从连接池检出连接的耗时（含等待空闲连接与新建连接）",
+    ("engine",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+DB_POOL_OVERFLOW = registry.counter(
+    "db_pool_overflow_total", "超出 pool_size 新建的溢出连接数", ("engine",)
+)
+DB_POOL_CHECKOUT_TIMEOUTS = registry.counter(
+    "db_pool_checkout_timeouts_total", "等待连接超过 pool_timeout 的次数", ("engine",)
+)
+
+
+class MetricsMiddleware:
+    """
+    纯 ASGI 中间件，记录 HTTP 请求指标。
+
+    路由模板在路由匹配后由 Starlette 写入 scope，因此在下游应用返回后读取。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method: str = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_PROGRESS.inc(method)
+        started_at = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = perf_counter() - started_at
+            HTTP_REQUESTS_IN_PROGRESS.dec(method)
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            HTTP_REQUESTS.inc(method, route, _status_class(status_code))
+            HTTP_REQUEST_DURATION.observe(duration, method, route)
+
+
+def install_db_metrics(target_engine: Engine) -> None:
+    """为引擎（异步引擎传入 `.sync_engine`）注册连接与语句计数事件。"""
+
+    @event.listens_for(target_engine.pool, "checkout")
+    def _on_checkout(*_: Any) -> None:
+        DB_CONNECTIONS_IN_USE.inc()
+
+    @event.listens_for(target_engine.pool, "checkin")
+    def _on_checkin(*_: Any) -> None:
+        DB_CONNECTIONS_IN_USE.dec()
+
+    @event.listens_for(target_engine, "before_cursor_execute")
+    def _on_execute(*_: Any) -> None:
+        DB_QUERIES.inc()
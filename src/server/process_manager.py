@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+进程管理：开发/生产启动模式与工作进程回收
+
+公开接口：
+- `run_server(mode)`：按模式启动 uvicorn（dev：单进程热重载；prod：多工作进程）
+- `prepare_startup()`：在主进程中执行一次性的启动工作（迁移、建表、引导管理员）
+- `run_migrations(database_is_new)`：全新数据库标记为最新版本，已有数据库升级到最新版本
+- `WorkerRecycleMiddleware`：达到请求数或内存上限后让当前工作进程优雅退出
+- `STARTUP_DONE_ENV`、`SUPERVISED_ENV`：主进程传递给工作进程的环境变量名
+
+内部方法：
+- `_current_rss_bytes`、`_resolve_workers`、`_script_heads`、`_database_at_head`
+
+说明：
+- prod 模式使用 uvicorn 自带的多进程管理器：工作进程退出后自动拉起新进程，
+  SIGHUP 逐个重启全部工作进程（每个进程先处理完进行中的请求再退出）。
+- 回收由工作进程自身触发：向自己发送 SIGTERM，走 uvicorn 的优雅关闭流程，
+  随后由主进程补齐。请求上限附加随机抖动，避免所有进程同时回收。
+- 迁移与建表只在主进程执行一次；工作进程通过 `STARTUP_DONE_ENV` 得知并跳过。
+  dev 模式与直接用 uvicorn 启动时没有主进程的准备步骤，由 lifespan 执行同样的迁移。
+- 未设置 `SERVER_LOOP`/`SERVER_HTTP` 时为 auto：安装了 uvloop/httptools 就会使用。
+"""
+
+from __future__ import annotations
+
+import ast
+import os
+import random
+import signal
+import sys
+from pathlib import Path
+
+from loguru import logger
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.server.config import global_config
+
+STARTUP_DONE_ENV = "SERVER_STARTUP_DONE"
+SUPERVISED_ENV = "SERVER_SUPERVISED"
+
+# 每处理多少个请求读取一次 RSS
+RSS_CHECK_INTERVAL = 64
+
+APP_IMPORT_PATH = "src.server.main:app"
+
+
+def _current_rss_bytes() -> int:
+    """当前进程常驻内存；Linux 读取 /proc，其它平台退化为历史峰值。"""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class WorkerRecycleMiddleware:
+    """
+    纯 ASGI 中间件，统计本进程处理的请求数与 RSS，超过上限时触发一次优雅退出。
+
+    只应在多进程模式（有主进程负责补齐）下启用。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_requests: int = 0,
+        max_requests_jitter: int = 0,
+        max_rss_mb: int = 0,
+    ) -> None:
+        self.app = app
+        self.max_requests = (
+            max_requests + random.randint(0, max_requests_jitter)
+            if max_requests > 0
+            else 0
+        )
+        self.max_rss_bytes = max_rss_mb * 1024 * 1024
+        self.handled = 0
+        self.recycling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.handled += 1
+            if not self.recycling:
+                self._check_limits()
+
+    def _check_limits(self) -> None:
+        reason = None
+        if self.max_requests and self.handled >= self.max_requests:
+            reason = f"已处理 {self.handled} 个请求"
+        elif self.max_rss_bytes and self.handled % RSS_CHECK_INTERVAL == 0:
+            rss = _current_rss_bytes()
+            if rss >= self.max_rss_bytes:
+                reason = f"RSS {rss // (1024 * 1024)} MiB 超过上限"
+        if reason is None:
+            return
+        self.recycling = True
+        logger.info(f"工作进程 {os.getpid()} 即将回收：{reason}")
+        os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _script_heads(versions_dir: Path) -> set[str] | None:
+    """不导入 alembic，从迁移脚本的 `revision` / `down_revision` 求出 head；无法解析时返回 None。"""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        values: dict[str, object] = {}
+        for node in ast.parse(path.read_text(encoding="utf-8")).body:
+            target: ast.expr
+            if isinstance(node, ast.AnnAssign) and node.value is not None:
+                target, value = node.target, node.value
+            elif isinstance(node, ast.Assign) and len(node.targets) == 1:
+                target, value = node.targets[0], node.value
+            else:
+                continue
+            if isinstance(target, ast.Name) and target.id in ("revision", "down_revision"):
+                try:
+                    values[target.id] = ast.literal_eval(value)
+                except ValueError:
+                    return None
+        revision, down_revision = values.get("revision"), values.get("down_revision")
+        if not isinstance(revision, str):
+            return None
+        revisions.add(revision)
+        if isinstance(down_revision, str):
+            parents.add(down_revision)
+        elif isinstance(down_revision, (list, tuple)):
+            parents.update(down_revision)
+    return revisions - parents
+
+
+def _database_at_head(versions_dir: Path) -> bool:
+    from sqlalchemy import text
+    from sqlalchemy.exc import SQLAlchemyError
+
+    from src.server.database import engine
+
+    heads = _script_heads(versions_dir)
+    if not heads:
+        return False
+    try:
+        with engine.connect() as conn:
+            current = conn.execute(text("SELECT version_num FROM alembic_version"))
+            return set(current.scalars()) == heads
+    except SQLAlchemyError:
+        return False
+
+
+def run_migrations(database_is_new: bool) -> None:
+    """prod 主进程与 dev/单进程的 lifespan 都会调用；alembic 不重新配置应用的日志。"""
+    script_dir = Path(global_config.project_root) / "alembic"
+    if not (script_dir / "versions").is_dir():
+        return
+    # 已是最新版本时不导入 alembic（导入约 150 ms，计入每次冷启动）
+    if not database_is_new and _database_at_head(script_dir / "versions"):
+        return
+    from alembic import command
+    from alembic.config import Config
+
+    alembic_config = Config(str(Path(global_config.project_root) / "alembic.ini"))
+    alembic_config.attributes["configure_logger"] = False
+    if database_is_new:
+        # 全新数据库由 create_all 建出最新结构，直接标记为最新版本
+        command.stamp(alembic_config, "head")
+    else:
+        command.upgrade(alembic_config, "head")
+
+
+def prepare_startup() -> None:
+    """执行只需要做一次的启动工作，完成后设置 `STARTUP_DONE_ENV` 供工作进程继承。"""
+    from src.server.auth.service import bootstrap_default_admin
+    from src.server.database import (
+        SessionLocal,
+        engine,
+        get_database_info,
+        init_database,
+        log_sqlite_pragmas,
+    )
+
+    database_is_new = not get_database_info().database_exists
+    if database_is_new:
+        logger.warning("数据库不存在，正在执行初始化...")
+        init_database()
+    run_migrations(database_is_new)
+    with SessionLocal() as session:
+        bootstrap_default_admin(session)
+    log_sqlite_pragmas()
+    # 工作进程会重新建立连接，主进程不保留任何连接
+    engine.dispose()
+    os.environ[STARTUP_DONE_ENV] = "1"
+
+
+def _resolve_workers() -> int:
+    return global_config.server_workers or os.cpu_count() or 1
+
+
+def run_server(mode: str) -> None:
+    """按模式启动 uvicorn。"""
+    import uvicorn
+
+    port = int(os.getenv("PORT", "8000"))
+    log_level = global_config.log_level.lower()
+
+    if mode == "dev":
+        uvicorn.run(
+            APP_IMPORT_PATH,
+            host="0.0.0.0",
+            port=port,
+            reload=True,
+            log_level=log_level,
+            access_log=False,
+            log_config=None,
+        )
+        return
+    if mode != "prod":
+        raise ValueError(f"未知的启动模式：{mode}")
+
+    prepare_startup()
+    workers = _resolve_workers()
+    os.environ[SUPERVISED_ENV] = "1" if workers > 1 else "0"
+    logger.info(
+        f"生产模式启动：{workers} 个工作进程，"
+        f"请求上限 {global_config.server_max_requests or '无'}，"
+        f"RSS 上限 {global_config.server_max_rss_mb or '无'} MiB"
+    )
+    uvicorn.run(
+        APP_IMPORT_PATH,
+        host="0.0.0.0",
+        port=port,
+        workers=workers,
+        loop=global_config.server_loop,
+        http=global_config.server_http,
+        timeout_graceful_shutdown=global_config.server_graceful_timeout,
+        log_level=log_level,
+        access_log=False,
+        log_config=None,
+    )
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+GET 响应缓存与条件请求
+
+公开接口：
+- `ResponseCache`：按 (主体, 路径, 查询串) 缓存序列化后的响应体，按总字节数 LRU 淘汰，按标签失效
+- `CachedResponse`：缓存条目（响应体 bytes + ETag + 标签）
+- `response_cache`：进程内全局实例
+- `cached_get(request, build, tags, principal)`：路由中使用的读穿透入口，处理 If-None-Match
+- 指标：`RESPONSE_CACHE_LOOKUPS`（按路由与 hit/miss）、`RESPONSE_CACHE_NOT_MODIFIED`、
+  `RESPONSE_CACHE_BYTES`、`RESPONSE_CACHE_EVICTIONS`
+
+内部方法：
+- `_is_not_modified`
+
+说明：
+- 只缓存 200 响应的 bytes，不缓存模型对象；命中时不访问数据库也不再序列化。
+- 写操作由 DAO 调用 `invalidate_tags` 失效相关条目；未命中期间发生的失效会使本次结果不被写入，
+  避免把失效前读到的旧数据放回缓存。
+- 多进程部署时各进程独立缓存，其他进程中的写入最多延迟 `RESPONSE_CACHE_TTL_SECONDS` 秒可见。
+- 响应带 `Cache-Control: private, no-cache`，客户端每次携带 ETag 重新验证，未变化时返回 304。
+- 只提供 ETag，不发送 Last-Modified、忽略 If-Modified-Since：缓存填充时间并不是资源的修改时间，
+  且秒级精度下同一秒内的修改无法区分，按时间判断会把已变化的内容答复为 304。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Iterable
+
+from fastapi import Request
+from fastapi.responses import Response
+from starlette.datastructures import Headers
+
+from src.server.config import global_config
+from src.server.metrics import registry
+
+RESPONSE_CACHE_LOOKUPS = registry.counter(
+    "http_response_cache_lookups_total", "响应缓存查找次数", ("route", "result")
+)
+RESPONSE_CACHE_NOT_MODIFIED = registry.counter(
+    "http_response_cache_not_modified_total", "条件请求返回 304 的次数", ("route",)
+)
+RESPONSE_CACHE_BYTES = registry.gauge("http_response_cache_bytes", "响应缓存占用的字节数")
+RESPONSE_CACHE_EVICTIONS = registry.counter(
+    "http_response_cache_evictions_total", "因容量被淘汰的响应缓存条目数"
+)
+
+CacheKey = tuple[str, str, str]
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    body: bytes
+    media_type: str
+    etag: str
+    tags: frozenset[str]
+    expires_at: float
+
+    @classmethod
+    def build(
+        cls, body: bytes, media_type: str, tags: Iterable[str], ttl_seconds: float
+    ) -> CachedResponse:
+        return cls(
+            body=body,
+            media_type=media_type,
+            etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + ttl_seconds,
+        )
+
+    def to_response(self, cache_control: str) -> Response:
+        return Response(
+            self.body,
+            media_type=self.media_type,
+            headers=self._validators(cache_control),
+        )
+
+    def not_modified(self, cache_control: str) -> Response:
+        return Response(status_code=304, headers=self._validators(cache_control))
+
+    def _validators(self, cache_control: str) -> dict[str, str]:
+        return {"ETag": self.etag, "Cache-Control": cache_control}
+
+
+class ResponseCache:
+    """按响应体总字节数限界的 LRU 缓存，线程安全（DAO 写入可能在线程池中触发失效）。"""
+
+    def __init__(self, max_bytes: int, ttl_seconds: float):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[CacheKey, CachedResponse] = OrderedDict()
+        self._keys_by_tag: dict[str, set[CacheKey]] = {}
+        self._bytes = 0
+        # 每次失效加一；未命中开始后若发生过失效，则不写入本次结果
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0 and self.ttl_seconds > 0
+
+    def get(self, key: CacheKey) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(
+        self,
+        key: CacheKey,
+        body: bytes,
+        media_type: str,
+        tags: Iterable[str],
+        generation: int,
+    ) -> CachedResponse:
+        """写入条目并返回；缓存关闭、`generation` 之后发生过失效或单条超出容量时只返回不写入。"""
+        entry = CachedResponse.build(body, media_type, tags, self.ttl_seconds)
+        if not self.enabled or len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            if generation != self.generation:
+                return entry
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            RESPONSE_CACHE_BYTES.inc(amount=len(body))
+            for tag in entry.tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                RESPONSE_CACHE_EVICTIONS.inc()
+        return entry
+
+    def invalidate_tags(self, *tags: str) -> None:
+        with self._lock:
+            self.generation += 1
+            for tag in tags:
+                for key in self._keys_by_tag.pop(tag, set()):
+                    if key in self._entries:
+                        self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            RESPONSE_CACHE_BYTES.dec(amount=self._bytes)
+            self._entries.clear()
+            self._keys_by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"size": len(self._entries), "bytes": self._bytes}
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry.body)
+        RESPONSE_CACHE_BYTES.dec(amount=len(entry.body))
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+def _is_not_modified(entry: CachedResponse, headers: Headers) -> bool:
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or entry.etag in candidates
+
+
+async def cached_get(
+    request: Request,
+    build: Callable[[], Awaitable[Response]],
+    tags: Iterable[str],
+    principal: str = "-",
+    cache_control: str = "private, no-cache",
+) -> Response:
+    """
+    读穿透：命中时直接返回缓存的 bytes，未命中时调用 `build()` 生成响应并缓存 200 响应。
+
+    `principal` 区分不同用户看到的内容（公开数据使用默认值 "-"）；
+    `tags` 为写操作失效时使用的标签。
+    """
+    route = getattr(request.scope.get("route"), "path", None) or "<unmatched>"
+    key = (principal, request.url.path, request.url.query)
+    entry = response_cache.get(key)
+    if entry is not None:
+        RESPONSE_CACHE_LOOKUPS.inc(route, "hit")
+    else:
+        RESPONSE_CACHE_LOOKUPS.inc(route, "miss")
+        generation = response_cache.generation
+        response = await build()
+        if response.status_code != 200:
+            return response
+        entry = response_cache.put(
+            key, bytes(response.body), response.media_type or "", tags, generation
+        )
+    if _is_not_modified(entry, request.headers):
+        RESPONSE_CACHE_NOT_MODIFIED.inc(route)
+        return entry.not_modified(cache_control)
+    return entry.to_response(cache_control)
+
+
+response_cache = ResponseCache(
+    max_bytes=global_config.response_cache_max_bytes,
+    ttl_seconds=global_config.response_cache_ttl_seconds,
+)
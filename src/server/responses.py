@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 响应引擎
+
+公开接口：
+- `DefaultJSONResponse`：按 `GlobalConfig.json_response_engine` 选择的项目默认响应类
+- `model_response()`：按响应模型校验后直接序列化为 bytes 的响应
+- `dumps_json()`：使用当前引擎将 Python 对象编码为 JSON bytes（NDJSON 导出等场景）
+
+内部方法：
+- `_select_response_class`、`_type_adapter`
+
+说明：
+- orjson 为默认引擎（requirements 中的必需依赖）；配置为 stdlib 时使用 Starlette 的 `JSONResponse`。
+- FastAPI 的默认流程是 校验 -> 生成 dict -> 再由响应类编码；`model_response` 使用缓存的
+  `TypeAdapter` 在 pydantic-core 中一次完成校验与 JSON 编码，不构建中间 dict。
+  路由仍应声明 `response_model` 以保持 OpenAPI 文档一致。
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any, Mapping
+
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+from src.server.config import global_config
+
+
+def _select_response_class() -> type[JSONResponse]:
+    engine = global_config.json_response_engine
+    if engine == "orjson":
+        return ORJSONResponse
+    if engine != "stdlib":
+        raise ValueError(f"未知的 JSON 响应引擎：{engine}")
+    return JSONResponse
+
+
+DefaultJSONResponse = _select_response_class()
+
+
+@lru_cache(maxsize=None)
+def _type_adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+
+def model_response(
+    response_type: Any,
+    content: Any,
+    status_code: int = 200,
+    headers: Mapping[str, str] | None = None,
+) -> Response:
+    """按 `response_type` 校验 `content`（支持 ORM 对象）并直接编码为 JSON bytes。"""
+    adapter = _type_adapter(response_type)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    return Response(
+        body, status_code=status_code, headers=headers, media_type="application/json"
+    )
+
+
+def dumps_json(content: Any) -> bytes:
+    """编码为紧凑 JSON bytes，优先使用 orjson。"""
+    if DefaultJSONResponse is ORJSONResponse:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
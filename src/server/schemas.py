@@ -4,6 +4,8 @@
 
 公开接口：
 - `DatabaseInfo`：数据库信息模型
+- `DatabasePoolStatus`：同步引擎连接池的当前状态
+- `DatabaseHealth`：`/api/health/db` 的响应模型
 
 内部方法：
 - 无
@@ -22,3 +24,27 @@ class DatabaseInfo(BaseModel):
     database_exists: bool
     database_size: Optional[int] = None
     database_path: str
+
+
+class DatabasePoolStatus(BaseModel):
+    """连接池状态（非 QueuePool 时只有 `pool_class`）"""
+
+    pool_class: str
+    size: Optional[int] = None
+    max_overflow: Optional[int] = None
+    timeout_seconds: Optional[float] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None
+
+
+class DatabaseHealth(BaseModel):
+    """数据库健康检查结果"""
+
+    status: str
+    latency_ms: float
+    pool: DatabasePoolStatus
+    checkouts: int
+    checkout_timeouts: int
+    overflow_connections: int
+    error: Optional[str] = None
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+SQL 语句观测：按请求统计、慢查询日志与 N+1 检测
+
+公开接口：
+- `QueryStats`：单个请求内的 SQL 统计（语句数、总耗时、按语句形状计数、在 DB 执行器中的排队时间）
+- `install_sql_instrumentation(target_engine)`：注册 before/after_cursor_execute 事件
+- `track_queries()`：上下文管理器，在当前上下文中开始统计并返回 `QueryStats`
+- `current_query_stats()`：获取当前上下文的统计对象（不在请求中时为 None）
+- `report_n_plus_one(stats, label)`：同一语句形状超过阈值时输出告警
+
+内部方法：
+- `_statement_shape`
+
+说明：
+- 统计对象保存在 ContextVar 中；`asyncio.to_thread`、DB 执行器与 Starlette 线程池都会复制上下文，
+  因此线程池中的同步 ORM 调用与事件循环中的异步会话都会计入同一个请求。
+- 超过 `SQL_SLOW_QUERY_MS` 的语句以 `log_type="slow_sql"` 输出，由日志配置写入 slow_sql.log；
+  日志中只包含带占位符的语句，不包含参数值。
+- 语句形状会把 `IN (?, ?, ...)` 与多行 VALUES 折叠为一项，批量大小不同的同类语句视为同一形状。
+"""
+
+from __future__ import annotations
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Iterator
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.server.config import global_config
+
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_REPEATED_VALUES = re.compile(r"(\(\?\))(?:\s*,\s*\(\?\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar(
+    "sql_query_stats", default=None
+)
+
+
+@dataclass
+class QueryStats:
+    """单个请求内的 SQL 统计。"""
+
+    count: int = 0
+    total_ms: float = 0.0
+    queue_wait_ms: float = 0.0
+    shapes: dict[str, int] = field(default_factory=dict)
+
+    def record(self, statement: str, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        shape = _statement_shape(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        """返回执行次数超过 `threshold` 的语句形状，按次数降序。"""
+        repeated = [(s, n) for s, n in self.shapes.items() if n > threshold]
+        return sorted(repeated, key=lambda item: item[1], reverse=True)
+
+
+def _statement_shape(statement: str) -> str:
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _PLACEHOLDER_LIST.sub("(?)", shape)
+    return _REPEATED_VALUES.sub(r"\1", shape)
+
+
+def current_query_stats() -> QueryStats | None:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """在当前上下文中开始统计，退出时恢复之前的统计对象。"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def report_n_plus_one(stats: QueryStats, label: str) -> None:
+    threshold = global_config.sql_n_plus_one_threshold
+    if threshold <= 0:
+        return
+    for shape, times in stats.repeated_shapes(threshold):
+        logger.warning(f"疑似 N+1 查询：{label} 执行同一语句 {times} 次：{shape}")
+
+
+def install_sql_instrumentation(target_engine: Engine) -> None:
+    """为引擎（异步引擎传入 `.sync_engine`）注册语句计时事件。"""
+
+    @event.listens_for(target_engine, "before_cursor_execute")
+    def _before_execute(
+        _conn: Any,
+        _cursor: Any,
+        _statement: str,
+        _params: Any,
+        context: Any,
+        _many: Any,
+    ) -> None:
+        if context is not None:
+            context._query_started_at = perf_counter()
+
+    @event.listens_for(target_engine, "after_cursor_execute")
+    def _after_execute(
+        _conn: Any, _cursor: Any, statement: str, _params: Any, context: Any, many: bool
+    ) -> None:
+        started_at = getattr(context, "_query_started_at", None)
+        if started_at is None:
+            return
+        elapsed_ms = (perf_counter() - started_at) * 1000
+
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+
+        if elapsed_ms >= global_config.sql_slow_query_ms:
+            logger.bind(log_type="slow_sql").warning(
+                f"慢查询 {elapsed_ms:.2f} ms{' (executemany)' if many else ''}："
+                f"{_WHITESPACE.sub(' ', statement).strip()}"
+            )
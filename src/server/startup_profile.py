@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析
+
+公开接口：
+- `startup_phase(name)`：记录一个启动阶段的耗时（模块导入期与 lifespan 中使用）
+- `STARTUP_PHASES`：已记录的 (阶段, 毫秒) 列表
+- `format_phases()`：格式化阶段耗时
+- `parse_importtime(stderr)`：解析 `python -X importtime` 的输出
+- `profile_startup(top)`：在子进程中导入应用、执行 lifespan 并完成首个请求，返回文本报告
+
+内部方法：
+- `_PROFILE_SCRIPT`、`_first_request`
+
+说明：
+- `python run.py --profile-startup` 输出该报告。
+- 导入耗时来自 `-X importtime`，按累计耗时列出最慢的模块，并按顶层包汇总自身耗时。
+- 子进程把测量结果写入临时文件而不是 stdout，避免与应用日志输出交错。
+"""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Iterator
+
+STARTUP_PHASES: list[tuple[str, float]] = []
+
+_PROFILE_SCRIPT = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from src.server.main import app
+imported = time.perf_counter()
+from src.server.startup_profile import STARTUP_PHASES, _first_request
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        status = await _first_request(app)
+        done = time.perf_counter()
+    with open(sys.argv[1], "w", encoding="utf-8") as result_file:
+        json.dump({
+            "import_ms": (imported - started) * 1000,
+            "lifespan_ms": (ready - imported) * 1000,
+            "first_request_ms": (done - ready) * 1000,
+            "first_request_status": status,
+            "phases": STARTUP_PHASES,
+        }, result_file)
+
+asyncio.run(main())
+"""
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@contextmanager
+def startup_phase(name: str) -> Iterator[None]:
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_PHASES.append((name, (perf_counter() - started) * 1000))
+
+
+def format_phases(phases: list[tuple[str, float]] | None = None) -> str:
+    return ", ".join(f"{name} {ms:.1f}ms" for name, ms in phases or STARTUP_PHASES)
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        module = name.rstrip()
+        timings.append(
+            ImportTiming(
+                module=module.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(module) - len(module.lstrip())) // 2,
+            )
+        )
+    return timings
+
+
+async def _first_request(app: Any, path: str = "/api/health") -> int:
+    """不经过网络，以 ASGI 协议发送一个 GET 请求并返回状态码。"""
+    status = 0
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"startup-profile")],
+        "client": ("127.0.0.1", 0),
+        "server": ("startup-profile", 80),
+    }
+    await app(scope, receive, send)
+    return status
+
+
+def profile_startup(top: int = 25) -> str:
+    """在全新的子进程中测量冷启动，返回文本报告。"""
+    # 结果写入独立文件：应用日志（批量 sink 由后台线程写 stdout）可能在任意时刻输出
+    with tempfile.TemporaryDirectory(prefix="startup-profile-") as tmp_dir:
+        result_path = Path(tmp_dir) / "result.json"
+        completed = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                _PROFILE_SCRIPT,
+                str(result_path),
+            ],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0 or not result_path.exists():
+            raise RuntimeError(f"启动分析子进程失败：\n{completed.stderr[-4000:]}")
+        result = json.loads(result_path.read_text(encoding="utf-8"))
+    timings = parse_importtime(completed.stderr)
+
+    lines = [
+        f"导入 src.server.main：{result['import_ms']:.1f} ms",
+        f"lifespan 启动：{result['lifespan_ms']:.1f} ms",
+        f"首个请求（{result['first_request_status']}）：{result['first_request_ms']:.1f} ms",
+        "合计：{:.1f} ms".format(
+            result["import_ms"] + result["lifespan_ms"] + result["first_request_ms"]
+        ),
+        "",
+        "启动阶段：",
+    ]
+    lines += [f"  {name:<24} {ms:8.1f} ms" for name, ms in result["phases"]]
+
+    lines += ["", f"累计导入耗时最高的 {top} 个模块："]
+    for timing in sorted(timings, key=lambda t: t.cumulative_us, reverse=True)[:top]:
+        lines.append(
+            f"  {timing.cumulative_us / 1000:8.1f} ms  "
+            f"(自身 {timing.self_us / 1000:6.1f})  {timing.module}"
+        )
+
+    by_package: dict[str, int] = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        if package == "src":
+            package = ".".join(timing.module.split(".")[:3])
+        by_package[package] = by_package.get(package, 0) + timing.self_us
+    lines += ["", "按顶层包汇总自身导入耗时："]
+    for package, self_us in sorted(
+        by_package.items(), key=lambda i: i[1], reverse=True
+    )[:top]:
+        lines.append(f"  {self_us / 1000:8.1f} ms  {package}")
+    return "\n".join(lines)
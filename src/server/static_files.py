@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+"""
+前端 SPA 静态文件服务
+
+公开接口：
+- `SPAStaticFiles`：基于 Starlette `StaticFiles` 的磁盘模式，未命中时回退到 index.html
+- `InMemorySPAStaticFiles`：启动时将 dist/ 载入内存的纯 ASGI 应用
+- `ASSETS_DIRNAME`：Vite 带 hash 产物的目录名
+
+内部方法：
+- `_StaticEntry`、`_accepted_encodings`、`_is_client_route`
+
+说明：
+- 内存模式在启动时一次性读取 dist/，之后的请求不再产生文件系统调用。
+- 每个文件保留 identity/gzip/br 多个编码版本：优先使用构建产物中的 `.br`/`.gz`，
+  缺失时在载入阶段压缩一次（br 需要安装可选依赖 `brotli`，未列入 requirements；
+  该包没有类型存根，导入处以 `type: ignore[import-not-found]` 跳过 mypy 检查）。
+- 每个编码版本有独立的强 ETag，支持 If-None-Match 返回 304。
+- `compress_on_load=False` 时载入阶段只读取文件，运行时压缩推迟到 `compress_pending()`
+  （应用在 lifespan 中放到后台线程执行），完成前对应文件以原始内容提供，缩短冷启动时间。
+- 只有最后一段不带扩展名、且不在 /api 与 assets 目录下的路径视为前端路由回退到 index.html；
+  缺失的静态文件（如 `/assets/missing.js`、`/favicon.ico`）返回 404，而不是以 200 返回 HTML。
+- 重新构建前端后需要重启进程才能生效。
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+
+from fastapi.responses import FileResponse, Response
+from fastapi.staticfiles import StaticFiles
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli  # type: ignore[import-not-found]
+except ImportError:  # 可选依赖
+    brotli = None
+
+# 载入阶段才压缩的最小体积，过小的文件压缩收益不抵额外开销
+COMPRESS_MIN_SIZE = 1024
+
+_COMPRESSIBLE_PREFIXES = ("text/", "application/javascript", "application/json")
+_COMPRESSIBLE_SUFFIXES = ("+xml", "+json", "/xml", "/svg+xml", "/wasm")
+_PRECOMPRESSED_SUFFIXES = {".br": "br", ".gz": "gzip"}
+
+ASSETS_DIRNAME = "assets"  # Vite 默认的 hash 产物目录
+
+
+def _is_client_route(path: str) -> bool:
+    """未命中文件的路径是否回退到 index.html。"""
+    if path.startswith("/api") or path.startswith(f"/{ASSETS_DIRNAME}/"):
+        return False
+    return "." not in path.rsplit("/", 1)[-1]
+
+
+class SPAStaticFiles(StaticFiles):
+    """
+    专为单页应用（SPA）设计的静态文件服务。
+    当请求的前端路由（不带扩展名的路径）在文件系统中不存在时，会回退到服务 index.html，
+    从而支持前端路由；缺失的静态文件与 API 路径返回 404。
+    """
+
+    def __init__(self, *, directory: str, index_file: Path, **kwargs) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.index_file = index_file
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            # 尝试像常规静态文件一样提供文件
+            return await super().get_response(path, scope)
+        except Exception:
+            # 如果找不到文件 (Starlette 会抛出 RuntimeError, FastAPI 转为 404)
+            # 并且请求的是前端路由，则返回 SPA 的入口 index.html
+            if not _is_client_route(scope["path"]):
+                return Response(status_code=404)
+
+            if self.index_file.exists():
+                return FileResponse(self.index_file)
+            else:
+                logger.error(f"SPA 入口文件未找到: {self.index_file}")
+                return Response(
+                    "Frontend entrypoint (index.html) not found.", status_code=500
+                )
+
+
+@dataclass
+class _StaticEntry:
+    """单个文件的内存表示：编码 -> (响应体, 预构建的响应头)。"""
+
+    variants: dict[str, tuple[bytes, list[tuple[bytes, bytes]]]] = field(
+        default_factory=dict
+    )
+    etags: dict[bytes, str] = field(default_factory=dict)
+    # 构造响应头所需的元数据，延迟压缩时复用
+    media_type: str = ""
+    last_modified: str = ""
+    digest: str = ""
+    is_index: bool = False
+    vary: bool = False
+
+    def add_variant(self, coding: str, content: bytes) -> None:
+        etag = (
+            f'"{self.digest}"' if coding == "identity" else f'"{self.digest}-{coding}"'
+        )
+        headers = [
+            (b"content-type", self.media_type.encode("latin-1")),
+            (b"content-length", str(len(content)).encode("latin-1")),
+            (b"etag", etag.encode("latin-1")),
+            (b"last-modified", self.last_modified.encode("latin-1")),
+        ]
+        if self.vary:
+            headers.append((b"vary", b"Accept-Encoding"))
+        if coding != "identity":
+            headers.append((b"content-encoding", coding.encode("latin-1")))
+        if self.is_index:
+            headers.append((b"cache-control", b"no-cache"))
+        # 先写 etags 再写 variants：请求方以 variants 为准，看到的版本总是完整的
+        self.etags[etag.encode("latin-1")] = coding
+        self.variants[coding] = (content, headers)
+
+
+def _is_compressible(media_type: str) -> bool:
+    return media_type.startswith(_COMPRESSIBLE_PREFIXES) or media_type.endswith(
+        _COMPRESSIBLE_SUFFIXES
+    )
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """解析 Accept-Encoding，忽略 q=0 的编码。"""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding:
+            accepted.add(coding.lower())
+    return accepted
+
+
+class InMemorySPAStaticFiles:
+    """
+    内存中的 SPA 静态文件服务（纯 ASGI 应用）。
+
+    - 命中文件：按 Accept-Encoding 选择 br > gzip > identity 版本
+    - 未命中的前端路由：返回缓存的 index.html（no-cache）；缺失的静态文件与 /api 路径返回 404
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        index_name: str = "index.html",
+        compress_on_load: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.index_name = index_name
+        self.compress_on_load = compress_on_load
+        self._files: dict[str, _StaticEntry] = {}
+        self._index: _StaticEntry | None = None
+        self._pending: list[tuple[_StaticEntry, bytes]] = []
+        self.load()
+
+    def load(self) -> None:
+        """扫描目录并载入全部文件，可在重新构建后手动调用以刷新。"""
+        files: dict[str, _StaticEntry] = {}
+        pending: list[tuple[_StaticEntry, bytes]] = []
+        total_bytes = 0
+        for file_path in sorted(self.directory.rglob("*")):
+            if not file_path.is_file():
+                continue
+            suffix = file_path.suffix
+            if (
+                suffix in _PRECOMPRESSED_SUFFIXES
+                and file_path.with_suffix("").is_file()
+            ):
+                continue  # 作为原文件的编码版本载入
+            rel_path = file_path.relative_to(self.directory).as_posix()
+            entry, to_compress = self._load_entry(
+                file_path, rel_path == self.index_name
+            )
+            files[rel_path] = entry
+            if to_compress is not None:
+                pending.append((entry, to_compress))
+            total_bytes += sum(len(body) for body, _ in entry.variants.values())
+
+        self._files = files
+        self._pending = pending
+        if self.compress_on_load:
+            self.compress_pending()
+        self._index = files.get(self.index_name)
+        if self._index is None:
+            logger.error(f"SPA 入口文件未找到: {self.directory / self.index_name}")
+        logger.info(
+            f"已将前端构建产物载入内存：{len(files)} 个文件，共 {total_bytes} 字节"
+        )
+
+    def _load_entry(
+        self, file_path: Path, is_index: bool
+    ) -> tuple[_StaticEntry, bytes | None]:
+        """载入文件与构建产物中的预压缩版本；返回条目与仍需运行时压缩的原始内容。"""
+        body = file_path.read_bytes()
+        media_type = (
+            mimetypes.guess_type(file_path.name)[0] or "application/octet-stream"
+        )
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+
+        encoded = {}
+        for suffix, coding in _PRECOMPRESSED_SUFFIXES.items():
+            precompressed = file_path.with_name(file_path.name + suffix)
+            if precompressed.is_file():
+                content = precompressed.read_bytes()
+                if len(content) < len(body):
+                    encoded[coding] = content
+        compress = len(body) >= COMPRESS_MIN_SIZE and _is_compressible(media_type)
+        missing = compress and (
+            "gzip" not in encoded or ("br" not in encoded and brotli is not None)
+        )
+
+        entry = _StaticEntry(
+            media_type=media_type,
+            last_modified=formatdate(file_path.stat().st_mtime, usegmt=True),
+            digest=hashlib.blake2b(body, digest_size=16).hexdigest(),
+            is_index=is_index,
+            vary=bool(encoded) or missing,
+        )
+        entry.add_variant("identity", body)
+        for coding, content in encoded.items():
+            entry.add_variant(coding, content)
+        return entry, body if missing else None
+
+    def compress_pending(self) -> None:
+        """为尚无预压缩版本的文件生成 gzip/br 版本（耗时，可在后台线程调用）。"""
+        pending, self._pending = self._pending, []
+        for entry, body in pending:
+            if "gzip" not in entry.variants:
+                content = gzip.compress(body, compresslevel=9, mtime=0)
+                if len(content) < len(body):
+                    entry.add_variant("gzip", content)
+            if "br" not in entry.variants and brotli is not None:
+                content = brotli.compress(body)
+                if len(content) < len(body):
+                    entry.add_variant("br", content)
+        if pending:
+            logger.info(f"前端静态文件压缩完成：{len(pending)} 个文件")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return
+        if scope["method"] not in ("GET", "HEAD"):
+            await Response(status_code=405, headers={"Allow": "GET, HEAD"})(
+                scope, receive, send
+            )
+            return
+
+        path: str = scope["path"]
+        key = path.lstrip("/")
+        entry = self._files.get(key)
+        if entry is None and (key == "" or key.endswith("/")):
+            entry = self._files.get(key + self.index_name)
+        if entry is None:
+            if not _is_client_route(path):
+                await Response(status_code=404)(scope, receive, send)
+                return
+            entry = self._index
+        if entry is None:
+            await Response(
+                "Frontend entrypoint (index.html) not found.", status_code=500
+            )(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        if_none_match = request_headers.get("if-none-match")
+        if if_none_match:
+            for candidate in if_none_match.split(","):
+                coding = entry.etags.get(candidate.strip().removeprefix("W/").encode())
+                if coding is not None:
+                    _, headers = entry.variants[coding]
+                    not_modified = [
+                        h
+                        for h in headers
+                        if h[0] not in (b"content-length", b"content-type")
+                    ]
+                    await send(
+                        {
+                            "type": "http.response.start",
+                            "status": 304,
+                            "headers": not_modified,
+                        }
+                    )
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+
+        coding = "identity"
+        if len(entry.variants) > 1:
+            accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+            for candidate in ("br", "gzip"):
+                if candidate in accepted and candidate in entry.variants:
+                    coding = candidate
+                    break
+        body, headers = entry.variants[coding]
+        # 下游中间件会原地追加响应头，必须发送副本以免污染缓存
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": list(headers)}
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": b"" if scope["method"] == "HEAD" else body,
+            }
+        )
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+DAO 基类通用操作、单飞合并与 DB 执行器测试（以示例模块的 Item 为载体）
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.server.dao.dao_base import (
+    DB_EXECUTOR_REJECTED,
+    SINGLE_FLIGHT_CALLS,
+    BaseDAO,
+    DBExecutor,
+    SingleFlight,
+    single_flight,
+)
+from src.server.example_module import service
+from src.server.sql_instrumentation import track_queries
+from src.server.example_module.dao import AsyncExampleItemDAO, ExampleItemDAO
+
+
+def test_get_many_chunks_and_projects(test_db_session: Session):
+    """测试 get_many 分块查询、去重，以及按列投影返回 Row 元组"""
+    dao = ExampleItemDAO(test_db_session)
+    created = dao.create_many([f"item-{i}" for i in range(25)])
+    ids = sorted(created.values())
+
+    items = dao.get_many(ids + ids[:3] + [999999], chunk_size=10)
+    assert sorted(item.id for item in items) == ids
+
+    rows = dao.get_many(ids[:2], columns=("id", "name"))
+    assert sorted(tuple(row) for row in rows) == [
+        (ids[0], "item-0"),
+        (ids[1], "item-1"),
+    ]
+
+
+def test_exists_count_and_get_by(test_db_session: Session):
+    """测试按等值条件的 exists / count / get_by"""
+    dao = ExampleItemDAO(test_db_session)
+    dao.create_many(["a", "b", "c"])
+
+    assert dao.count() == 3
+    assert dao.count(name="b") == 1
+    assert dao.exists(name="c")
+    assert not dao.exists(name="z")
+    found = dao.get_by(name="a")
+    assert found is not None and found.name == "a"
+
+
+def test_upsert_many_and_delete_many(test_db_session: Session):
+    """测试 upsert_many 冲突跳过 / 覆盖，delete_many 删除并失效实体缓存"""
+    dao = ExampleItemDAO(test_db_session)
+    first = dao.upsert_many([{"name": f"n{i}"} for i in range(600)], ["name"])
+    assert len(first) == 600
+
+    # 冲突行被跳过，只返回新插入的主键
+    again = dao.upsert_many([{"name": "n0"}, {"name": "new"}], ["name"])
+    assert len(again) == 1
+
+    # 覆盖更新：按 id 冲突时改名，返回受影响的主键
+    target = first[0]
+    assert dao.get_cached(target).name == "n0"
+    updated = dao.upsert_many([{"id": target, "name": "renamed"}], ["id"], ["name"])
+    assert updated == [target]
+    assert dao.get_cached(target).name == "renamed"
+    assert dao.get_cached_by("name", "n0") is None
+
+    assert dao.delete_many(first[:100]) == 100
+    assert dao.count() == 501
+    assert dao.get_cached(target) is None
+
+
+def test_generic_ops_require_model(test_db_session: Session):
+    """测试未声明 model 的 DAO 调用通用操作时报错"""
+    with pytest.raises(TypeError):
+        BaseDAO(test_db_session).count()
+
+
+@pytest.mark.asyncio
+async def test_async_generic_ops(test_async_db_session: AsyncSession):
+    """测试异步 DAO 的通用操作"""
+    dao = AsyncExampleItemDAO(test_async_db_session)
+    ids = await dao.upsert_many([{"name": "x"}, {"name": "y"}], ["name"])
+
+    assert await dao.count() == 2
+    assert await dao.exists(name="x")
+    assert sorted(row.name for row in await dao.get_many(ids, columns=("name",))) == [
+        "x",
+        "y",
+    ]
+    first = await dao.get(ids[0])
+    assert first is not None and first.name == "x"
+    assert await dao.delete_many(ids) == 2
+    assert await dao.count() == 0
+
+
+def test_single_flight_coalesces_concurrent_threads():
+    """测试并发的相同同步调用只执行一次，不同参数各自执行，异常同样共享"""
+    release = threading.Event()
+    calls: list[int] = []
+
+    @single_flight(name="test_sync")
+    def load(item_id: int) -> int:
+        calls.append(item_id)
+        release.wait(5)
+        if item_id < 0:
+            raise LookupError(item_id)
+        return item_id * 10
+
+    coalesced_before = SINGLE_FLIGHT_CALLS.value("test_sync", "coalesced")
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        same = [pool.submit(load, 1) for _ in range(5)]
+        other = pool.submit(load, 2)
+        failing = [pool.submit(load, -1) for _ in range(2)]
+        while len(calls) < 3 or SINGLE_FLIGHT_CALLS.value(
+            "test_sync", "coalesced"
+        ) - coalesced_before < 5:
+            threading.Event().wait(0.01)
+        release.set()
+
+        assert [f.result() for f in same] == [10] * 5
+        assert other.result() == 20
+        errors = [future.exception() for future in failing]
+        assert all(isinstance(error, LookupError) for error in errors)
+        # 等待方抛出新的异常实例，以执行方的异常为 __cause__
+        assert errors[0] is not errors[1]
+        assert {error.__cause__ is None for error in errors} == {True, False}
+
+    assert sorted(calls) == [-1, 1, 2]
+    assert SINGLE_FLIGHT_CALLS.value("test_sync", "coalesced") - coalesced_before == 5
+
+
+def test_single_flight_waiter_executes_after_wait_timeout():
+    """测试执行方超过等待时限仍未完成时，等待方自行执行"""
+    release = threading.Event()
+    calls: list[str] = []
+    flight = SingleFlight("test_wait_timeout", wait_timeout_seconds=0.05)
+
+    def slow() -> str:
+        calls.append("leader")
+        release.wait(5)
+        return "leader"
+
+    timeouts_before = SINGLE_FLIGHT_CALLS.value("test_wait_timeout", "wait_timeout")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        leader = pool.submit(flight.do, "k", slow)
+        while not calls:
+            threading.Event().wait(0.01)
+        assert flight.do("k", lambda: "waiter") == "waiter"
+        release.set()
+        assert leader.result() == "leader"
+
+    timeouts = SINGLE_FLIGHT_CALLS.value("test_wait_timeout", "wait_timeout")
+    assert timeouts - timeouts_before == 1
+
+
+@pytest.mark.asyncio
+async def test_single_flight_async_survives_leader_cancellation():
+    """测试 async 调用合并；执行方被取消时等待方重新执行而不是一起被取消"""
+    calls = 0
+
+    @single_flight(key=lambda db, item_id: item_id)
+    async def load(db, item_id: int) -> int:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return item_id
+
+    results = await asyncio.gather(*(load(object(), 7) for _ in range(4)))
+    assert results == [7] * 4
+    assert calls == 1
+
+    leader = asyncio.create_task(load(None, 8))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(load(None, 8))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    assert await waiter == 8
+    assert calls == 3
+
+
+@pytest.mark.asyncio
+async def test_service_get_item_async_coalesces_before_dispatch(
+    test_db_engine, monkeypatch
+):
+    """测试 service.get_item_async 按 item_id 在派发到 DB 执行器之前合并，只占用一个工作线程"""
+    TestingSessionLocal = sessionmaker(bind=test_db_engine)
+    with TestingSessionLocal() as db:
+        item_id = ExampleItemDAO(db).create("coalesced").id
+
+    flight = service.get_item_async.single_flight
+    original = ExampleItemDAO.get_cached
+    entered = threading.Event()
+    release = threading.Event()
+    db_calls = 0
+
+    def slow_get_cached(self, pk):
+        nonlocal db_calls
+        db_calls += 1
+        entered.set()
+        release.wait(5)
+        return original(self, pk)
+
+    monkeypatch.setattr(ExampleItemDAO, "get_cached", slow_get_cached)
+    coalesced_before = SINGLE_FLIGHT_CALLS.value(flight.name, "coalesced")
+
+    calls = [
+        asyncio.ensure_future(service.get_item_async(TestingSessionLocal, item_id))
+    ]
+    await asyncio.to_thread(entered.wait, 5)
+    calls += [
+        asyncio.ensure_future(service.get_item_async(TestingSessionLocal, item_id))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*calls)
+
+    assert {item.name for item in results} == {"coalesced"}
+    assert db_calls == 1
+    assert SINGLE_FLIGHT_CALLS.value(flight.name, "coalesced") - coalesced_before == 2
+
+
+@pytest.mark.asyncio
+async def test_db_executor_rejects_when_queue_is_full():
+    """测试并发超过 工作线程数 + 排队上限 时立即返回 503"""
+    executor = DBExecutor(workers=1, queue_size=0, queue_timeout_seconds=5)
+    release = threading.Event()
+    rejected_before = DB_EXECUTOR_REJECTED.value("queue_full")
+    try:
+        running = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(lambda: None)
+        assert exc_info.value.status_code == 503
+        assert DB_EXECUTOR_REJECTED.value("queue_full") - rejected_before == 1
+
+        release.set()
+        assert await running is True
+        assert await executor.run(lambda: "ok") == "ok"
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_db_executor_drops_tasks_that_waited_too_long():
+    """测试排队超时的任务不再执行并返回 503，排队时间计入当前请求的统计"""
+    executor = DBExecutor(workers=1, queue_size=4, queue_timeout_seconds=0.05)
+    calls: list[str] = []
+    try:
+        with track_queries() as stats:
+            blocker = asyncio.ensure_future(executor.run(threading.Event().wait, 0.2))
+            await asyncio.sleep(0.01)
+            with pytest.raises(HTTPException) as exc_info:
+                await executor.run(calls.append, "late")
+            await blocker
+        assert exc_info.value.status_code == 503
+        assert calls == []
+        assert stats.queue_wait_ms >= 50
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_db_executor_queue_deadline_when_workers_are_stuck():
+    """测试工作线程一直被占用时，排队的调用按截止时间返回 503 且不会再执行"""
+    executor = DBExecutor(workers=1, queue_size=4, queue_timeout_seconds=0.05)
+    release = threading.Event()
+    calls: list[str] = []
+    try:
+        blocker = asyncio.ensure_future(executor.run(release.wait, 5))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as exc_info:
+            await executor.run(calls.append, "late")
+        assert exc_info.value.status_code == 503
+        assert not blocker.done()
+
+        release.set()
+        assert await blocker is True
+        assert await executor.run(lambda: "ok") == "ok"
+        assert calls == []
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_db_executor_reuses_thread_bound_session(test_db_engine):
+    """测试同一工作线程复用会话，每次任务后归还连接，提交后的对象仍可读取"""
+    TestingSessionLocal = sessionmaker(bind=test_db_engine)
+    executor = DBExecutor(workers=1, queue_size=4, queue_timeout_seconds=5)
+    try:
+        first = await executor.run(
+            lambda db: (id(db), ExampleItemDAO(db).create("pooled")),
+            session_factory=TestingSessionLocal,
+        )
+        second = await executor.run(
+            lambda db: (id(db), db.in_transaction(), len(db.identity_map)),
+            session_factory=TestingSessionLocal,
+        )
+    finally:
+        executor.shutdown()
+
+    assert first[1].name == "pooled"
+    assert second == (first[0], False, 0)
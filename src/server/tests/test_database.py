@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+数据库连接层测试
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.server.config import global_config
+from src.server.database import (
+    InstrumentedAsyncQueuePool,
+    InstrumentedQueuePool,
+    check_database_health,
+    get_pool_status,
+    get_sqlite_pragma_values,
+    install_sqlite_pragmas,
+    resolve_sqlite_pragmas,
+    warm_up_pool,
+)
+from src.server.metrics import (
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_OVERFLOW,
+)
+
+
+def test_resolve_sqlite_pragmas_profiles(monkeypatch):
+    """测试配置档与单项覆盖的合并"""
+    monkeypatch.setattr(global_config, "sqlite_pragma_profile", "production")
+    monkeypatch.setattr(global_config, "sqlite_busy_timeout_ms", 1234)
+    pragmas = resolve_sqlite_pragmas()
+    assert pragmas["journal_mode"] == "WAL"
+    assert pragmas["busy_timeout"] == 1234
+
+    monkeypatch.setattr(global_config, "sqlite_pragma_profile", "default")
+    monkeypatch.setattr(global_config, "sqlite_busy_timeout_ms", None)
+    assert resolve_sqlite_pragmas() == {}
+
+    monkeypatch.setattr(global_config, "sqlite_pragma_profile", "unknown")
+    with pytest.raises(ValueError):
+        resolve_sqlite_pragmas()
+
+
+def test_install_sqlite_pragmas_applies_on_connect(tmp_path: Path):
+    """测试每个新连接都会执行 PRAGMA"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragma.db'}")
+    install_sqlite_pragmas(
+        engine,
+        {
+            "busy_timeout": 2500,
+            "journal_mode": "WAL",
+            "synchronous": "NORMAL",
+            "temp_store": "MEMORY",
+        },
+    )
+    try:
+        values = get_sqlite_pragma_values(engine)
+        assert values["journal_mode"] == "wal"
+        assert values["busy_timeout"] == 2500
+        assert values["synchronous"] == 1  # NORMAL
+        assert values["temp_store"] == 2  # MEMORY
+    finally:
+        engine.dispose()
+
+
+def _pooled_engine(tmp_path: Path, pool_size: int = 1, max_overflow: int = 1):
+    return create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        connect_args={"check_same_thread": False},
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=0.05,
+    )
+
+
+def test_instrumented_pool_records_overflow_and_timeouts(tmp_path: Path):
+    """测试检出耗时、溢出连接与检出超时的统计"""
+    engine = _pooled_engine(tmp_path)
+    checkouts_before = DB_POOL_CHECKOUT_SECONDS.count("sync")
+    overflow_before = DB_POOL_OVERFLOW.value("sync")
+    timeouts_before = DB_POOL_CHECKOUT_TIMEOUTS.value("sync")
+
+    first = engine.connect()
+    second = engine.connect()
+    assert get_pool_status(engine).checked_out == 2
+    assert get_pool_status(engine).overflow == 1
+    with pytest.raises(sa_exc.TimeoutError):
+        engine.connect()
+    first.close()
+    second.close()
+    engine.connect().close()
+
+    assert DB_POOL_CHECKOUT_SECONDS.count("sync") - checkouts_before == 3
+    assert DB_POOL_OVERFLOW.value("sync") - overflow_before == 1
+    assert DB_POOL_CHECKOUT_TIMEOUTS.value("sync") - timeouts_before == 1
+    engine.dispose()
+
+
+def test_warm_up_pool_opens_pool_size_connections(tmp_path: Path):
+    """测试预热建立 pool_size 个连接并全部归还，之后的检出不再新建连接"""
+    engine = _pooled_engine(tmp_path, pool_size=3)
+    assert warm_up_pool(engine) == 3
+    status = get_pool_status(engine)
+    assert (status.checked_in, status.checked_out) == (3, 0)
+
+    health = check_database_health(engine)
+    assert health.status == "ok"
+    assert health.pool.size == 3
+    assert get_pool_status(engine).checked_in == 3
+    engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_async_pool_reuses_connections(tmp_path: Path):
+    """测试异步引擎的连接池复用连接（PRAGMA 只在新建连接时执行），检出按 async 标签计数"""
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'async_pool.db'}",
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    connects: list[object] = []
+    event.listen(engine.sync_engine, "connect", lambda *_: connects.append(None))
+    checkouts_before = DB_POOL_CHECKOUT_SECONDS.count("async")
+    try:
+        for _ in range(3):
+            async with engine.connect() as conn:
+                await conn.exec_driver_sql("SELECT 1")
+        assert len(connects) == 1
+        assert DB_POOL_CHECKOUT_SECONDS.count("async") - checkouts_before == 3
+        assert get_pool_status(engine.sync_engine).checked_in == 1
+    finally:
+        await engine.dispose()
+
+
+def test_health_db_endpoint(test_client):
+    """测试 /api/health/db 返回连接池状态"""
+    resp = test_client.get("/api/health/db")
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["status"] == "ok"
+    assert body["pool"]["pool_class"] == "InstrumentedQueuePool"
+    assert body["pool"]["size"] == global_config.db_pool_size
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+POST 幂等键测试
+"""
+
+import asyncio
+from http import HTTPStatus
+
+import pytest
+
+from src.server.idempotency import (
+    IdempotencyManager,
+    SQLiteIdempotencyStore,
+    StoredResponse,
+)
+
+
+def _manager(tmp_path, **overrides) -> IdempotencyManager:
+    options = {
+        "ttl_seconds": 60,
+        "lease_seconds": 30,
+        "max_entries": 100,
+        "max_body_bytes": 1024,
+    }
+    options.update(overrides)
+    return IdempotencyManager(SQLiteIdempotencyStore(tmp_path / "idem.db"), **options)
+
+
+def _response(status: int, body: bytes) -> StoredResponse:
+    return StoredResponse("", status, (("content-type", "application/json"),), body)
+
+
+def test_retry_replays_first_response(test_client):
+    """测试同一幂等键重试时重放首次响应，不会重复创建"""
+    headers = {"Idempotency-Key": "create-hello"}
+    first = test_client.post("/api/example/items", json={"name": "hello"}, headers=headers)
+    assert first.status_code == HTTPStatus.CREATED, first.text
+    assert "idempotent-replayed" not in first.headers
+
+    retry = test_client.post("/api/example/items", json={"name": "hello"}, headers=headers)
+    assert retry.status_code == HTTPStatus.CREATED
+    assert retry.json() == first.json()
+    assert retry.headers["idempotent-replayed"] == "true"
+
+    # 不带幂等键时照常执行（名称重复）
+    plain = test_client.post("/api/example/items", json={"name": "hello"})
+    assert plain.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_same_key_with_different_body_is_rejected(test_client):
+    """测试同一幂等键用于不同请求体时返回 422"""
+    headers = {"Idempotency-Key": "k1"}
+    test_client.post("/api/example/items", json={"name": "a"}, headers=headers)
+
+    resp = test_client.post("/api/example/items", json={"name": "b"}, headers=headers)
+    assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert test_client.get("/api/example/items", params={"name_prefix": "b"}).json()[
+        "items"
+    ] == []
+
+    resp = test_client.post(
+        "/api/example/items", json={"name": "c"}, headers={"Idempotency-Key": ""}
+    )
+    assert resp.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_register_retry_is_replayed(test_client):
+    """测试注册请求重试时返回首次结果而不是“用户名已存在”"""
+    payload = {
+        "username": "carol",
+        "email": "carol@example.com",
+        "password": "Password123",
+    }
+    headers = {"Idempotency-Key": "register-carol"}
+    first = test_client.post("/api/auth/register", json=payload, headers=headers)
+    retry = test_client.post("/api/auth/register", json=payload, headers=headers)
+
+    assert first.status_code == HTTPStatus.CREATED, first.text
+    assert retry.status_code == HTTPStatus.CREATED
+    assert retry.json() == first.json()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_execute_once(tmp_path):
+    """测试同一进程内并发的重复请求只执行一次"""
+    manager = _manager(tmp_path)
+    calls = 0
+
+    async def run():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return _response(201, b'{"id": 1}')
+
+    results = await asyncio.gather(*(manager.handle("k", "fp", run) for _ in range(5)))
+
+    assert calls == 1
+    assert [replayed for _, replayed in results].count(False) == 1
+    assert {response.body for response, _ in results} == {b'{"id": 1}'}
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_not_stored(tmp_path):
+    """测试 5xx 与过大的响应不保存，重试时重新执行"""
+    manager = _manager(tmp_path, max_body_bytes=4)
+    statuses = iter([500, 201])
+
+    async def run():
+        return _response(next(statuses), b"{}")
+
+    assert (await manager.handle("k", "fp", run))[0].status == 500
+    assert (await manager.handle("k", "fp", run))[0].status == 201
+
+    async def large():
+        return _response(200, b"x" * 10)
+
+    await manager.handle("big", "fp", large)
+    assert manager.store.reserve("big", "fp", 30) == (True, None)
+
+
+@pytest.mark.asyncio
+async def test_pending_key_in_other_process_conflicts(tmp_path):
+    """测试另一个进程正在处理同一键时返回 409，租约到期后可重新执行"""
+    manager = _manager(tmp_path)
+    other = SQLiteIdempotencyStore(tmp_path / "idem.db")
+    assert other.reserve("k", "fp", lease_seconds=30) == (True, None)
+
+    async def run():
+        return _response(201, b"{}")
+
+    response, _ = await manager.handle("k", "fp", run)
+    assert response.status == 409
+
+    other.clear()
+    assert other.reserve("k", "fp", lease_seconds=-1) == (True, None)
+    response, replayed = await manager.handle("k", "fp", run)
+    assert (response.status, replayed) == (201, False)
+
+    # 已完成的记录跨实例可见，压缩存储的响应体原样还原
+    body = b'{"data": "' + b"a" * 1000 + b'"}'
+    await manager.handle("large", "fp", lambda: asyncio.sleep(0, _response(200, body)))
+    reserved, stored = other.reserve("large", "fp", 30)
+    assert not reserved and stored.body == body
+
+
+def test_purge_expired_deletes_in_batches(tmp_path):
+    """测试按批删除过期键，未过期的键保留"""
+    store = SQLiteIdempotencyStore(tmp_path / "idem.db")
+    for i in range(25):
+        store.reserve(f"old-{i}", "fp", lease_seconds=-1)
+    store.reserve("fresh", "fp", lease_seconds=60)
+    manager = IdempotencyManager(
+        store, ttl_seconds=60, lease_seconds=30, max_entries=10, max_body_bytes=1024
+    )
+
+    assert store.purge_expired(batch_size=10) == 10
+    assert manager.purge_expired(batch_size=10) == 15
+    assert store.reserve("fresh", "fp", 30)[0] is False
+    assert store.reserve("old-0", "fp", 30) == (True, None)
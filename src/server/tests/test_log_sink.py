@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""
+批量日志写入测试
+"""
+
+import io
+import os
+from datetime import timedelta
+
+from loguru import logger
+
+from src.server.log_sink import (
+    LOG_RECORDS_DROPPED,
+    AccessLogSampler,
+    BatchedLogSink,
+    LogDestination,
+    RotatingLogFile,
+    parse_retention,
+    parse_size,
+)
+
+
+def _batched_handler(tmp_path, queue_size=10000, sampler=None):
+    stdout = io.StringIO()
+    sink = BatchedLogSink(
+        [
+            LogDestination("stdout", stdout, lambda r: True),
+            LogDestination(
+                "access",
+                RotatingLogFile(tmp_path / "access.log"),
+                lambda r: r["extra"].get("log_type") == "access",
+            ),
+        ],
+        flush_interval=60,
+        queue_size=queue_size,
+    )
+    handler_id = logger.add(
+        sink, format="{message}", filter=sampler or (lambda r: True)
+    )
+    return sink, stdout, handler_id
+
+
+def test_parse_rotation_and_retention():
+    """测试解析大小与保留策略，无法解析时返回 None"""
+    assert parse_size("20 MB") == 20 * 1024 * 1024
+    assert parse_size("512") == 512
+    assert parse_size("00:00") is None
+    assert parse_retention("14 days") == timedelta(days=14)
+    assert parse_retention("10 files") == 10
+    assert parse_retention("forever") is None
+
+
+def test_batched_sink_routes_records_and_flushes_on_stop(tmp_path):
+    """测试记录按目标分发，移除 sink 时写完队列"""
+    sink, stdout, handler_id = _batched_handler(tmp_path)
+    logger.info("应用日志")
+    logger.bind(log_type="access").info("GET / -> 200")
+    assert stdout.getvalue() == ""
+
+    logger.remove(handler_id)
+
+    assert stdout.getvalue() == "应用日志\nGET / -> 200\n"
+    assert (tmp_path / "access.log").read_text(encoding="utf-8") == "GET / -> 200\n"
+
+
+def test_batched_sink_drops_when_queue_full(tmp_path):
+    """测试队列写满时丢弃记录并计数"""
+    dropped_before = LOG_RECORDS_DROPPED.value()
+    sink, stdout, handler_id = _batched_handler(tmp_path, queue_size=2)
+    for index in range(5):
+        logger.info(f"记录 {index}")
+    logger.remove(handler_id)
+
+    assert stdout.getvalue() == "记录 0\n记录 1\n"
+    assert LOG_RECORDS_DROPPED.value() - dropped_before == 3
+
+
+def test_access_sampler_keeps_errors(tmp_path, monkeypatch):
+    """测试按路径前缀采样，错误请求与非访问日志始终保留"""
+    sampler = AccessLogSampler({"/api/health": 0.0, "/api": 1.0})
+    sink, stdout, handler_id = _batched_handler(tmp_path, sampler=sampler)
+    access = logger.bind(log_type="access")
+    access.bind(path="/api/health", status_code=200).info("health ok")
+    access.bind(path="/api/health", status_code=503).error("health down")
+    access.bind(path="/api/items", status_code=200).info("items")
+    logger.info("应用日志")
+    logger.remove(handler_id)
+
+    assert stdout.getvalue() == "health down\nitems\n应用日志\n"
+
+
+def test_rotating_log_file_rotates_and_keeps_newest(tmp_path):
+    """测试超过大小时轮转，并只保留指定数量的历史文件"""
+    log_file = RotatingLogFile(tmp_path / "app.log", max_bytes=10, retention=1)
+    for _ in range(4):
+        log_file.write("0123456789")
+    log_file.close()
+
+    rotated = list(tmp_path.glob("app.*.log"))
+    assert len(rotated) == 1
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == "0123456789"
+
+
+def test_rotating_log_file_counts_encoded_bytes(tmp_path):
+    """测试按 UTF-8 字节数而不是字符数判断轮转"""
+    log_file = RotatingLogFile(tmp_path / "app.log", max_bytes=15)
+    log_file.write("日志一\n")  # 10 字节
+    log_file.write("日志二\n")
+    log_file.close()
+
+    assert len(list(tmp_path.glob("app.*.log"))) == 1
+    assert (tmp_path / "app.log").read_text(encoding="utf-8") == "日志二\n"
+
+
+def test_rotating_log_file_per_process(tmp_path):
+    """测试多进程模式下写入带 pid 的独立文件，保留策略只清理轮转文件"""
+    other_worker = tmp_path / "app.99999999.log"
+    other_worker.write_text("其它工作进程\n", encoding="utf-8")
+
+    log_file = RotatingLogFile(
+        tmp_path / "app.log", max_bytes=10, retention=1, per_process=True
+    )
+    assert log_file.active_path == tmp_path / f"app.{os.getpid()}.log"
+    for _ in range(3):
+        log_file.write("0123456789")
+    assert len(list(tmp_path.glob(f"app.*.{os.getpid()}.log"))) == 1
+    assert other_worker.exists()
+
+    # 关闭时当前文件归档为轮转文件
+    log_file.close()
+    assert not log_file.active_path.exists()
+    assert len(list(tmp_path.glob(f"app.*.{os.getpid()}.log"))) == 1
+    assert other_worker.exists()
+    assert not (tmp_path / "app.log").exists()
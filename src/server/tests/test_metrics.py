@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+进程内指标测试
+"""
+
+import threading
+
+from sqlalchemy import create_engine, text
+
+from src.server.metrics import (
+    CONTENT_TYPE,
+    DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    MetricsRegistry,
+    install_db_metrics,
+)
+
+
+def test_registry_render_text_format():
+    """测试计数器、仪表与直方图的文本格式"""
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_total", "示例计数", ("path",))
+    in_flight = registry.gauge("demo_in_flight", "示例仪表")
+    latency = registry.histogram("demo_seconds", "示例直方图", buckets=(0.1, 1.0))
+
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    in_flight.inc()
+    in_flight.inc()
+    in_flight.dec()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    body = registry.render()
+    assert "# TYPE demo_total counter" in body
+    assert 'demo_total{path="/a\\"b"} 3' in body
+    assert "demo_in_flight 1" in body
+    assert 'demo_seconds_bucket{le="0.1"} 1' in body
+    assert 'demo_seconds_bucket{le="1"} 2' in body
+    assert 'demo_seconds_bucket{le="+Inf"} 3' in body
+    assert "demo_seconds_sum 5.55" in body
+    assert "demo_seconds_count 3" in body
+
+
+def test_counter_aggregates_thread_shards():
+    """测试多线程写入各自分片、读取时汇总"""
+    registry = MetricsRegistry()
+    counter = registry.counter("threaded_total", "多线程计数")
+
+    def worker():
+        for _ in range(1000):
+            counter.inc()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 8000
+
+
+def test_exited_thread_shards_are_folded():
+    """测试线程退出后其分片并入共享分片，分片数量不随线程数增长"""
+    registry = MetricsRegistry()
+    counter = registry.counter("short_lived_total", "短生命周期线程计数", ["kind"])
+    histogram = registry.histogram("short_lived_seconds", "短生命周期线程耗时", buckets=[1])
+
+    def worker():
+        counter.inc("a")
+        histogram.observe(0.5)
+
+    for _ in range(50):
+        thread = threading.Thread(target=worker)
+        thread.start()
+        thread.join()
+
+    assert len(counter._values.shards()) == 1
+    assert len(histogram._values.shards()) == 1
+    assert counter.value("a") == 50
+    assert histogram.count() == 50
+    assert "short_lived_seconds_sum 25" in registry.render()
+
+
+def test_db_query_metrics():
+    """测试引擎事件记录 SQL 语句数"""
+    engine = create_engine("sqlite://")
+    install_db_metrics(engine)
+    before = DB_QUERIES.value()
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        conn.execute(text("SELECT 2"))
+    assert DB_QUERIES.value() - before == 2
+
+
+def test_metrics_endpoint_uses_route_templates(test_client):
+    """测试 HTTP 指标按路由模板聚合并通过 /api/metrics 暴露"""
+    resp = test_client.post("/api/example/items", json={"name": "metric"})
+    item_id = resp.json()["id"]
+    before = HTTP_REQUESTS.value("GET", "/api/example/items/{item_id}", "2xx")
+    test_client.get(f"/api/example/items/{item_id}")
+    test_client.get("/api/example/items/999999")
+
+    route = "/api/example/items/{item_id}"
+    assert HTTP_REQUESTS.value("GET", route, "2xx") - before == 1
+    assert HTTP_REQUESTS.value("GET", route, "4xx") >= 1
+    assert HTTP_REQUEST_DURATION.count("GET", route) >= 2
+
+    resp = test_client.get("/api/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == CONTENT_TYPE
+    assert (
+        'http_requests_total{method="GET",route="/api/example/items/{item_id}",'
+        'status="4xx"}' in resp.text
+    )
+    assert 'http_requests_in_progress{method="GET"} 1' in resp.text
+    assert "db_queries_total" in resp.text
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+应用级中间件测试
+"""
+
+
+def test_request_id_is_propagated(test_client):
+    """测试 X-Request-ID 透传与自动生成"""
+    resp = test_client.get("/api/health", headers={"X-Request-ID": "rid-123"})
+    assert resp.status_code == 200
+    assert resp.headers["X-Request-ID"] == "rid-123"
+
+    resp = test_client.get("/api/health")
+    assert len(resp.headers["X-Request-ID"]) == 32
+
+
+def test_cache_control_rules(test_client):
+    """测试不同路径的 Cache-Control"""
+    resp = test_client.get("/assets/app-1234.js")
+    assert resp.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    resp = test_client.get("/page.html")
+    assert resp.headers["Cache-Control"] == "no-cache"
+
+    resp = test_client.get("/api/health")
+    assert "Cache-Control" not in resp.headers
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+工作进程回收测试
+"""
+
+import logging
+import signal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.server import process_manager
+from src.server.process_manager import WorkerRecycleMiddleware
+
+
+def _build_app(**limits) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    def ping():
+        return {"ok": True}
+
+    app.add_middleware(WorkerRecycleMiddleware, **limits)
+    return app
+
+
+@pytest.fixture
+def sent_signals(monkeypatch):
+    sent = []
+    monkeypatch.setattr(
+        process_manager.os, "kill", lambda pid, sig: sent.append((pid, sig))
+    )
+    return sent
+
+
+def test_recycle_after_max_requests(sent_signals):
+    """测试达到请求上限后只发送一次 SIGTERM"""
+    client = TestClient(_build_app(max_requests=3))
+    for _ in range(2):
+        client.get("/ping")
+    assert sent_signals == []
+
+    for _ in range(3):
+        assert client.get("/ping").status_code == 200
+    assert len(sent_signals) == 1
+    assert sent_signals[0][1] == signal.SIGTERM
+
+
+def test_recycle_on_rss_ceiling(sent_signals, monkeypatch):
+    """测试 RSS 超过上限时回收"""
+    monkeypatch.setattr(process_manager, "RSS_CHECK_INTERVAL", 2)
+    monkeypatch.setattr(process_manager, "_current_rss_bytes", lambda: 512 * 1024**2)
+
+    client = TestClient(_build_app(max_rss_mb=1024))
+    for _ in range(4):
+        client.get("/ping")
+    assert sent_signals == []
+
+    client = TestClient(_build_app(max_rss_mb=256))
+    client.get("/ping")
+    assert sent_signals == []
+    client.get("/ping")
+    assert len(sent_signals) == 1
+
+
+def test_current_rss_bytes_is_positive():
+    assert process_manager._current_rss_bytes() > 0
+
+
+def test_run_migrations_upgrades_existing_database():
+    """测试已有数据库缺少新表时由迁移补齐，且不会重置应用的日志配置"""
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect, text
+
+    from src.server.config import global_config
+    from src.server.database import engine, init_database
+
+    init_database()
+    process_manager.run_migrations(database_is_new=True)
+    # 模拟加入 refresh_tokens 迁移之前建出的数据库
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE refresh_tokens"))
+    alembic_config = Config(str(global_config.project_root / "alembic.ini"))
+    alembic_config.attributes["configure_logger"] = False
+    command.stamp(alembic_config, "c63d5feab92a")
+
+    versions_dir = global_config.project_root / "alembic" / "versions"
+    assert process_manager._database_at_head(versions_dir) is False
+
+    uvicorn_logger = logging.getLogger("uvicorn.error")
+    process_manager.run_migrations(database_is_new=False)
+
+    assert "refresh_tokens" in inspect(engine).get_table_names()
+    assert uvicorn_logger.disabled is False
+    assert process_manager._script_heads(versions_dir) == {"7b1e4d2a9f30"}
+    assert process_manager._database_at_head(versions_dir) is True
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+GET 响应缓存测试
+"""
+
+from starlette.datastructures import Headers
+
+from src.server.response_cache import (
+    RESPONSE_CACHE_EVICTIONS,
+    CachedResponse,
+    ResponseCache,
+    _is_not_modified,
+)
+
+
+def test_lru_evicts_by_total_bytes():
+    """测试超过总字节数时淘汰最久未使用的条目"""
+    evictions_before = RESPONSE_CACHE_EVICTIONS.value()
+    cache = ResponseCache(max_bytes=10, ttl_seconds=60)
+    cache.put(("-", "/a", ""), b"aaaa", "application/json", [], cache.generation)
+    cache.put(("-", "/b", ""), b"bbbb", "application/json", [], cache.generation)
+    assert cache.get(("-", "/a", "")) is not None
+
+    cache.put(("-", "/c", ""), b"cccc", "application/json", [], cache.generation)
+
+    assert cache.get(("-", "/b", "")) is None
+    assert cache.get(("-", "/a", "")) is not None
+    assert cache.stats() == {"size": 2, "bytes": 8}
+    assert RESPONSE_CACHE_EVICTIONS.value() - evictions_before == 1
+
+
+def test_invalidate_tags_removes_only_tagged_entries():
+    """测试按标签失效只移除相关条目"""
+    cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+    cache.put(("1", "/item/1", ""), b"{}", "application/json", ["item:1"], 0)
+    cache.put(("1", "/item/2", ""), b"{}", "application/json", ["item:2"], 0)
+
+    cache.invalidate_tags("item:1")
+
+    assert cache.get(("1", "/item/1", "")) is None
+    assert cache.get(("1", "/item/2", "")) is not None
+
+
+def test_put_skipped_after_concurrent_invalidation():
+    """测试未命中期间发生失效时不写入可能已过时的结果"""
+    cache = ResponseCache(max_bytes=1024, ttl_seconds=60)
+    generation = cache.generation
+    cache.invalidate_tags("item:1")
+
+    entry = cache.put(("-", "/item/1", ""), b"old", "application/json", ["item:1"], generation)
+
+    assert entry.body == b"old"
+    assert cache.get(("-", "/item/1", "")) is None
+
+
+def test_conditional_request_validators():
+    """测试只按 If-None-Match 判断，不发送 Last-Modified、忽略 If-Modified-Since"""
+    entry = CachedResponse.build(b"{}", "application/json", [], ttl_seconds=60)
+
+    assert _is_not_modified(entry, Headers({"if-none-match": entry.etag}))
+    assert _is_not_modified(entry, Headers({"if-none-match": f'"x", W/{entry.etag}'}))
+    assert not _is_not_modified(entry, Headers({"if-none-match": '"x"'}))
+    assert not _is_not_modified(
+        entry, Headers({"if-modified-since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    )
+    assert "Last-Modified" not in entry.to_response("no-cache").headers
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+JSON 响应引擎测试
+"""
+
+import json
+from types import SimpleNamespace
+
+from fastapi.responses import ORJSONResponse
+
+from src.server.example_module.schemas import ItemOut
+from src.server.responses import DefaultJSONResponse, model_response
+
+
+def test_default_response_class_uses_orjson():
+    """测试默认引擎为 orjson"""
+    assert DefaultJSONResponse is ORJSONResponse
+
+
+def test_model_response_serializes_attributes_to_bytes():
+    """测试从对象属性校验并直接编码为 JSON"""
+    items = [SimpleNamespace(id=i, name=f"item-{i}", extra="ignored") for i in range(3)]
+
+    resp = model_response(list[ItemOut], items, status_code=201)
+
+    assert resp.status_code == 201
+    assert resp.media_type == "application/json"
+    assert json.loads(resp.body) == [{"id": i, "name": f"item-{i}"} for i in range(3)]
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+SQL 语句观测测试
+"""
+
+from loguru import logger
+from sqlalchemy import create_engine, text
+
+from src.server.config import global_config
+from src.server.sql_instrumentation import (
+    _statement_shape,
+    current_query_stats,
+    install_sql_instrumentation,
+    report_n_plus_one,
+    track_queries,
+)
+
+
+def _capture_logs():
+    records = []
+    handler_id = logger.add(lambda message: records.append(message.record), level=0)
+    return records, handler_id
+
+
+def test_statement_shape_collapses_placeholder_lists():
+    """测试 IN 列表与多行 VALUES 被折叠为同一形状"""
+    assert _statement_shape("SELECT * FROM t WHERE id IN (?, ?, ?)") == (
+        "SELECT * FROM t WHERE id IN (?)"
+    )
+    assert _statement_shape("INSERT INTO t (name)\n VALUES (?), (?), (?)") == (
+        "INSERT INTO t (name) VALUES (?)"
+    )
+
+
+def test_track_queries_and_n_plus_one(monkeypatch):
+    """测试按上下文统计语句数并检测重复语句"""
+    monkeypatch.setattr(global_config, "sql_n_plus_one_threshold", 3)
+    engine = create_engine("sqlite://")
+    install_sql_instrumentation(engine)
+    records, handler_id = _capture_logs()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))  # 不在统计上下文中
+            with track_queries() as stats:
+                for i in range(5):
+                    conn.execute(text("SELECT :value"), {"value": i})
+                conn.execute(text("SELECT 2"))
+            assert current_query_stats() is None
+
+        assert stats.count == 6
+        assert stats.total_ms > 0
+        assert stats.repeated_shapes(3) == [("SELECT ?", 5)]
+        report_n_plus_one(stats, "GET /demo")
+    finally:
+        logger.remove(handler_id)
+
+    warnings = [r["message"] for r in records if "N+1" in r["message"]]
+    assert warnings == ["疑似 N+1 查询：GET /demo 执行同一语句 5 次：SELECT ?"]
+
+
+def test_slow_query_log(monkeypatch):
+    """测试超过阈值的语句以 slow_sql 类型输出"""
+    monkeypatch.setattr(global_config, "sql_slow_query_ms", 0)
+    engine = create_engine("sqlite://")
+    install_sql_instrumentation(engine)
+    records, handler_id = _capture_logs()
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 42"))
+    finally:
+        logger.remove(handler_id)
+
+    slow = [r for r in records if r["extra"].get("log_type") == "slow_sql"]
+    assert len(slow) == 1
+    assert "SELECT 42" in slow[0]["message"]
+
+
+def test_access_log_includes_query_stats(test_client, test_db_engine):
+    """测试访问日志附带本次请求的 SQL 统计"""
+    install_sql_instrumentation(test_db_engine.engine)
+    records, handler_id = _capture_logs()
+    try:
+        test_client.post("/api/example/items", json={"name": "sql"})
+    finally:
+        logger.remove(handler_id)
+
+    access = [r for r in records if r["extra"].get("log_type") == "access"]
+    assert len(access) == 1
+    assert access[0]["extra"]["db_queries"] >= 1
+    assert "db " in access[0]["message"]
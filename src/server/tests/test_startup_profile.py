@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析测试
+"""
+
+from src.server import startup_profile
+from src.server.startup_profile import format_phases, parse_importtime, startup_phase
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     _io
+import time:      2000 |       5000 |   fastapi.routing
+import time:      1500 |       6500 | fastapi
+some unrelated stderr line
+"""
+
+
+def test_parse_importtime():
+    timings = parse_importtime(IMPORTTIME_OUTPUT)
+    assert [t.module for t in timings] == ["_io", "fastapi.routing", "fastapi"]
+    assert [t.depth for t in timings] == [2, 1, 0]
+    assert timings[2].self_us == 1500
+    assert timings[2].cumulative_us == 6500
+
+
+def test_startup_phase_records_duration(monkeypatch):
+    monkeypatch.setattr(startup_profile, "STARTUP_PHASES", [])
+    with startup_phase("demo"):
+        pass
+    phases = startup_profile.STARTUP_PHASES
+    assert len(phases) == 1
+    assert phases[0][0] == "demo"
+    assert phases[0][1] >= 0
+    assert format_phases([("a", 1.5), ("b", 3)]) == "a 1.5ms, b 3.0ms"
+
+
+def test_profile_startup_runs_app(tmp_path, monkeypatch):
+    """真实启动子进程：批量日志 sink 写到 stdout 时报告仍能正常生成"""
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "profile.db"))
+    monkeypatch.setenv("LOG_DIR", str(tmp_path / "logs"))
+    monkeypatch.setenv("LOG_BATCHED", "true")
+    monkeypatch.setenv("LOG_LEVEL", "DEBUG")
+
+    report = startup_profile.profile_startup(top=5)
+
+    assert "导入 src.server.main" in report
+    assert "首个请求（200）" in report
+    assert "数据库检查/初始化" in report
+    assert "按顶层包汇总自身导入耗时" in report
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+SPA 静态文件服务测试
+"""
+
+import gzip
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.server.static_files import InMemorySPAStaticFiles, SPAStaticFiles
+
+
+@pytest.fixture()
+def dist_dir(tmp_path: Path) -> Path:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_text("<html>index</html>", encoding="utf-8")
+    (tmp_path / "assets" / "app-1234.js").write_text(
+        "console.log('hello');\n" * 200, encoding="utf-8"
+    )
+    (tmp_path / "assets" / "pre-5678.css").write_text("body{}" * 300, encoding="utf-8")
+    (tmp_path / "assets" / "pre-5678.css.gz").write_bytes(
+        gzip.compress(b"prebuilt-gzip")
+    )
+    return tmp_path
+
+
+def test_in_memory_static_files_serves_assets(dist_dir: Path):
+    """测试从内存提供资源、协商压缩与 304"""
+    client = TestClient(InMemorySPAStaticFiles(dist_dir))
+
+    resp = client.get("/assets/app-1234.js", headers={"Accept-Encoding": "identity"})
+    assert resp.status_code == 200
+    assert "javascript" in resp.headers["content-type"]
+    assert "content-encoding" not in resp.headers
+    etag = resp.headers["etag"]
+
+    resp = client.get("/assets/app-1234.js", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == "console.log('hello');\n" * 200
+    assert resp.headers["etag"] != etag
+
+    resp = client.get(
+        "/assets/app-1234.js",
+        headers={"If-None-Match": etag, "Accept-Encoding": "identity"},
+    )
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+    # 构建产物中的 .gz 优先于运行时压缩，且不作为独立路径暴露
+    resp = client.get("/assets/pre-5678.css", headers={"Accept-Encoding": "gzip"})
+    assert resp.content == b"prebuilt-gzip"
+    assert client.get("/assets/pre-5678.css.gz").status_code == 404
+
+
+def test_in_memory_static_files_spa_fallback(dist_dir: Path):
+    """测试 SPA 回退与 API 404"""
+    client = TestClient(InMemorySPAStaticFiles(dist_dir))
+
+    resp = client.get("/dashboard/settings")
+    assert resp.status_code == 200
+    assert resp.text == "<html>index</html>"
+    assert resp.headers["cache-control"] == "no-cache"
+
+    assert client.get("/").text == "<html>index</html>"
+    assert client.get("/api/unknown").status_code == 404
+    assert client.post("/").status_code == 405
+
+    # 缺失的静态文件返回 404，只有不带扩展名的前端路由回退
+    missing_files = ("/assets/missing.js", "/assets/x.css.gz", "/assets/chunk", "/favicon.ico")
+    for missing in missing_files:
+        assert client.get(missing).status_code == 404, missing
+
+
+def test_disk_static_files_spa_fallback(dist_dir: Path):
+    """测试磁盘模式的 SPA 回退与缺失文件 404"""
+    client = TestClient(
+        SPAStaticFiles(directory=str(dist_dir), index_file=dist_dir / "index.html")
+    )
+
+    assert client.get("/assets/app-1234.js").status_code == 200
+    assert client.get("/dashboard/settings").text == "<html>index</html>"
+    for missing in ("/assets/missing.js", "/favicon.ico", "/api/unknown"):
+        assert client.get(missing).status_code == 404, missing
+
+
+def test_in_memory_static_files_deferred_compression(dist_dir: Path):
+    """测试延迟压缩：完成前提供原始内容，完成后协商压缩版本"""
+    spa = InMemorySPAStaticFiles(dist_dir, compress_on_load=False)
+    client = TestClient(spa)
+
+    resp = client.get("/assets/app-1234.js", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+    assert resp.headers["vary"] == "Accept-Encoding"
+
+    # 构建产物中的预压缩版本在载入时即可用
+    resp = client.get("/assets/pre-5678.css", headers={"Accept-Encoding": "gzip"})
+    assert resp.content == b"prebuilt-gzip"
+
+    spa.compress_pending()
+    resp = client.get("/assets/app-1234.js", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.text == "console.log('hello');\n" * 200